@@ -8,18 +8,40 @@ it in your desired quality.
 """
 
 import logging
-from importlib import metadata
-
-try:
-    __version__ = metadata.version("fzmovies-api")
-except metadata.PackageNotFoundError:
-    __version__ = "0.0.0"
+import typing as t
 
 __author__ = "Smartwa"
 __repo__ = "https://github.com/Simatwa/fzmovie-api"
 
 logger = logging.getLogger(__name__)
 
-from fzmovies_api.main import Auto, Download, DownloadLinks, Navigate, Search, Support
-
 __all__ = ["Auto", "Download", "DownloadLinks", "Navigate", "Search", "Support"]
+
+if t.TYPE_CHECKING:
+    from fzmovies_api.main import (
+        Auto,
+        Download,
+        DownloadLinks,
+        Navigate,
+        Search,
+        Support,
+    )
+
+
+def __getattr__(name: str):
+    # Heavy dependencies are only imported once the higher level APIs are accessed
+    if name in __all__:
+        from fzmovies_api import main
+
+        value = getattr(main, name)
+    elif name == "__version__":
+        from importlib import metadata
+
+        try:
+            value = metadata.version("fzmovies-api")
+        except metadata.PackageNotFoundError:
+            value = "0.0.0"
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    globals()[name] = value
+    return value
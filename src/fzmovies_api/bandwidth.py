@@ -0,0 +1,299 @@
+"""
+This module shapes download bandwidth.
+
+A `BandwidthController` holds the global rate cap (optionally
+varying by time of day) and splits it among registered downloads
+in proportion to their weights, so bulk jobs yield to interactive
+ones without being stopped. Every download gets a `Throttle`
+whose own cap can be changed while it runs.
+
+```python
+from fzmovies_api import bandwidth
+
+bandwidth.controller.rate = "5MB"
+bulk = bandwidth.controller.register(weight=1)
+interactive = bandwidth.controller.register(weight=4)
+```
+"""
+
+import threading
+import time
+import typing as t
+from datetime import datetime
+from datetime import time as day_time
+
+from fzmovies_api import utils
+
+RateType = int | str | None
+"""Bytes per second either as `int` or human-readable i.e `2.5MB`.
+`None` means unlimited while `0` pauses the transfer."""
+
+
+def parse_rate(rate: RateType) -> int | None:
+    """Converts rate to bytes per second"""
+    if rate is None or isinstance(rate, int):
+        assert rate is None or rate >= 0, f"Rate must not be negative - {rate}"
+        return rate
+    return utils.parse_size(rate.removesuffix("/s"))
+
+
+def _parse_time(value: str | day_time) -> day_time:
+    if isinstance(value, day_time):
+        return value
+    return datetime.strptime(value, "%H:%M").time()
+
+
+class Schedule:
+    """Time-of-day rate caps
+
+    ```python
+    # Cap at 1MB/s during working hours and pause from 18:00 to 22:00
+    Schedule([("08:00", "17:00", "1MB"), ("18:00", "22:00", 0)])
+    ```
+    """
+
+    def __init__(
+        self,
+        windows: t.Iterable[tuple[str | day_time, str | day_time, RateType]] = (),
+        default: RateType = None,
+    ):
+        """Initializes `Schedule`
+
+        Args:
+            windows (t.Iterable[tuple[start, end, rate]]): Daily windows. `end` earlier than
+              `start` spans midnight. First matching window wins.
+            default (RateType, optional): Rate outside all windows. Defaults to None.
+        """
+        self.windows: list[tuple[day_time, day_time, int | None]] = [
+            (_parse_time(start), _parse_time(end), parse_rate(rate))
+            for start, end, rate in windows
+        ]
+        self.default = parse_rate(default)
+
+    def rate_at(self, moment: datetime | None = None) -> int | None:
+        """Rate in effect at `moment`. Defaults to now."""
+        now = (moment or datetime.now()).time()
+        for start, end, rate in self.windows:
+            if start <= end:
+                if start <= now < end:
+                    return rate
+            elif now >= start or now < end:
+                return rate
+        return self.default
+
+
+class Throttle:
+    """Token bucket limiting a single download"""
+
+    burst_seconds = 0.25
+    """Seconds worth of bytes that can be transferred in a burst"""
+
+    idle_seconds = 2.0
+    """Seconds without transfers after which the download stops sharing the global rate"""
+
+    def __init__(
+        self,
+        controller: "BandwidthController",
+        weight: float = 1.0,
+        rate: RateType = None,
+        name: str | None = None,
+    ):
+        """Initializes `Throttle`. Use `BandwidthController.register` instead.
+
+        Args:
+            controller (BandwidthController): Controller sharing out the global rate.
+            weight (float, optional): Share of the global rate relative to other downloads. Defaults to 1.0.
+            rate (RateType, optional): Own rate cap. Defaults to None.
+            name (str, optional): Identity of the download. Defaults to None.
+        """
+        assert weight > 0, f"Weight must be greater than 0 - {weight}"
+        self.controller = controller
+        self._weight = float(weight)
+        self._rate = parse_rate(rate)
+        self.name = name
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self._last_used = self._last_refill
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<fzmovies_api.bandwidth.Throttle name='{self.name}',weight={self.weight},rate={self.rate}>"
+
+    def __enter__(self) -> "Throttle":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def rate(self) -> int | None:
+        """Own rate cap in bytes per second"""
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: RateType):
+        self._rate = parse_rate(value)
+
+    @property
+    def weight(self) -> float:
+        """Share of the global rate relative to other downloads"""
+        return self._weight
+
+    @weight.setter
+    def weight(self, value: float):
+        assert value > 0, f"Weight must be greater than 0 - {value}"
+        self.controller._reweigh(self, float(value))
+
+    def is_idle(self, now: float | None = None) -> bool:
+        """Whether nothing has been transferred for `idle_seconds`"""
+        return (now or time.monotonic()) - self._last_used > self.idle_seconds
+
+    @property
+    def allowed_rate(self) -> int | None:
+        """Rate currently granted in bytes per second"""
+        return self.controller.rate_for(self)
+
+    def consume(self, size: int):
+        """Block until `size` bytes may be transferred
+
+        Args:
+            size (int): Bytes transferred.
+        """
+        self._last_used = time.monotonic()
+        while True:
+            rate = self.allowed_rate
+            if rate is None:
+                self._tokens = 0.0
+                self._last_refill = time.monotonic()
+                return
+            if rate == 0:
+                # Paused, check again later
+                time.sleep(self.burst_seconds)
+                self._last_refill = time.monotonic()
+                continue
+
+            with self._lock:
+                now = time.monotonic()
+                capacity = max(rate * self.burst_seconds, size)
+                self._tokens = min(
+                    capacity, self._tokens + (now - self._last_refill) * rate
+                )
+                self._last_refill = now
+                self._tokens -= size
+                deficit = -self._tokens
+            if deficit > 0:
+                time.sleep(deficit / rate)
+            return
+
+    def close(self):
+        """Stop sharing the global rate"""
+        self.controller.unregister(self)
+
+
+class BandwidthController:
+    """Shares a global rate cap among downloads by weight"""
+
+    def __init__(self, rate: RateType = None, schedule: Schedule | None = None):
+        """Initializes `BandwidthController`
+
+        Args:
+            rate (RateType, optional): Global rate cap. Defaults to None.
+            schedule (Schedule, optional): Time-of-day caps overriding `rate`. Defaults to None.
+        """
+        self._rate = parse_rate(rate)
+        self.schedule = schedule
+        self._throttles: list[Throttle] = []
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<fzmovies_api.bandwidth.BandwidthController rate={self.rate},downloads={len(self._throttles)}>"
+
+    @property
+    def rate(self) -> int | None:
+        """Global rate cap currently in effect"""
+        if self.schedule is not None:
+            return self.schedule.rate_at()
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: RateType):
+        self._rate = parse_rate(value)
+
+    @property
+    def throttles(self) -> list[Throttle]:
+        """Registered downloads"""
+        return list(self._throttles)
+
+    def register(
+        self, weight: float = 1.0, rate: RateType = None, name: str | None = None
+    ) -> Throttle:
+        """Add a download
+
+        Args:
+            weight (float, optional): Share of the global rate relative to other downloads. Defaults to 1.0.
+            rate (RateType, optional): Own rate cap. Defaults to None.
+            name (str, optional): Identity of the download. Defaults to None.
+
+        Returns:
+            Throttle: Handle for limiting the download.
+        """
+        throttle = Throttle(self, weight=weight, rate=rate, name=name)
+        with self._lock:
+            self._throttles.append(throttle)
+        return throttle
+
+    def unregister(self, throttle: Throttle):
+        """Remove a download"""
+        with self._lock:
+            if throttle in self._throttles:
+                self._throttles.remove(throttle)
+
+    def _reweigh(self, throttle: Throttle, weight: float):
+        with self._lock:
+            throttle._weight = weight
+
+    def rate_for(self, throttle: Throttle) -> int | None:
+        """Rate granted to `throttle` in bytes per second.
+
+        The global rate is shared by weight among downloads that are not idle.
+        Downloads capped below their share are granted their cap and the rest
+        share what they leave unused, so that none of the global rate is wasted.
+        """
+        global_rate = self.rate
+        if global_rate is None:
+            return throttle.rate
+        now = time.monotonic()
+        with self._lock:
+            sharing = [
+                other
+                for other in self._throttles
+                if other is throttle or not other.is_idle(now)
+            ]
+        if throttle not in sharing:
+            sharing.append(throttle)
+
+        remaining = global_rate
+        while True:
+            total_weight = sum(other.weight for other in sharing)
+            capped = [
+                other
+                for other in sharing
+                if other.rate is not None
+                and other.rate < remaining * other.weight / total_weight
+            ]
+            if not capped:
+                break
+            if throttle in capped:
+                return throttle.rate
+            for other in capped:
+                remaining -= other.rate
+                sharing.remove(other)
+
+        share = int(remaining * throttle.weight / total_weight)
+        if global_rate and not share:
+            share = 1
+        return share
+
+
+controller = BandwidthController()
+"""Default controller used by `Download.save`"""
@@ -0,0 +1,348 @@
+"""
+This module measures how well `fzmovies_api`
+performs its heavy lifting without touching fzmovies.net.
+
+A synthetic, range-capable http server is spawned in
+a separate process and `Download.save` is timed against it
+across chunk sizes, single vs resumed vs multi-link (swarm)
+downloads and progressbar on/off.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import typing as t
+import uuid
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from fzmovies_api import __version__, logger
+
+default_chunk_sizes: tuple[int] = (64, 256, 512, 1024, 4096)
+"""Chunk sizes in KB benchmarked by default"""
+
+pattern_block = bytes(range(256)) * 4096
+"""1 MiB of synthetic movie contents served repeatedly"""
+
+
+class SyntheticFileHandler(BaseHTTPRequestHandler):
+    """Serves synthetic files of size specified in path i.e `/<size-in-bytes>.bin`
+    while honouring `Range` headers"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_headers(self) -> tuple[int, int] | None:
+        try:
+            size = int(Path(self.path.split("?")[0]).stem)
+        except ValueError:
+            self.send_error(404)
+            return None
+
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        if range_header:
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            start = int(first or 0)
+            if last:
+                end = min(int(last), end)
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return start, end
+
+    def do_HEAD(self):
+        self._send_headers()
+
+    def do_GET(self):
+        byte_range = self._send_headers()
+        if byte_range is None:
+            return
+        start, end = byte_range
+        block = memoryview(pattern_block)
+        block_size = len(pattern_block)
+        position = start
+        try:
+            while position <= end:
+                offset = position % block_size
+                length = min(block_size - offset, end - position + 1)
+                self.wfile.write(block[offset : offset + length])
+                position += length
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class SyntheticServer_(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients abandoning connections i.e probes is expected
+        pass
+
+
+def _serve(port_queue: multiprocessing.Queue):
+    server = SyntheticServer_(("127.0.0.1", 0), SyntheticFileHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class SyntheticServer:
+    """Runs `SyntheticFileHandler` in a separate process so that
+    its cpu usage does not pollute the measurements.
+
+    ```python
+    with SyntheticServer() as server:
+        url = server.url_for(1_000_000)
+    ```
+    """
+
+    def __init__(self):
+        self._process: multiprocessing.Process | None = None
+        self.port: int | None = None
+
+    def __enter__(self) -> "SyntheticServer":
+        port_queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(port_queue,), daemon=True
+        )
+        self._process.start()
+        self.port = port_queue.get(timeout=20)
+        return self
+
+    def __exit__(self, *args):
+        self._process.terminate()
+        self._process.join()
+
+    def url_for(self, size: int) -> str:
+        """Url to a synthetic file of `size` bytes"""
+        return f"http://127.0.0.1:{self.port}/{size}.bin"
+
+
+def io_counters() -> dict[str, int] | None:
+    """Syscall and bytes counters of the current process (Linux only)"""
+    try:
+        with open("/proc/self/io") as fh:
+            return {
+                key: int(value)
+                for key, value in (line.split(": ") for line in fh.read().splitlines())
+            }
+    except OSError:
+        return None
+
+
+def measure_download(
+    url: str,
+    size: int,
+    dir: str,
+    chunk_size: int = 512,
+    progress_bar: bool = False,
+    mode: str = "single",
+    sources: int = 4,
+) -> dict[str, t.Any]:
+    """Time a single download of a synthetic file
+
+    Args:
+        url (str): Url to the synthetic file.
+        size (int): Size of the file in bytes.
+        dir (str): Directory for saving the file.
+        chunk_size (int, optional): Chunk size in KB. Defaults to 512.
+        progress_bar (bool, optional): Display download progress bar. Defaults to False.
+        mode (str, optional): One of `download_modes`. `resumed` continues a
+          quarter-complete download. Defaults to "single".
+        sources (int, optional): Links used in `swarm` mode. Defaults to 4.
+
+    Returns:
+        dict[str, t.Any]: Measurements
+    """
+    from fzmovies_api import models
+    from fzmovies_api.main import Download
+    from fzmovies_api.swarm import SwarmDownload
+
+    filename = f"fzmovies-bench-{uuid.uuid4().hex}.bin"
+    save_to = Path(dir) / filename
+    already_downloaded = 0
+    resume = mode == "resumed"
+    if resume:
+        already_downloaded = size // 4
+        with open(save_to, "wb") as fh:
+            fh.truncate(already_downloaded)
+
+    if mode == "swarm":
+        download = SwarmDownload(
+            [
+                models.DownloadLink(url=f"{url}?source={index}", connections=0)
+                for index in range(sources)
+            ],
+            resolve=lambda link: str(link.url),
+        )
+    else:
+        download = Download(models.DownloadLink(url=url, connections=0), last_url=url)
+
+    io_before = io_counters()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started_at = time.perf_counter()
+    try:
+        download.save(
+            filename,
+            dir=dir,
+            progress_bar=progress_bar,
+            quiet=True,
+            chunk_size=chunk_size,
+            resume=resume,
+            leave=False,
+        )
+        elapsed = time.perf_counter() - started_at
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+        io_after = io_counters()
+        saved_size = save_to.stat().st_size
+    finally:
+        if save_to.exists():
+            os.remove(save_to)
+
+    transferred = size - already_downloaded
+    cpu_time = (usage_after.ru_utime - usage_before.ru_utime) + (
+        usage_after.ru_stime - usage_before.ru_stime
+    )
+    return {
+        "mode": mode,
+        "chunk_size_kb": chunk_size,
+        "progress_bar": progress_bar,
+        "bytes": transferred,
+        "complete": saved_size == size,
+        "seconds": round(elapsed, 4),
+        "throughput_mb_s": round(transferred / elapsed / 1_000_000, 2),
+        "cpu_seconds": round(cpu_time, 4),
+        "cpu_percent": round(cpu_time / elapsed * 100, 1),
+        "voluntary_context_switches": usage_after.ru_nvcsw - usage_before.ru_nvcsw,
+        "involuntary_context_switches": usage_after.ru_nivcsw
+        - usage_before.ru_nivcsw,
+        "read_syscalls": (io_after["syscr"] - io_before["syscr"])
+        if io_before
+        else None,
+        "write_syscalls": (io_after["syscw"] - io_before["syscw"])
+        if io_before
+        else None,
+    }
+
+
+download_modes: tuple[str] = ("single", "resumed", "swarm")
+"""Download modes benchmarked"""
+
+
+def benchmark_download(
+    size: int = 1024,
+    chunk_sizes: t.Iterable[int] = default_chunk_sizes,
+    modes: t.Iterable[str] = download_modes,
+    progress_bars: t.Iterable[bool] = (False, True),
+    repeat: int = 1,
+    sources: int = 4,
+    dir: str | None = None,
+    on_result: t.Callable[[dict[str, t.Any]], None] | None = None,
+) -> dict[str, t.Any]:
+    """Benchmark `Download.save` against a local synthetic server
+
+    Args:
+        size (int, optional): Synthetic file size in MB. Defaults to 1024.
+        chunk_sizes (t.Iterable[int], optional): Chunk sizes in KB. Defaults to `default_chunk_sizes`.
+        modes (t.Iterable[str], optional): Download modes. `swarm` is only paired with chunk
+          sizes not exceeding `swarm.min_segment_size`. Defaults to `download_modes`.
+        progress_bars (t.Iterable[bool], optional): Progressbar states. Defaults to (False, True).
+        repeat (int, optional): Runs per combination. Defaults to 1.
+        sources (int, optional): Links used in `swarm` mode. Defaults to 4.
+        dir (str, optional): Directory for saving the downloads. Defaults to temp directory.
+        on_result (t.Callable, optional): Called with every measurement. Defaults to None.
+
+    Returns:
+        dict[str, t.Any]: Benchmark metadata and measurements.
+    """
+    modes = tuple(modes)
+    for mode in modes:
+        assert mode in download_modes, f"Mode '{mode}' is not one of {download_modes}"
+    assert repeat > 0, "Repeat must be greater than 0"
+
+    from fzmovies_api.swarm import min_segment_size
+
+    size_in_bytes = size * 1_000_000
+    results: list[dict[str, t.Any]] = []
+    with tempfile.TemporaryDirectory(dir=dir) as temp_dir, SyntheticServer() as server:
+        url = server.url_for(size_in_bytes)
+        for mode in modes:
+            for progress_bar in progress_bars:
+                for chunk_size in chunk_sizes:
+                    if mode == "swarm" and chunk_size * 1_000 > min_segment_size:
+                        # Swarm reads are capped at the smallest range size
+                        logger.debug(
+                            f"Skipping swarm download - chunk_size={chunk_size}KB"
+                            f" exceeds {min_segment_size // 1_000}KB"
+                        )
+                        continue
+                    for run in range(1, repeat + 1):
+                        logger.debug(
+                            f"Benchmarking {mode} download - chunk_size={chunk_size}KB,"
+                            f" progress_bar={progress_bar}, run={run}"
+                        )
+                        result = measure_download(
+                            url,
+                            size_in_bytes,
+                            temp_dir,
+                            chunk_size=chunk_size,
+                            progress_bar=progress_bar,
+                            mode=mode,
+                            sources=sources,
+                        )
+                        result["run"] = run
+                        results.append(result)
+                        if on_result:
+                            on_result(result)
+
+    return {
+        "meta": {
+            "fzmovies_api": __version__,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "size_bytes": size_in_bytes,
+            "repeat": repeat,
+            "swarm_sources": sources,
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def save_results(results: dict[str, t.Any], path: str) -> Path:
+    """Save benchmark results in json format
+
+    Args:
+        results (dict[str, t.Any]): Benchmark results
+        path (str): Path to json file
+
+    Returns:
+        Path: Path where the results have been saved to.
+    """
+    path = Path(path)
+    if path.suffix != ".json":
+        path = path.with_name(path.name + ".json")
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=4)
+    return path
@@ -0,0 +1,395 @@
+"""
+This module downloads many movies listed in a file.
+
+Entries - search queries or links to movie pages - are resolved
+to their download links concurrently and the movie files are then
+downloaded by a pool of workers, each with its own progress bar.
+
+Files already on disk are skipped when their checksum sidecar
+matches - or, lacking one, when they are of the advertised size -
+and resumed otherwise, so that rerunning a list only fetches what
+is missing.
+
+```python
+from fzmovies_api.bulk import BulkDownload, read_entries
+
+with open("movies.txt") as fh:
+    results = BulkDownload(read_entries(fh), workers=3).run()
+```
+"""
+
+import re
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import getcwd
+from pathlib import Path
+
+from fzmovies_api import bandwidth as bandwidth_
+from fzmovies_api import hunter, mirrors, models, utils, writer
+
+movie_page_pattern = re.compile(
+    r"^(https?://[^\s]+|/?movie-[^\s]+)\.htm$", re.IGNORECASE
+)
+"""Entries linking straight to a movie page"""
+
+default_checksum = "sha256"
+"""Hash algorithm of the sidecars used for telling complete files"""
+
+orders = ("fifo", "sjf")
+"""Download orders - as resolved or shortest job (smallest file) first"""
+
+Job = t.TypeVar("Job", bound=tuple[t.Any, models.DownloadMovie])
+
+
+def schedule(
+    jobs: list[Job], order: str = "fifo", budget: int | None = None
+) -> tuple[list[Job], list[Job]]:
+    """Order download jobs and leave out those not fitting in `budget`.
+    Shortest job first fits the most files in a budget.
+
+    Args:
+        jobs (list[Job]): Pairs whose latter item is the movie file to download.
+        order (str, optional): One of `orders`. Defaults to "fifo".
+        budget (int | None, optional): Bytes that can be downloaded. Defaults to unlimited.
+
+    Returns:
+        tuple[list[Job], list[Job]]: Jobs in the order of download and those left out.
+          Files of unknown size are left out of budgets.
+    """
+    assert order in orders, f"order must be one of {orders} not '{order}'"
+    if order == "sjf":
+        jobs = sorted(
+            jobs,
+            key=lambda job: (job[1].size_in_bytes is None, job[1].size_in_bytes or 0),
+        )
+    if budget is None:
+        return list(jobs), []
+    scheduled, deferred = [], []
+    for job in jobs:
+        size = job[1].size_in_bytes
+        if size is not None and size <= budget:
+            scheduled.append(job)
+            budget -= size
+        else:
+            deferred.append(job)
+    return scheduled, deferred
+
+
+def read_entries(lines: t.Iterable[str]) -> list[str]:
+    """Entries of a list file - one per line. Blank lines and those starting
+    with `#` are ignored.
+
+    Args:
+        lines (t.Iterable[str]): Lines of the list file.
+
+    Returns:
+        list[str]: Queries and links to movie pages.
+    """
+    entries = []
+    for line in lines:
+        entry = line.strip()
+        if entry and not entry.startswith("#"):
+            entries.append(entry)
+    return entries
+
+
+class BulkDownload:
+    """Downloads movies of many entries concurrently"""
+
+    def __init__(
+        self,
+        entries: t.Iterable[str],
+        quality: t.Literal["480p", "720p"] = "720p",
+        searchby: str = "Name",
+        category: str = "All",
+        workers: int = 3,
+        resolvers: int = 8,
+        dir: Path | str = getcwd(),
+        checksum: str | None = default_checksum,
+        fastest_link: bool = False,
+        progress_bar: bool = True,
+        quality_floor: bool = False,
+        order: t.Literal["fifo", "sjf"] = "fifo",
+        window: float | None = None,
+        bandwidth: int | str | None = None,
+        **save_kwargs,
+    ):
+        """Initializes `BulkDownload`
+
+        Args:
+            entries (t.Iterable[str]): Search queries or links to movie pages.
+            quality (t.Literal[480p, 720p], optional): Video quality. Defaults to 720p.
+            searchby (str, optional): Search-by filter for queries. Defaults to Name.
+            category (str, optional): Movie category for queries. Defaults to All.
+            workers (int, optional): Movie files downloaded at once. Defaults to 3.
+            resolvers (int, optional): Entries resolved at once. Defaults to 8.
+            dir (Path | str, optional): Directory for saving the movie files. Defaults to getcwd().
+            checksum (str | None, optional): Hash algorithm for the sidecars. Defaults to `default_checksum`.
+            fastest_link (bool, optional): Probe the links and use the fastest. Defaults to False.
+            progress_bar (bool, optional): Show a progress bar per worker. Defaults to True.
+            quality_floor (bool, optional): Take `quality` as the least acceptable and
+              pick the smallest file meeting it. Defaults to False.
+            order (t.Literal["fifo", "sjf"], optional): Download order. Defaults to "fifo".
+            window (float | None, optional): Seconds available for downloading. Defaults to None.
+            bandwidth (int | str | None, optional): Expected speed per second within `window`
+              in bytes or i.e `5MB`. Defaults to None.
+            The rest are arguments for `Download.save`.
+        """
+        assert quality in utils.file_index_quality_map, (
+            f"Movie quality '{quality}' is not one of"
+            f" {list(utils.file_index_quality_map.keys())}"
+        )
+        assert workers > 0, "workers must be greater than 0"
+        assert resolvers > 0, "resolvers must be greater than 0"
+        assert "filename" not in save_kwargs, "Movie files keep their own filenames"
+        assert order in orders, f"order must be one of {orders} not '{order}'"
+        assert (window is None) == (bandwidth is None), (
+            "window and bandwidth go together"
+        )
+        self.entries = list(entries)
+        self.quality = quality
+        self.searchby = searchby
+        self.category = category
+        self.workers = workers
+        self.resolvers = resolvers
+        self.dir = Path(dir)
+        self.checksum = checksum
+        self.fastest_link = fastest_link
+        self.progress_bar = progress_bar
+        self.quality_floor = quality_floor
+        self.order = order
+        self.budget = (
+            None if window is None else int(window * bandwidth_.parse_rate(bandwidth))
+        )
+        """Bytes that can be downloaded within `window`"""
+        self.save_kwargs = save_kwargs
+        self._positions: list[int] = list(range(workers))
+        self._positions_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<fzmovies_api.bulk.BulkDownload entries={len(self.entries)},workers={self.workers}>"
+
+    def resolve(self, entry: str) -> models.DownloadMovie:
+        """Download links of the movie file of `entry`
+
+        Args:
+            entry (str): Search query or link to a movie page.
+
+        Raises:
+            errors.DownloadError: Movie has no file meeting the desired quality.
+
+        Returns:
+            models.DownloadMovie: Movie file and its links.
+        """
+        from fzmovies_api.main import DownloadLinks, Navigate, Search
+
+        if movie_page_pattern.match(entry):
+            target = entry
+        else:
+            target = Search(
+                query=entry, searchby=self.searchby, category=self.category
+            ).results.movies[0]
+        movie_file = utils.select_file(
+            Navigate(target).results.files, self.quality, self.quality_floor
+        )
+        return DownloadLinks(movie_file).results
+
+    def is_complete(self, save_to: Path, size: str | None = None) -> bool:
+        """Check whether `save_to` matches its checksum sidecar. A file
+        without one - i.e finished by a run not keeping checksums - is taken
+        to be complete when of `size` exactly and its sidecar is written.
+
+        Args:
+            save_to (Path): Movie file.
+            size (str | None, optional): Advertised size i.e `805 MB`. Files not of it
+              are taken to be incomplete without being hashed. Defaults to None.
+
+        Returns:
+            bool: File is complete.
+        """
+        if self.checksum is None or not save_to.is_file():
+            return False
+        actual = save_to.stat().st_size
+        if size is not None and not utils.size_matches(actual, size, strict=False):
+            return False
+        digest = writer.read_checksum_file(save_to, self.checksum)
+        if digest is None:
+            try:
+                finished = size is not None and utils.size_matches(
+                    actual, size, tolerance=0
+                )
+            except ValueError:
+                finished = False
+            if not finished:
+                return False
+        hasher = writer.new_hasher(self.checksum)
+        writer.hash_file(save_to, hasher)
+        if digest is None:
+            writer.write_checksum_file(save_to, self.checksum, hasher.hexdigest())
+            return True
+        return hasher.hexdigest() == digest
+
+    def download(
+        self, entry: str, download_movie: models.DownloadMovie
+    ) -> models.BulkDownloadResult:
+        """Download movie file of `entry` unless it is complete on disk
+
+        Args:
+            entry (str): Search query or link to a movie page.
+            download_movie (models.DownloadMovie): Resolved movie file.
+
+        Returns:
+            models.BulkDownloadResult: Outcome of the entry.
+        """
+        from fzmovies_api.main import Download
+
+        started_at = time.perf_counter()
+        save_to = self.dir / download_movie.filename
+
+        def result(status, error: str | None = None) -> models.BulkDownloadResult:
+            return models.BulkDownloadResult(
+                entry=entry,
+                status=status,
+                path=save_to,
+                size=save_to.stat().st_size if save_to.is_file() else None,
+                elapsed=round(time.perf_counter() - started_at, 3),
+                error=error,
+            )
+
+        if self.is_complete(save_to, download_movie.size):
+            return result("skipped", "checksum matches")
+
+        with self._positions_lock:
+            position = self._positions.pop(0)
+        try:
+            if self.fastest_link:
+                probe = mirrors.fastest_link(download_movie.links)
+                download = Download(probe.link, last_url=probe.last_url)
+            else:
+                download = Download(download_movie.links[0])
+            download.save(
+                download_movie.filename,
+                dir=self.dir,
+                resume=save_to.is_file(),
+                checksum=self.checksum,
+                expected_size=download_movie.size,
+                progress_bar=self.progress_bar,
+                quiet=True,
+                position=position if self.progress_bar else None,
+                **self.save_kwargs,
+            )
+        except FileExistsError:
+            return result("skipped", "already downloaded")
+        except Exception as e:  # noqa: BLE001
+            return result("failed", str(e) or type(e).__name__)
+        finally:
+            with self._positions_lock:
+                self._positions.append(position)
+                self._positions.sort()
+        return result("downloaded")
+
+    def _resolved(
+        self, pool: ThreadPoolExecutor, finish: t.Callable
+    ) -> t.Iterator[tuple[int, models.DownloadMovie]]:
+        """Entries' indexes and their movie files as they are resolved"""
+        resolving = {
+            pool.submit(self.resolve, entry): index
+            for index, entry in enumerate(self.entries)
+        }
+        for future in as_completed(resolving):
+            index = resolving[future]
+            try:
+                yield index, future.result()
+            except Exception as e:  # noqa: BLE001
+                finish(
+                    index,
+                    models.BulkDownloadResult(
+                        entry=self.entries[index],
+                        status="failed",
+                        error=str(e) or type(e).__name__,
+                    ),
+                )
+
+    def plan(self) -> tuple[list[Job], list[Job]]:
+        """Resolve all the entries and schedule them without downloading
+
+        Returns:
+            tuple[list[Job], list[Job]]: Entries and their movie files
+              in the order of download and those left out of the window.
+        """
+        with ThreadPoolExecutor(
+            self.resolvers, thread_name_prefix="fzmovies-resolve"
+        ) as pool:
+            jobs = [
+                (self.entries[index], download_movie)
+                for index, download_movie in self._resolved(pool, lambda *_: None)
+            ]
+        return schedule(jobs, self.order, self.budget)
+
+    def run(
+        self,
+        on_result: t.Callable[[models.BulkDownloadResult], None] | None = None,
+    ) -> list[models.BulkDownloadResult]:
+        """Resolve and download all the entries. Entries are downloaded as soon as
+        they are resolved unless `order` or `window` call for resolving all of them first.
+
+        Args:
+            on_result (t.Callable[[models.BulkDownloadResult], None], optional): Called
+              as each entry finishes. Defaults to None.
+
+        Returns:
+            list[models.BulkDownloadResult]: Outcomes in the order of the entries.
+        """
+        results: list[models.BulkDownloadResult | None] = [None] * len(self.entries)
+
+        def finish(index: int, result: models.BulkDownloadResult):
+            results[index] = result
+            if on_result is not None:
+                on_result(result)
+
+        hunter.ensure_pool_size(self.resolvers + self.workers)
+        downloads = {}
+        claimed: dict[str, str] = {}
+        """Filenames being downloaded and the entries claiming them"""
+        with ThreadPoolExecutor(
+            self.resolvers, thread_name_prefix="fzmovies-resolve"
+        ) as resolve_pool, ThreadPoolExecutor(
+            self.workers, thread_name_prefix="fzmovies-download"
+        ) as download_pool:
+            jobs = self._resolved(resolve_pool, finish)
+            if self.order != "fifo" or self.budget is not None:
+                jobs, deferred = schedule(list(jobs), self.order, self.budget)
+                for index, download_movie in deferred:
+                    finish(
+                        index,
+                        models.BulkDownloadResult(
+                            entry=self.entries[index],
+                            status="skipped",
+                            path=self.dir / download_movie.filename,
+                            error="does not fit in the window",
+                        ),
+                    )
+
+            for index, download_movie in jobs:
+                entry = self.entries[index]
+                if download_movie.filename in claimed:
+                    finish(
+                        index,
+                        models.BulkDownloadResult(
+                            entry=entry,
+                            status="skipped",
+                            path=self.dir / download_movie.filename,
+                            error=f"same file as '{claimed[download_movie.filename]}'",
+                        ),
+                    )
+                    continue
+                claimed[download_movie.filename] = entry
+                future = download_pool.submit(self.download, entry, download_movie)
+                downloads[future] = index
+
+            for future in as_completed(downloads):
+                finish(downloads[future], future.result())
+
+        return results
@@ -0,0 +1,183 @@
+"""
+This module keeps finished models in memory
+
+Models - `SearchResults` & `MovieFiles` - are kept against the
+canonical url of the page they were made from so that a hit skips both
+the network and the parsing. Entries expire after a time-to-live and
+the least recently used ones are evicted once the memory budget is
+exceeded.
+
+Pages behind download keys - and the `DownloadMovie` links made from
+them, which are tied to the session - are never cached. `MovieFiles`
+link to such pages, so they stay fresh for no longer than the keys do.
+Cached models are shared - treat them as read-only.
+"""
+
+import re
+import threading
+import time
+import typing as t
+from collections import Counter, OrderedDict
+
+from fzmovies_api import utils
+
+if t.TYPE_CHECKING:
+    from pydantic import BaseModel
+
+M = t.TypeVar("M", bound="BaseModel")
+
+uncacheable_url_pattern = re.compile(
+    r"download(?:options)?key=|/dlink\.php", re.IGNORECASE
+)
+"""Urls carrying download keys i.e `download1.php?downloadoptionskey=`"""
+
+default_ttl = 10 * 60
+"""Seconds a model stays fresh"""
+
+download_key_ttl = 5 * 60
+"""Seconds models linking to download keys i.e `MovieFiles` stay fresh - well
+within the lifetime of the keys"""
+
+default_max_size = 64 * 1024 * 1024
+"""Memory budget in bytes"""
+
+
+class ModelCache:
+    """Thread-safe LRU cache of models keyed by canonical url"""
+
+    def __init__(
+        self,
+        ttl: float = default_ttl,
+        max_size: int = default_max_size,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        """Initializes `ModelCache`
+
+        Args:
+            ttl (float, optional): Seconds a model stays fresh. Defaults to `default_ttl`.
+            max_size (int, optional): Memory budget in bytes. Defaults to `default_max_size`.
+            clock (t.Callable[[], float], optional): Time source. Defaults to time.monotonic.
+        """
+        assert ttl > 0, "ttl must be greater than 0"
+        assert max_size > 0, "max_size must be greater than 0"
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.enabled = True
+        self.size = 0
+        """Approximate memory taken by the models in bytes"""
+        self.stats: Counter[str] = Counter()
+        """Number of `hits`, `misses`, `expired` & `evicted` entries"""
+        self._entries: OrderedDict[str, tuple[BaseModel, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<fzmovies_api.cache.ModelCache entries={len(self)},size={self.size}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url, count=False) is not None
+
+    @staticmethod
+    def cacheable(url: str) -> bool:
+        """Check whether models made from `url` can be cached"""
+        return uncacheable_url_pattern.search(str(url)) is None
+
+    @staticmethod
+    def sizeof(model: "BaseModel") -> int:
+        """Approximate memory taken by `model` in bytes.
+        Python objects take several times their serialized size."""
+        return 4 * len(model.model_dump_json())
+
+    def get(self, url: str, count: bool = True) -> "BaseModel | None":
+        """Fresh model made from `url`
+
+        Args:
+            url (str): Page url.
+            count (bool, optional): Update hit & miss stats. Defaults to True.
+
+        Returns:
+            BaseModel | None: Cached model if any.
+        """
+        key = utils.canonical_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                model, expires_at, size = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.stats["hits"] += 1
+                    return model
+                del self._entries[key]
+                self.size -= size
+                self.stats["expired"] += 1
+            if count:
+                self.stats["misses"] += 1
+        return None
+
+    def put(self, url: str, model: "BaseModel", ttl: float | None = None):
+        """Cache `model` made from `url` unless the url carries download keys
+
+        Args:
+            url (str): Page url.
+            model (BaseModel): Model made from the page.
+            ttl (float | None, optional): Seconds it stays fresh. Defaults to `self.ttl`.
+        """
+        if not self.cacheable(url):
+            return
+        key = utils.canonical_url(url)
+        size = self.sizeof(model)
+        if size > self.max_size:
+            return
+        expires_at = self.clock() + (ttl or self.ttl)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[2]
+            self._entries[key] = (model, expires_at, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.stats["evicted"] += 1
+
+    def get_or_make(
+        self, url: str, make: t.Callable[[], M], ttl: float | None = None
+    ) -> M:
+        """Cached model made from `url` or one made & cached afresh
+
+        Args:
+            url (str): Page url.
+            make (t.Callable[[], M]): Fetches & parses the page.
+            ttl (float | None, optional): Seconds it stays fresh. Defaults to `self.ttl`.
+
+        Returns:
+            M: Model
+        """
+        if not (self.enabled and self.cacheable(url)):
+            return make()
+        model = self.get(url)
+        if model is None:
+            model = make()
+            self.put(url, model, ttl)
+        return model
+
+    def invalidate(self, url: str):
+        """Drop model made from `url`"""
+        with self._lock:
+            entry = self._entries.pop(utils.canonical_url(url), None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def clear(self):
+        """Drop all the models"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+model_cache = ModelCache()
+"""Models cache shared across the package"""
@@ -0,0 +1,172 @@
+"""
+This module snapshots a crawled catalogue for instant lookups.
+
+A snapshot is a single read-only file holding the movies as
+`records.MovieRecords` ordered by `utils.movie_id`, the sorted ids
+themselves and the normalized titles sorted along with the rows they
+belong to. `CatalogSnapshot` maps the file into memory and binary-searches
+those keys in place, so opening it takes no parsing however large the
+catalogue and the pages read are shared by every process mapping it.
+
+```python
+from fzmovies_api.catalog import CatalogSnapshot, write_snapshot
+from fzmovies_api.crawler import FilterCrawler
+from fzmovies_api.records import MovieRecords
+
+movies = MovieRecords()
+FilterCrawler().run(movies.append)
+write_snapshot(movies, "catalogue.snapshot")
+
+with CatalogSnapshot("catalogue.snapshot") as catalogue:
+    catalogue.get("https://fzmovies.net/movie-Heat--hmp4.htm")
+    catalogue.search_title("the godf")
+```
+"""
+
+import os
+import struct
+import typing as t
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from fzmovies_api import models
+from fzmovies_api.fuzzy import normalize
+from fzmovies_api.records import (
+    MovieRecord,
+    MovieRecords,
+    StringColumn,
+    map_file,
+    release,
+    write_column,
+)
+from fzmovies_api.utils import movie_id
+
+magic = b"FZCATLG1"
+"""Leading bytes of snapshot files"""
+
+header = struct.Struct("<8sQ")
+"""Magic and the number of movies"""
+
+
+def write_snapshot(
+    movies: t.Iterable[models.MovieInSearch | MovieRecord], path: Path | str
+) -> int:
+    """Write catalogue snapshot of `movies` to `path` without leaving it
+    half-written. Repeated movies are kept once.
+
+    Args:
+        movies (t.Iterable[models.MovieInSearch | MovieRecord]): Movies crawled.
+        path (Path | str): Snapshot file.
+
+    Returns:
+        int: Movies written
+    """
+    unique: dict[str, models.MovieInSearch | MovieRecord] = {}
+    for movie in movies:
+        unique.setdefault(movie_id(str(movie.url)), movie)
+    keys = sorted(unique)
+    records = MovieRecords(unique[key] for key in keys)
+    titles = sorted(
+        (normalize(record.title), row) for row, record in enumerate(records)
+    )
+
+    url_keys, title_keys = StringColumn(), StringColumn()
+    for key in keys:
+        url_keys.append(key)
+    for title, _ in titles:
+        title_keys.append(title)
+
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as fh:
+        write_column(fh, header.pack(magic, len(keys)))
+        records.dump(fh)
+        for column in (url_keys, title_keys):
+            write_column(fh, column.ends)
+            write_column(fh, column.data)
+        write_column(fh, array("Q", (row for _, row in titles)))
+    os.replace(temporary, path)
+    return len(keys)
+
+
+class CatalogSnapshot:
+    """Read-only catalogue mapped from a file written by `write_snapshot`"""
+
+    def __init__(self, path: Path | str):
+        """Initializes `CatalogSnapshot`
+
+        Args:
+            path (Path | str): Snapshot file.
+
+        Raises:
+            ValueError: `path` is not a snapshot file.
+        """
+        self.path = Path(path)
+        self._mmap, reader = map_file(self.path, magic, "catalog snapshot")
+        self._views = reader.views
+        _, rows = header.unpack(reader.take(header.size))
+        self.records = MovieRecords.from_reader(reader)
+        """Movies ordered by their `utils.movie_id`"""
+
+        def strings() -> StringColumn:
+            ends = reader.take(8 * rows, "Q")
+            return StringColumn(ends, reader.take(ends[-1] if rows else 0))
+
+        self._url_keys = strings()
+        self._title_keys = strings()
+        self._title_rows = reader.take(8 * rows, "Q")
+
+    def __repr__(self):
+        return f"<fzmovies_api.catalog.CatalogSnapshot movies={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> t.Iterator[MovieRecord]:
+        return iter(self.records)
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def __enter__(self) -> "CatalogSnapshot":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get(self, url: str) -> MovieRecord | None:
+        """Movie whose page is linked by `url` in any of its forms"""
+        key = movie_id(str(url))
+        row = bisect_left(self._url_keys, key)
+        if row < len(self) and self._url_keys[row] == key:
+            return self.records[row]
+        return None
+
+    def search_title(self, prefix: str, limit: int = 10) -> list[MovieRecord]:
+        """Movies whose titles start with `prefix`, in alphabetical order
+
+        Args:
+            prefix (str): Leading part of the title - case, accents and punctuation aside.
+            limit (int, optional): Movies not to exceed. Defaults to 10.
+
+        Returns:
+            list[MovieRecord]: Movies
+        """
+        key = normalize(prefix)
+        matches = []
+        for position in range(bisect_left(self._title_keys, key), len(self)):
+            if len(matches) >= limit or not self._title_keys[position].startswith(key):
+                break
+            matches.append(self.records[self._title_rows[position]])
+        return matches
+
+    def close(self):
+        """Unmap the snapshot"""
+        if self._mmap is None:
+            return
+        self.records = MovieRecords()
+        self._url_keys = self._title_keys = StringColumn()
+        self._title_rows = array("Q")
+        release(self._mmap, self._views)
+        self._mmap = None
@@ -2,11 +2,13 @@ from os import getcwd
 from sys import exit
 
 import click
-import rich
 
 from fzmovies_api import __repo__, __version__
-from fzmovies_api.hunter import Index
-from fzmovies_api.utils import file_index_quality_map
+from fzmovies_api.utils import (
+    category_options,
+    file_index_quality_map,
+    searchby_options,
+)
 
 movie_search_filters: tuple[str] = (
     "IMDBTop250",
@@ -32,19 +34,33 @@ def fzmovies():
 
 
 @click.command()
-@click.argument("query", required=True)
+@click.argument("query", required=False)
+@click.option(
+    "-i",
+    "--input",
+    help="File listing queries or movie page links to download, one per line."
+    " Incomplete files are resumed. '-' for stdin",
+    type=click.File("r"),
+)
+@click.option(
+    "-n",
+    "--workers",
+    help="Movie files downloaded at once from --input - 3",
+    type=click.IntRange(1),
+    default=3,
+)
 @click.option(
     "-s",
     "--searchby",
     help="Query search-by filter - Name",
-    type=click.Choice(Index.searchby_options),
+    type=click.Choice(searchby_options),
     default="Name",
 )
 @click.option(
     "-c",
     "--category",
     help="Query movie category - All",
-    type=click.Choice(Index.category_options),
+    type=click.Choice(category_options),
     default="All",
 )
 @click.option(
@@ -54,6 +70,27 @@ def fzmovies():
     type=click.Choice(list(file_index_quality_map.keys())),
     default="720p",
 )
+@click.option(
+    "-a",
+    "--at-least",
+    is_flag=True,
+    help="Take quality as the least and download the smallest file meeting it - False",
+)
+@click.option(
+    "--order",
+    help="Download order of --input entries, smallest file first for sjf - fifo",
+    type=click.Choice(["fifo", "sjf"]),
+    default="fifo",
+)
+@click.option(
+    "--window",
+    help="Hours available for downloading --input entries. Requires --bandwidth",
+    type=click.FloatRange(0, min_open=True),
+)
+@click.option(
+    "--bandwidth",
+    help="Expected download speed per second within --window i.e 5MB",
+)
 @click.option(
     "-o",
     "--output",
@@ -89,13 +126,42 @@ def fzmovies():
 @click.option(
     "-S", "--simple", is_flag=True, help="Show percentage and bar only in progressbar"
 )
+@click.option(
+    "-f",
+    "--fastest-link",
+    is_flag=True,
+    help="Probe download links and use the fastest - False",
+)
+@click.option(
+    "-w",
+    "--swarm",
+    is_flag=True,
+    help="Download from all working links at once - False",
+)
+@click.option(
+    "-l",
+    "--rate-limit",
+    help="Download speed cap per second i.e 2MB - unlimited",
+)
+@click.option(
+    "-H",
+    "--checksum",
+    help="Hash algorithm for checksumming the movie file as it downloads",
+    type=click.Choice(["md5", "sha1", "sha256", "sha512", "blake2b"]),
+)
 @click.option("-q", "--quiet", is_flag=True, help="Not to stdout anything - False")
 @click.option("-y", "--yes", is_flag=True, help="Okay to all prompts - False")
 def download(
     query: str,
+    input,
+    workers: int,
     searchby: str,
     category: str,
     quality: str,
+    at_least,
+    order,
+    window,
+    bandwidth,
     output,
     directory,
     chunk_size,
@@ -103,13 +169,55 @@ def download(
     trace,
     resume,
     simple,
+    fastest_link,
+    swarm,
+    rate_limit,
+    checksum,
     quiet,
     yes,
 ):
     """Perform search and download first movie in the search results"""
+    if input is not None:
+        if query is not None or output or swarm:
+            raise click.UsageError(
+                "QUERY, --output and --swarm cannot be used with --input"
+            )
+        if (window is None) != (bandwidth is None):
+            raise click.UsageError("--window and --bandwidth go together")
+        exit(
+            bulk_download(
+                input,
+                workers=workers,
+                quality=quality,
+                quality_floor=at_least,
+                order=order,
+                window=None if window is None else window * 3600,
+                bandwidth=bandwidth,
+                searchby=searchby,
+                category=category,
+                dir=directory,
+                checksum=checksum,
+                fastest_link=fastest_link,
+                progress_bar=quiet == False,
+                quiet=quiet,
+                chunk_size=chunk_size,
+                leave=trace,
+                colour=color,
+                simple=simple,
+                rate_limit=rate_limit,
+            )
+        )
+    if query is None:
+        raise click.UsageError("Missing argument 'QUERY' or option '--input'")
     from fzmovies_api import Auto
 
-    start = Auto(quality=quality, query=query, searchby=searchby, category=category)
+    start = Auto(
+        quality=quality,
+        query=query,
+        searchby=searchby,
+        category=category,
+        quality_floor=at_least,
+    )
     if yes:
         pass
     else:
@@ -119,7 +227,7 @@ def download(
         ):
             exit(0)
 
-    start.run(
+    saved = start.run(
         filename=output,
         dir=directory,
         chunk_size=chunk_size,
@@ -129,7 +237,57 @@ def download(
         leave=trace,
         colour=color,
         simple=simple,
+        rate_limit=rate_limit,
+        checksum=checksum,
+        probe_links=fastest_link,
+        swarm=swarm,
     )
+    if checksum and not quiet:
+        import rich
+
+        rich.print(f"{saved.algorithm} : {saved.digest}")
+
+
+def bulk_download(input, quiet: bool, checksum: str | None, **kwargs) -> int:
+    """Download movies of entries listed in `input` and show a summary.
+
+    Returns:
+        int: Exit code - 1 if any entry failed.
+    """
+    from fzmovies_api.bulk import BulkDownload, default_checksum, read_entries
+
+    entries = read_entries(input)
+    if not entries:
+        raise click.UsageError(f"No entries in '{input.name}'")
+
+    results = BulkDownload(
+        entries, checksum=checksum or default_checksum, **kwargs
+    ).run()
+
+    if not quiet:
+        import rich
+        from rich.table import Table
+
+        awesome_table = Table(show_lines=True, title="Bulk Download")
+        awesome_table.add_column("Entry", justify="left", style="cyan")
+        awesome_table.add_column("Status", justify="center")
+        awesome_table.add_column("Size (MB)", justify="right", style="yellow")
+        awesome_table.add_column("Time (s)", justify="right", style="yellow")
+        awesome_table.add_column("Path / Error", justify="left")
+        colours = {"downloaded": "green", "skipped": "blue", "failed": "red"}
+        for result in results:
+            awesome_table.add_row(
+                result.entry,
+                f"[{colours[result.status]}]{result.status}[/]",
+                str(round(result.size / 1_000_000, 1)) if result.size else "-",
+                str(result.elapsed),
+                result.error
+                if result.status == "failed"
+                else str(result.path or result.error),
+            )
+        rich.print(awesome_table)
+
+    return int(any(result.status == "failed" for result in results))
 
 
 class EntryGroup:
@@ -138,6 +296,10 @@ class EntryGroup:
     def support():
         """Provides helpful info such as FAQs and release formats"""
 
+    @fzmovies.group()
+    def bench():
+        """Measure performance against a local synthetic server"""
+
 class Support_:
     """Contains support info such as FAQs and release formats"""
 
@@ -145,6 +307,7 @@ class Support_:
     @click.command()
     def release_formats():
         """Show movie release formats and their descriptions"""
+        import rich
         from rich.table import Table
 
         from fzmovies_api import Support
@@ -166,6 +329,7 @@ class Support_:
     @click.command()
     def FAQs():
         """Show FAQs and their answers"""
+        import rich
         from rich.table import Table
 
         from fzmovies_api import Support
@@ -185,6 +349,192 @@ class Support_:
         rich.print(awesome_table)
 
 
+class Bench_:
+    """Contains performance benchmarks"""
+
+    @staticmethod
+    @click.command()
+    @click.option(
+        "-s",
+        "--size",
+        help="Synthetic movie file size in MB - 1024",
+        type=click.IntRange(1),
+        default=1024,
+    )
+    @click.option(
+        "-z",
+        "--chunk-size",
+        help="Chunk_size in KB to benchmark - 64, 256, 512, 1024, 4096",
+        type=click.IntRange(1),
+        multiple=True,
+    )
+    @click.option(
+        "-m",
+        "--mode",
+        help="Download mode to benchmark - all",
+        type=click.Choice(["single", "resumed", "swarm"]),
+        multiple=True,
+    )
+    @click.option(
+        "-p",
+        "--progress-bar",
+        help="Progressbar state to benchmark - both",
+        type=click.Choice(["on", "off", "both"]),
+        default="both",
+    )
+    @click.option(
+        "-r",
+        "--repeat",
+        help="Runs per combination - 1",
+        type=click.IntRange(1),
+        default=1,
+    )
+    @click.option(
+        "-n",
+        "--sources",
+        help="Links used in swarm mode - 4",
+        type=click.IntRange(1),
+        default=4,
+    )
+    @click.option(
+        "-d",
+        "--directory",
+        help="Directory for saving the synthetic downloads - tempdir",
+        type=click.Path(exists=True, file_okay=False),
+    )
+    @click.option(
+        "-o",
+        "--output",
+        help="Path to save the results in json format - fzmovies-bench.json",
+        type=click.Path(dir_okay=False, resolve_path=True, exists=False),
+        default="fzmovies-bench.json",
+    )
+    @click.option("-q", "--quiet", is_flag=True, help="Do not stdout formatted table.")
+    def download(
+        size, chunk_size, mode, progress_bar, repeat, sources, directory, output, quiet
+    ):
+        """Benchmark movie download throughput"""
+        import rich
+        from rich.table import Table
+
+        from fzmovies_api import bench
+
+        def show(result: dict):
+            if not quiet:
+                rich.print(
+                    f"{result['mode']:>8} | {result['chunk_size_kb']:>5}KB"
+                    f" | bar={'on ' if result['progress_bar'] else 'off'}"
+                    f" | {result['throughput_mb_s']:>8} MB/s"
+                    f" | cpu {result['cpu_percent']}%"
+                )
+
+        progress_bars = {"on": (True,), "off": (False,), "both": (False, True)}
+        results = bench.benchmark_download(
+            size=size,
+            chunk_sizes=chunk_size or bench.default_chunk_sizes,
+            modes=mode or bench.download_modes,
+            progress_bars=progress_bars[progress_bar],
+            repeat=repeat,
+            sources=sources,
+            dir=directory,
+            on_result=show,
+        )
+        saved_to = bench.save_results(results, output)
+
+        if not quiet:
+            awesome_table = Table(
+                show_lines=True, title=f"Download Benchmark ({size} MB)"
+            )
+            for column in (
+                "Mode",
+                "Chunk (KB)",
+                "Progressbar",
+                "MB/s",
+                "CPU %",
+                "Read syscalls",
+                "Write syscalls",
+            ):
+                awesome_table.add_column(column, justify="center", style="cyan")
+            for result in results["results"]:
+                awesome_table.add_row(
+                    result["mode"],
+                    str(result["chunk_size_kb"]),
+                    "on" if result["progress_bar"] else "off",
+                    str(result["throughput_mb_s"]),
+                    str(result["cpu_percent"]),
+                    str(result["read_syscalls"]),
+                    str(result["write_syscalls"]),
+                )
+            rich.print(awesome_table)
+            rich.print(f"Results saved to '{saved_to}'")
+
+
+def stream_jsonl(
+    search,
+    search_str: str,
+    output,
+    limit: int,
+    resume: bool,
+    quiet: bool,
+    prefetch: int = 0,
+):
+    """Write movies of `search` as JSON Lines while they are parsed.
+    Page progress goes to stderr. With `prefetch`, whole pages are
+    fetched ahead in the background instead."""
+    from fzmovies_api import Search, models
+    from fzmovies_api.export import JSONLinesExport
+    from fzmovies_api.filters import SearchNavigatorFilter
+
+    with JSONLinesExport(output, search_str, resume=resume) as export:
+        if export.is_complete:
+            if not quiet:
+                click.echo(
+                    f"Crawl already complete with {export.total} movies written",
+                    err=True,
+                )
+            return
+        if export.is_resumed:
+            if export.next_page is None:
+                export.finish()
+                return
+            search = Search(
+                SearchNavigatorFilter(
+                    models.SearchResults(movies=[], next_page=export.next_page)
+                )
+            )
+            if not quiet:
+                click.echo(
+                    f"Resuming from page {export.page_no + 1} "
+                    f"with {export.total} movies written",
+                    err=True,
+                )
+
+        def end_page(next_page):
+            export.end_page(next_page)
+            if not quiet and export.path is not None:
+                click.echo(
+                    f"Page {export.page_no} - {export.total} movies written", err=True
+                )
+
+        if prefetch:
+            for results in search.get_all_results(
+                stream=True, limit=limit - export.total, prefetch=prefetch
+            ):
+                for movie in results.movies:
+                    export.write_movie(movie)
+                end_page(results.next_page)
+        else:
+            while True:
+                for movie in search.stream_results():
+                    export.write_movie(movie)
+                next_page = search.latest_results.next_page
+                end_page(next_page)
+                if not next_page or export.total >= limit:
+                    break
+                search = search.next()
+        export.finish()
+
+
 class Search:
     """Discover movies"""
 
@@ -215,7 +565,7 @@ class Search:
     @click.option(
         "-o",
         "--output",
-        help="Path to save the results in json format.",
+        help="Path to save the results in json/jsonl format.",
         type=click.Path(dir_okay=False, resolve_path=True, exists=False),
     )
     @click.option("-v", "--value", help="Filter argument value if needed")
@@ -226,8 +576,41 @@ class Search:
         help="Maximum number of movies to be listed - 1_000_000",
         default=1_000_000,
     )
+    @click.option(
+        "-F",
+        "--format",
+        "output_format",
+        help="Output format. jsonl streams movies to --output or stdout - json",
+        type=click.Choice(["json", "jsonl"]),
+        default="json",
+    )
+    @click.option(
+        "-r",
+        "--resume",
+        is_flag=True,
+        help="Resume interrupted jsonl crawl from the last written page",
+    )
+    @click.option(
+        "-p",
+        "--prefetch",
+        type=click.IntRange(0),
+        help="Pages fetched ahead while the current one is listed - 2, "
+        "0 for jsonl which writes movies as they are parsed",
+    )
     @click.option("-q", "--quiet", is_flag=True, help="Do not stdout formatted table.")
-    def discover(query, by, category, filter, output, value, limit, quiet):
+    def discover(
+        query,
+        by,
+        category,
+        filter,
+        output,
+        value,
+        limit,
+        output_format,
+        resume,
+        prefetch,
+        quiet,
+    ):
         """Explore movies by query or filter"""
         from fzmovies_api import Search
         from fzmovies_api.filters import (
@@ -257,6 +640,7 @@ class Search:
                     MovieTagFilter,
                     MostDownloadedFilter,
                 ),
+                strict=True,
             )
         )
 
@@ -291,13 +675,22 @@ class Search:
             raise RuntimeError(
                 "A search query/filter is required. Check usage message for more info."
             )
+        search_str = f"{query or filter}{ '('+value+')' if value else ''}"
+        if prefetch is None:
+            # Fetching ahead goes by whole pages, jsonl by movies
+            prefetch = 0 if output_format == "jsonl" else 2
+        if output_format == "jsonl":
+            return stream_jsonl(
+                search, search_str, output, limit, resume, quiet, prefetch
+            )
+        assert not resume, "Only jsonl crawls can be resumed. Use -F/--format jsonl."
+
         import rich
         from rich.table import Table
 
         page_no = total = 0
         results_cache: list[dict[str, str | int]] = []
-        search_str = f"{query or filter}{ '('+value+')' if value else ''}"
-        for s in search.get_all_results(stream=True, limit=limit):
+        for s in search.get_all_results(stream=True, limit=limit, prefetch=prefetch):
             page_no += 1  # noqa: SIM113
             awesome_table = Table(
                 show_lines=True,
@@ -345,6 +738,7 @@ def main():
         fzmovies.add_command(Search.discover)
         EntryGroup.support.add_command(Support_.release_formats)
         EntryGroup.support.add_command(Support_.FAQs)
+        EntryGroup.bench.add_command(Bench_.download)
         fzmovies()
 
     except Exception as e:  # noqa: BLE001
@@ -0,0 +1,245 @@
+"""
+This module crawls every movie listing of the site.
+
+The filter space - each filter class against its genres, ranges,
+award categories, years and movie categories - is enumerated into
+listings whose pages are fetched across a pool of workers. A listing's
+pages follow one another while the listings themselves proceed concurrently.
+
+Movies are handed to a sink once, regardless of how many listings
+they appear in. Progress is checkpointed to a json file - and movies
+seen to a `dedup.DedupIndex` file alongside it - so that an interrupted
+crawl proceeds from where it stopped; pages fetched after the last
+checkpoint are fetched again, so sinks may see a movie twice across
+an interruption.
+
+```python
+from fzmovies_api.crawler import FilterCrawler
+
+crawler = FilterCrawler(workers=8, checkpoint="crawl.checkpoint")
+crawler.run(lambda movie: print(movie.title))
+```
+"""
+
+import json
+import typing as t
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from fzmovies_api import errors, hunter, models
+from fzmovies_api.dedup import DedupIndex
+from fzmovies_api.export import write_json_atomically
+from fzmovies_api.filters import (
+    AlphabeticalOrderFilter,
+    FilterBase,
+    IMDBTop250Filter,
+    MostDownloadedFilter,
+    MovieGenreFilter,
+    OscarsFilter,
+    RecentlyPublishedFilter,
+    RecentlyReleasedFilter,
+    ReleaseYearFilter,
+)
+from fzmovies_api.utils import canonical_url, category_id_map
+
+
+class _PageFilter(FilterBase):
+    """Any page of a listing"""
+
+    init_with_category = False
+
+    def __init__(self, url: str):
+        self.url = str(url)
+
+
+def filter_space(
+    categories: t.Iterable[str] = tuple(category_id_map),
+    years: t.Iterable[int] | None = None,
+) -> t.Iterator[FilterBase]:
+    """Filters of every movie listing of the site.
+    `MovieTagFilter` is left out since tags are open-ended.
+
+    Args:
+        categories (t.Iterable[str], optional): Movie categories. Defaults to all of them.
+        years (t.Iterable[int] | None, optional): Release years. Defaults to
+          `ReleaseYearFilter.available_years()`.
+
+    Yields:
+        FilterBase: Filter of a listing.
+    """
+    categories = tuple(categories)
+    yield IMDBTop250Filter()
+    for category in OscarsFilter.categories:
+        yield OscarsFilter(category)
+    for category in categories:
+        yield MostDownloadedFilter(category)
+        yield RecentlyReleasedFilter(category)
+        yield RecentlyPublishedFilter(category)
+        for letters in AlphabeticalOrderFilter.available_ranges:
+            yield AlphabeticalOrderFilter(letters, category)
+        for genre in MovieGenreFilter.available_genres:
+            yield MovieGenreFilter(genre, category)
+        for year in years or ReleaseYearFilter.available_years():
+            yield ReleaseYearFilter(year, category)
+
+
+class FilterCrawler:
+    """Crawls pages of many listings concurrently"""
+
+    def __init__(
+        self,
+        listings: t.Iterable[FilterBase] | None = None,
+        workers: int = 8,
+        checkpoint: Path | str | None = None,
+        checkpoint_every: int = 20,
+        seen: DedupIndex | None = None,
+    ):
+        """Initializes `FilterCrawler`
+
+        Args:
+            listings (t.Iterable[FilterBase] | None, optional): Filters to crawl. Defaults to `filter_space()`.
+            workers (int, optional): Pages fetched at once. Defaults to 8.
+            checkpoint (Path | str | None, optional): File to keep progress in. Defaults to None.
+            checkpoint_every (int, optional): Pages between checkpoints. Defaults to 20.
+            seen (DedupIndex | None, optional): Movies not to be sunk, i.e from earlier
+              crawls - those sunk are added. Defaults to the checkpointed ones if any.
+        """
+        assert workers > 0, "workers must be greater than 0"
+        assert checkpoint_every > 0, "checkpoint_every must be greater than 0"
+        self.listings = list(filter_space() if listings is None else listings)
+        self.workers = workers
+        self.checkpoint = None if checkpoint is None else Path(checkpoint)
+        self.checkpoint_every = checkpoint_every
+        self.stats: Counter[str] = Counter()
+        """Number of `pages`, `movies` sunk, `duplicates`, `listings` completed & `failed`"""
+        self.failures: dict[str, Exception] = {}
+        """Listings and the exception that stopped them"""
+        self.completed: set[str] = set()
+        """Listings crawled to the last page"""
+        self.pending: dict[str, str] = {}
+        """Listings and the page to proceed from"""
+        self.seen = seen
+        """Movies sunk"""
+        self._load_checkpoint()
+        if self.seen is None:
+            self.seen = DedupIndex()
+
+    def __repr__(self):
+        return (
+            f"<fzmovies_api.crawler.FilterCrawler listings={len(self.listings)},"
+            f"workers={self.workers}>"
+        )
+
+    @property
+    def seen_file(self) -> Path | None:
+        """Checkpointed movies sunk"""
+        if self.checkpoint is None:
+            return None
+        return self.checkpoint.with_name(self.checkpoint.name + ".seen")
+
+    def _load_checkpoint(self):
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return
+        state = json.loads(self.checkpoint.read_text())
+        self.completed = set(state["completed"])
+        self.pending = state["pending"]
+        checkpointed = DedupIndex.load(self.seen_file)
+        if self.seen is None:
+            self.seen = checkpointed
+        else:
+            self.seen.merge(checkpointed)
+
+    def save_checkpoint(self):
+        """Record progress of the crawl"""
+        if self.checkpoint is None:
+            return
+        # Movies seen must never get ahead of the pages checkpointed - those
+        # of a page fetched again would be taken for duplicates and lost
+        write_json_atomically(
+            self.checkpoint,
+            {"completed": sorted(self.completed), "pending": self.pending},
+        )
+        self.seen.save(self.seen_file)
+
+    def fetch(self, url: str) -> models.SearchResults | None:
+        """Movies listed in page `url`. None for an empty listing."""
+        try:
+            return _PageFilter(url).get_results()
+        except errors.ZeroSearchResults:
+            return None
+
+    def run(
+        self, sink: t.Callable[[models.MovieInSearch], None]
+    ) -> Counter[str]:
+        """Crawl the listings to their last pages
+
+        Args:
+            sink (t.Callable[[models.MovieInSearch], None]): Receives every movie once.
+              It is called from the calling thread only.
+
+        Returns:
+            Counter[str]: `stats`
+        """
+        for listing in self.listings:
+            key = canonical_url(listing.url)
+            if key not in self.completed:
+                self.pending.setdefault(key, str(listing.url))
+
+        hunter.Index.initialize_session()
+        hunter.ensure_pool_size(self.workers)
+        pages_since_checkpoint = 0
+        in_flight: dict[Future, tuple[str, str]] = {}
+
+        with ThreadPoolExecutor(
+            self.workers, thread_name_prefix="fzmovies-crawl"
+        ) as pool:
+            try:
+                for key, url in self.pending.items():
+                    in_flight[pool.submit(self.fetch, url)] = (key, url)
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key, url = in_flight.pop(future)
+                        try:
+                            results = future.result()
+                        except Exception as e:  # noqa: BLE001
+                            # Left pending to be retried on resume
+                            self.failures[key] = e
+                            self.stats["failed"] += 1
+                            continue
+
+                        self.stats["pages"] += 1
+                        for movie in results.movies if results else ():
+                            if not self.seen.add(movie.url):
+                                self.stats["duplicates"] += 1
+                                continue
+                            self.stats["movies"] += 1
+                            sink(movie)
+
+                        next_page = results and results.next_page
+                        if next_page and canonical_url(next_page) != canonical_url(url):
+                            self.pending[key] = str(next_page)
+                            in_flight[pool.submit(self.fetch, str(next_page))] = (
+                                key,
+                                str(next_page),
+                            )
+                        else:
+                            del self.pending[key]
+                            self.completed.add(key)
+                            self.stats["listings"] += 1
+
+                        pages_since_checkpoint += 1
+                        if pages_since_checkpoint >= self.checkpoint_every:
+                            self.save_checkpoint()
+                            pages_since_checkpoint = 0
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                self.save_checkpoint()
+
+        if self.checkpoint is not None and not self.pending:
+            self.checkpoint.unlink(missing_ok=True)
+            self.seen_file.unlink(missing_ok=True)
+        return self.stats
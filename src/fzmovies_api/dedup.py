@@ -0,0 +1,186 @@
+"""
+This module keeps track of movies already seen.
+
+Movies are identified by `utils.movie_id` - so that the many forms of a
+link to the same movie page agree - and only a 64-bit fingerprint of the
+id is kept, in an open-addressing table of a flat integer array. That
+takes tens of bytes per movie against hundreds for a set of urls. Two
+movies sharing a fingerprint is improbable (about 1 in 10^7 for a million
+movies) and would only hide the latter.
+
+The index can be saved to disk so that deduplication holds across runs.
+
+```python
+from fzmovies_api.dedup import DedupIndex
+
+seen = DedupIndex.load("movies.seen")
+if seen.add(movie.url):
+    print("New movie", movie.title)
+seen.save("movies.seen")
+```
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import threading
+import typing as t
+from array import array
+from pathlib import Path
+
+from fzmovies_api.utils import movie_id
+
+magic = b"FZDEDUP1"
+"""Leading bytes of index files"""
+
+header = struct.Struct("<8sQ")
+"""Magic and the number of fingerprints that follow"""
+
+max_load = 0.5
+"""Fraction of the table filled before it is doubled"""
+
+
+def fingerprint(url: str) -> int:
+    """64-bit fingerprint of the movie linked by `url` - never 0"""
+    digest = hashlib.blake2b(movie_id(url).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class DedupIndex:
+    """Thread-safe set of movies seen"""
+
+    def __init__(self, urls: t.Iterable[str] = (), capacity: int = 1024):
+        """Initializes `DedupIndex`
+
+        Args:
+            urls (t.Iterable[str], optional): Links to movie pages seen. Defaults to ().
+            capacity (int, optional): Slots to begin with - rounded up to a power of 2. Defaults to 1024.
+        """
+        assert capacity > 0, "capacity must be greater than 0"
+        self._table = array("Q", bytes(8 * (1 << (capacity - 1).bit_length())))
+        self._count = 0
+        self._lock = threading.Lock()
+        self.update(urls)
+
+    def __repr__(self):
+        return f"<fzmovies_api.dedup.DedupIndex movies={len(self)},size={self.size}>"
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint_ = fingerprint(str(url))
+        with self._lock:
+            return self._table[self._slot(self._table, fingerprint_)] != 0
+
+    @property
+    def size(self) -> int:
+        """Memory taken by the table in bytes"""
+        return self._table.itemsize * len(self._table)
+
+    @staticmethod
+    def _slot(table: array, fingerprint_: int) -> int:
+        """Slot holding `fingerprint_` or the empty one it belongs in"""
+        mask = len(table) - 1
+        slot = fingerprint_ & mask
+        while table[slot] not in (0, fingerprint_):
+            slot = (slot + 1) & mask
+        return slot
+
+    def _insert(self, fingerprint_: int) -> bool:
+        slot = self._slot(self._table, fingerprint_)
+        if self._table[slot]:
+            return False
+        self._table[slot] = fingerprint_
+        self._count += 1
+        if self._count > len(self._table) * max_load:
+            self._grow()
+        return True
+
+    def _grow(self):
+        table = array("Q", bytes(16 * len(self._table)))
+        for fingerprint_ in self._table:
+            if fingerprint_:
+                table[self._slot(table, fingerprint_)] = fingerprint_
+        self._table = table
+
+    def add(self, url: str) -> bool:
+        """Mark movie linked by `url` as seen
+
+        Args:
+            url (str): Link to the movie page.
+
+        Returns:
+            bool: True if it had not been seen.
+        """
+        fingerprint_ = fingerprint(str(url))
+        with self._lock:
+            return self._insert(fingerprint_)
+
+    def update(self, urls: t.Iterable[str]) -> int:
+        """Mark movies linked by `urls` as seen
+
+        Returns:
+            int: Movies that had not been seen.
+        """
+        fingerprints = [fingerprint(str(url)) for url in urls]
+        with self._lock:
+            return sum(self._insert(fingerprint_) for fingerprint_ in fingerprints)
+
+    def merge(self, other: "DedupIndex") -> int:
+        """Mark movies seen in `other` as seen
+
+        Returns:
+            int: Movies that had not been seen.
+        """
+        fingerprints = other.fingerprints()
+        with self._lock:
+            return sum(self._insert(fingerprint_) for fingerprint_ in fingerprints)
+
+    def fingerprints(self) -> array:
+        """Fingerprints in the index - sorted"""
+        with self._lock:
+            return array("Q", sorted(filter(None, self._table)))
+
+    def save(self, path: Path | str):
+        """Write the index to `path` without leaving it half-written"""
+        path = Path(path)
+        fingerprints = self.fingerprints()
+        if sys.byteorder == "big":
+            fingerprints.byteswap()
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as fh:
+            fh.write(header.pack(magic, len(fingerprints)))
+            fingerprints.tofile(fh)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Path | str, missing_ok: bool = True) -> "DedupIndex":
+        """Read index saved by `save`
+
+        Args:
+            path (Path | str): Index file.
+            missing_ok (bool, optional): Start afresh if the file does not exist. Defaults to True.
+
+        Raises:
+            ValueError: `path` is not an index file.
+
+        Returns:
+            DedupIndex: Index
+        """
+        path = Path(path)
+        if missing_ok and not path.exists():
+            return cls()
+        with open(path, "rb") as fh:
+            leading, count = header.unpack(fh.read(header.size))
+            if leading != magic:
+                raise ValueError(f"'{path}' is not a dedup index file")
+            fingerprints = array("Q")
+            fingerprints.fromfile(fh, count)
+        if sys.byteorder == "big":
+            fingerprints.byteswap()
+        index = cls(capacity=max(1024, int(count / max_load) + 1))
+        for fingerprint_ in fingerprints:
+            index._insert(fingerprint_)
+        return index
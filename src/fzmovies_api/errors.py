@@ -35,4 +35,36 @@ class TargetPageURLNotFound(FzmoviesAPIException):
 
 
 class DownloadError(FzmoviesAPIException):
-    """failed to download file for some reasons"""
\ No newline at end of file
+    """failed to download file for some reasons"""
+
+
+class InsufficientStorage(DownloadError):
+    """Disk has no room for the file to be downloaded"""
+
+
+class IntegrityError(DownloadError):
+    """Downloaded contents do not match the expected size"""
+
+
+class ExtractionError(FzmoviesAPIException):
+    """Page markup does not match what the extractor expects"""
+
+    def __init__(self, page: str, field: str, selector: str | None):
+        """Initializer
+
+        Args:
+            page (str): Name of the page spec.
+            field (str): Dotted path to the field that failed.
+            selector (str | None): Css selector that matched nothing.
+        """
+        super().__init__(
+            f"Failed to extract '{field}' from {page} page - "
+            f"selector '{selector}' matched nothing"
+        )
+        self.page = page
+        self.field = field
+        self.selector = selector
+
+
+class ImageFetchError(FzmoviesAPIException):
+    """Image could not be fetched or the response is not an image"""
@@ -0,0 +1,151 @@
+"""
+This module streams movies to JSON Lines (NDJSON) files.
+
+Movies are written as soon as they are parsed and the file is
+flushed at the end of every page, when a checkpoint sidecar
+- `<file>.checkpoint` - records where the crawl should proceed from.
+An interrupted crawl can thus be resumed from the last complete page.
+"""
+
+import json
+import os
+import sys
+import typing as t
+from pathlib import Path
+
+from fzmovies_api import errors, models
+
+
+def checkpoint_file(path: Path | str) -> Path:
+    """Path to the checkpoint sidecar of `path`"""
+    path = Path(path)
+    return path.with_name(path.name + ".checkpoint")
+
+
+def write_json_atomically(path: Path, contents: dict):
+    """Replace `path` with json `contents` without leaving it half-written"""
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w") as fh:
+        json.dump(contents, fh)
+    os.replace(temporary, path)
+
+
+class JSONLinesExport:
+    """Writes movies of a crawl as JSON Lines, checkpointing every page"""
+
+    def __init__(
+        self,
+        path: Path | str | None,
+        search: str,
+        resume: bool = False,
+        stream: t.TextIO | None = None,
+    ):
+        """Initializes `JSONLinesExport`
+
+        Args:
+            path (Path | str | None): File to write to. None or `-` for `stream`.
+            search (str): Identity of the crawl - resumes must match it.
+            resume (bool, optional): Proceed from the checkpoint if any. Defaults to False.
+            stream (t.TextIO | None, optional): Where to write without a file. Defaults to stdout.
+
+        Raises:
+            errors.FzmoviesAPIException: Checkpoint belongs to a different crawl.
+        """
+        self.search = search
+        self.path = None if path in (None, "-") else Path(path)
+        self.page_no = 0
+        """Pages completely written"""
+        self.total = 0
+        """Movies completely written"""
+        self.next_page: str | None = None
+        """Page to proceed from when resuming"""
+        self._movies_in_page = 0
+        self.is_complete = False
+        """Resumed crawl had already finished - there is nothing to write"""
+
+        if self.path is None:
+            assert not resume, "Only crawls written to a file can be resumed"
+            self._fh = stream or sys.stdout
+            return
+
+        self.checkpoint = checkpoint_file(self.path)
+        offset = 0
+        if resume and self.checkpoint.exists():
+            state = json.loads(self.checkpoint.read_text())
+            if state["search"] != search:
+                raise errors.FzmoviesAPIException(
+                    f"Checkpoint '{self.checkpoint}' is for search "
+                    f"'{state['search']}' not '{search}'"
+                )
+            self.page_no = state["page"]
+            self.total = state["total"]
+            self.next_page = state["next_page"]
+            offset = state["offset"]
+        elif resume and self.path.exists():
+            # Finished crawls leave no checkpoint behind. Their export is kept as is.
+            self.is_complete = True
+            with open(self.path, encoding="utf-8") as fh:
+                self.total = sum(1 for _ in fh)
+        else:
+            self.checkpoint.unlink(missing_ok=True)
+
+        self._fh = open(
+            self.path, "a" if offset or self.is_complete else "w", encoding="utf-8"
+        )
+        if offset:
+            # Drop movies of the page that was being written
+            self._fh.truncate(offset)
+            self._fh.seek(offset)
+
+    def __enter__(self) -> "JSONLinesExport":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def is_resumed(self) -> bool:
+        """Proceeding from a checkpoint"""
+        return self.page_no > 0
+
+    def write_movie(self, movie: models.MovieInSearch):
+        """Write a movie as a single line"""
+        assert not self.is_complete, "The crawl has already been exported"
+        self._fh.write(json.dumps(movie.model_dump(mode="json")) + "\n")
+        self._movies_in_page += 1
+
+    def end_page(self, next_page: str | None):
+        """Flush movies of the page and checkpoint the crawl
+
+        Args:
+            next_page (str | None): Link to the page that follows.
+        """
+        self._fh.flush()
+        self.page_no += 1
+        self.total += self._movies_in_page
+        self._movies_in_page = 0
+        self.next_page = str(next_page) if next_page else None
+        if self.path is not None:
+            write_json_atomically(
+                self.checkpoint,
+                {
+                    "search": self.search,
+                    "page": self.page_no,
+                    "total": self.total,
+                    "next_page": self.next_page,
+                    "offset": self._fh.tell(),
+                },
+            )
+
+    def finish(self):
+        """Mark the crawl as complete - there is nothing to resume"""
+        self.close()
+        if self.path is not None:
+            self.checkpoint.unlink(missing_ok=True)
+
+    def close(self):
+        """Close the file leaving the checkpoint in place"""
+        if self.path is not None and not self._fh.closed:
+            self._fh.close()
+        elif self.path is None:
+            self._fh.flush()
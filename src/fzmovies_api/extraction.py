@@ -0,0 +1,309 @@
+"""
+This module provides a small declarative engine
+for extracting data from html pages.
+
+A page is described once as a `Spec` - named `Field`s made of
+css selectors plus transforms. Selectors are compiled on first use
+and the top-level ones are all matched in a single walk over the document.
+Fields that match nothing raise `errors.ExtractionError` naming
+the failing field & selector instead of breaking silently.
+
+A spec may have a fast path - a function pulling the same fields
+straight from the raw contents. Its output is checked against the
+fields and the document tree is only built when it declines or mismatches.
+"""
+
+import re
+import threading
+import typing as t
+from collections import Counter
+
+from fzmovies_api import errors, logger, utils
+
+if t.TYPE_CHECKING:
+    from bs4 import Tag
+
+tag_name_pattern = re.compile(r"^[a-zA-Z][\w-]*")
+"""Leading tag name of the last compound selector"""
+
+fast_paths_enabled = True
+"""Try fast paths of specs before building the document tree"""
+
+
+class Field:
+    """Value of a page element located by a css selector"""
+
+    def __init__(
+        self,
+        selector: str | None = None,
+        attr: str | None = None,
+        fields: dict[str, "Field"] | None = None,
+        many: bool = False,
+        index: int = 0,
+        limit: int | None = None,
+        required: bool = True,
+        default: t.Any = None,
+        transform: t.Callable[[t.Any], t.Any] | None = None,
+    ):
+        """Initializes `Field`
+
+        Args:
+            selector (str | None, optional): Css selector relative to the parent field.
+                Defaults to None - the parent element itself.
+            attr (str | None, optional): Attribute to be extracted. Defaults to None - stripped text.
+            fields (dict[str, Field] | None, optional): Sub-fields making up a dict value. Defaults to None.
+            many (bool, optional): Extract every match as a list. Defaults to False.
+            index (int, optional): Match to be extracted when not `many`. Defaults to 0 - first match.
+            limit (int | None, optional): Matches to be considered. Defaults to None - all.
+            required (bool, optional): Raise `ExtractionError` when there is no match
+                or the attribute is missing. Defaults to True.
+            default (t.Any, optional): Value of optional field without a match. Defaults to None.
+            transform (t.Callable[[t.Any], t.Any] | None, optional): Applied to every extracted value. Defaults to None.
+        """
+        assert not (attr and fields), "Field can either extract an attribute or sub-fields"
+        assert not (many and index), "Index applies to single-value fields only"
+        self.selector = selector
+        self.attr = attr
+        self.fields = fields
+        self.many = many
+        self.index = index
+        self.limit = limit
+        self.required = required
+        self.default = default
+        self.transform = transform
+        self._compiled = None
+        self._tag_name: str | None = None
+
+    def __repr__(self):
+        return f"<fzmovies_api.extraction.Field selector='{self.selector}'>"
+
+    def compile(self):
+        """Compile selectors of this field and its sub-fields"""
+        if self.selector is not None:
+            import soupsieve
+
+            self._compiled = soupsieve.compile(self.selector)
+            # Attribute values & pseudo-class arguments may contain combinators
+            bare_selector = re.sub(r"\[[^\]]*\]|\([^)]*\)", "", self.selector.strip())
+            last_compound = re.split(r"[\s>+~]+", bare_selector)[-1]
+            tag_name = tag_name_pattern.match(last_compound)
+            self._tag_name = tag_name.group().lower() if tag_name else None
+        for field in (self.fields or {}).values():
+            field.compile()
+
+    def matches(self, element: "Tag") -> bool:
+        """Check whether `element` is matched by the selector"""
+        if self._tag_name is not None and element.name != self._tag_name:
+            return False
+        return self._compiled.match(element)
+
+    @property
+    def matches_needed(self) -> int | None:
+        """Matches after which looking further is pointless - None for all"""
+        if self.many or self.index < 0:
+            return self.limit
+        return self.index + 1 if self.limit is None else min(self.index + 1, self.limit)
+
+    def find(self, scope: "Tag") -> list["Tag"]:
+        """Elements within `scope` matched by the selector"""
+        if self.selector is None:
+            return [scope]
+        return self._compiled.select(scope, limit=self.matches_needed or 0)
+
+    def extract(self, scope: "Tag", page: str, path: str) -> t.Any:
+        """Extract value of the field within `scope`
+
+        Args:
+            scope (Tag): Parent element.
+            page (str): Name of the page spec - for error reporting.
+            path (str): Dotted path to the field - for error reporting.
+        """
+        return self.collect(self.find(scope), page, path)
+
+    def collect(self, elements: list["Tag"], page: str, path: str) -> t.Any:
+        """Extract value of the field from its matched elements"""
+        if self.limit is not None:
+            elements = elements[: self.limit]
+        if self.many:
+            return [
+                self.value(element, page, f"{path}[{index}]")
+                for index, element in enumerate(elements)
+            ]
+        try:
+            element = elements[self.index]
+        except IndexError:
+            if self.required:
+                raise errors.ExtractionError(page, path, self.selector) from None
+            return self.default
+        return self.value(element, page, path)
+
+    def value(self, element: "Tag", page: str, path: str) -> t.Any:
+        """Extract value of the field from a single matched element"""
+        if self.fields is not None:
+            value = {
+                name: field.extract(element, page, f"{path}.{name}")
+                for name, field in self.fields.items()
+            }
+        elif self.attr is not None:
+            value = element.get(self.attr)
+            if value is None:
+                if self.required:
+                    raise errors.ExtractionError(
+                        page, path, f"{self.selector or ''}[{self.attr}]"
+                    )
+                return self.default
+        else:
+            value = element.get_text().strip()
+        return self.transform(value) if self.transform else value
+
+    def conforms(self, value: t.Any) -> bool:
+        """Check whether raw `value`, extracted without the document tree,
+        has the shape of this field i.e str, dict of sub-fields, list or None"""
+        if self.many:
+            return isinstance(value, list) and all(
+                self._conforms_single(item) for item in value
+            )
+        if value is None:
+            return not self.required
+        return self._conforms_single(value)
+
+    def _conforms_single(self, value: t.Any) -> bool:
+        if self.fields is None:
+            return isinstance(value, str)
+        return (
+            isinstance(value, dict)
+            and value.keys() == self.fields.keys()
+            and all(field.conforms(value[name]) for name, field in self.fields.items())
+        )
+
+    def finish(self, value: t.Any) -> t.Any:
+        """Apply transforms and defaults to raw `value` extracted without the document tree"""
+        if self.many:
+            return [self._finish_single(item) for item in value]
+        if value is None:
+            return self.default
+        return self._finish_single(value)
+
+    def _finish_single(self, value: t.Any) -> t.Any:
+        if self.fields is not None:
+            value = {
+                name: field.finish(value[name]) for name, field in self.fields.items()
+            }
+        return self.transform(value) if self.transform else value
+
+
+class Spec:
+    """Fields to be extracted from a page type"""
+
+    def __init__(
+        self,
+        name: str,
+        fields: dict[str, Field],
+        transform: t.Callable[[dict[str, t.Any]], t.Any] | None = None,
+        fast_path: t.Callable[[str], dict[str, t.Any] | None] | None = None,
+    ):
+        """Initializes `Spec`
+
+        Args:
+            name (str): Page type name.
+            fields (dict[str, Field]): Top-level fields located from the document root.
+            transform (t.Callable[[dict[str, t.Any]], t.Any] | None, optional): Makes
+                final value from the extracted fields. Defaults to None.
+            fast_path (t.Callable[[str], dict[str, t.Any] | None] | None, optional): Extracts
+                raw fields - untransformed, None for no match - without building the
+                document tree, returning None to decline. Defaults to None.
+        """
+        assert all(field.selector for field in fields.values()), (
+            "Top-level fields require a selector"
+        )
+        self.name = name
+        self.fields = fields
+        self.transform = transform
+        self.fast_path = fast_path
+        self.stats: Counter[str] = Counter()
+        """Pages extracted through the `fast` path or its `fallback`"""
+        self._compiled = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<fzmovies_api.extraction.Spec name='{self.name}'>"
+
+    def compile(self):
+        """Compile all the selectors once"""
+        if not self._compiled:
+            with self._lock:
+                if not self._compiled:
+                    for field in self.fields.values():
+                        field.compile()
+                    self._compiled = True
+
+    def extract(self, contents: str) -> t.Any:
+        """Extract fields from html contents
+
+        Args:
+            contents (str): Html formatted data.
+
+        Raises:
+            errors.ExtractionError: A required field matched nothing.
+
+        Returns:
+            t.Any: Extracted fields or value made by `transform`.
+        """
+        values = None
+        if self.fast_path is not None and fast_paths_enabled:
+            values = self._extract_fast(contents)
+        if values is None:
+            values = self._extract_tree(contents)
+        return self.transform(values) if self.transform else values
+
+    def _extract_fast(self, contents: str) -> dict[str, t.Any] | None:
+        try:
+            values = self.fast_path(contents)
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Fast path of {self.name} page failed - {e}")
+            values = None
+        if values is not None:
+            if values.keys() == self.fields.keys() and all(
+                field.conforms(values[name]) for name, field in self.fields.items()
+            ):
+                values = {
+                    name: field.finish(values[name])
+                    for name, field in self.fields.items()
+                }
+            else:
+                logger.debug(f"Fast path of {self.name} page extracted mismatching fields")
+                values = None
+        with self._lock:
+            self.stats["fast" if values is not None else "fallback"] += 1
+        return values
+
+    def _extract_tree(self, contents: str) -> dict[str, t.Any]:
+        self.compile()
+        soup = utils.souper(contents)
+        matched: dict[str, list[Tag]] = {name: [] for name in self.fields}
+        pending = [
+            (name, field, field.matches_needed) for name, field in self.fields.items()
+        ]
+
+        for element in soup.descendants:
+            if element.name is None:
+                # Text & comments
+                continue
+            satisfied = False
+            for name, field, needed in pending:
+                if field.matches(element):
+                    matched[name].append(element)
+                    satisfied = satisfied or len(matched[name]) == needed
+            if satisfied:
+                pending = [
+                    (name, field, needed)
+                    for name, field, needed in pending
+                    if len(matched[name]) != needed
+                ]
+                if not pending:
+                    break
+
+        return {
+            name: field.collect(matched[name], self.name, name)
+            for name, field in self.fields.items()
+        }
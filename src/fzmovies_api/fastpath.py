@@ -0,0 +1,154 @@
+"""
+This module extracts fields of the highest-volume pages
+straight from the raw html using precompiled patterns,
+sparing the cost of building a document tree.
+
+Extractors return the same raw fields as the respective `extraction.Spec`
+- before transforms - or None whenever the markup is not exactly what they expect, leaving
+the page to the BeautifulSoup path.
+"""
+
+import re
+import typing as t
+from html import unescape
+
+div_tag_pattern = re.compile(r"<(/?)div\b([^>]*)>", re.IGNORECASE)
+class_pattern = re.compile(
+    r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE
+)
+title_pattern = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+anchor_pattern = re.compile(r"<a\b([^>]*)>(.*?)</a\s*>", re.IGNORECASE | re.DOTALL)
+anchor_start_pattern = re.compile(r"<a\b([^>]*)>", re.IGNORECASE)
+img_pattern = re.compile(r"<img\b([^>]*)>", re.IGNORECASE)
+span_pattern = re.compile(r"<span\b[^>]*>(.*?)</span\s*>", re.IGNORECASE | re.DOTALL)
+small_pattern = re.compile(r"<small\b[^>]*>(.*?)</small\s*>", re.IGNORECASE | re.DOTALL)
+tag_pattern = re.compile(r"<[^>]*>")
+unsupported_markup_pattern = re.compile(r"<!--|<script\b|<style\b|<!\[CDATA\[", re.IGNORECASE)
+"""Markup whose text the patterns cannot reliably tell apart from tags.
+Only looked for in the divs parsed - pages carry scripts elsewhere."""
+
+
+def attribute(attrs: str, name: str) -> str | None:
+    """Value of attribute `name` in the attributes part of a tag"""
+    match = re.search(
+        rf"""(?:^|\s){name}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+        attrs,
+        re.IGNORECASE,
+    )
+    if match is None:
+        return None
+    return unescape(next(group for group in match.groups() if group is not None))
+
+
+def text(contents: str) -> str:
+    """Stripped text of html `contents`"""
+    return unescape(tag_pattern.sub("", contents)).strip()
+
+
+def divs_by_class(contents: str, *classes: str) -> dict[str, list[str]] | None:
+    """Contents of `div`s having any of `classes` in document order.
+
+    Returns:
+        dict[str, list[str]] | None: Class and the contents of its divs.
+        None when the divs are nested in one another or left unclosed.
+    """
+    found: dict[str, list[str]] = {name: [] for name in classes}
+    open_divs: list[tuple[str | None, int]] = []
+    inside_found = False
+    for tag in div_tag_pattern.finditer(contents):
+        closing, attrs = tag.groups()
+        if closing:
+            if not open_divs:
+                return None
+            name, start = open_divs.pop()
+            if name is not None:
+                found[name].append(contents[start : tag.start()])
+                inside_found = False
+        else:
+            class_match = class_pattern.search(attrs)
+            tokens = (
+                next(group for group in class_match.groups() if group is not None).split()
+                if class_match
+                else ()
+            )
+            name = next((name for name in classes if name in tokens), None)
+            if name is not None:
+                if inside_found:
+                    return None
+                inside_found = True
+            open_divs.append((name, tag.end()))
+    if inside_found:
+        return None
+    return found
+
+
+def supported(divs: dict[str, list[str]]) -> bool:
+    """Check that none of `divs` holds `unsupported_markup_pattern`"""
+    return not any(
+        unsupported_markup_pattern.search(div) for found in divs.values() for div in found
+    )
+
+
+def search_page(contents: str) -> dict[str, t.Any] | None:
+    """Fields of `handlers.search_spec`"""
+    divs = divs_by_class(contents, "mainbox", "mainbox2")
+    if divs is None or not supported(divs):
+        return None
+
+    movies = []
+    for mainbox in divs["mainbox"]:
+        anchor = anchor_start_pattern.search(mainbox)
+        img = img_pattern.search(mainbox)
+        span = span_pattern.search(mainbox)
+        if anchor is None or img is None or span is None:
+            # Zero results page included
+            return None
+        span_contents = span.group(1)
+        if re.search(r"<span\b", span_contents, re.IGNORECASE):
+            return None
+        smalls = small_pattern.findall(span_contents)
+        if len(smalls) not in (3, 4) or any(
+            re.search(r"<small\b", small, re.IGNORECASE) for small in smalls
+        ):
+            return None
+        url = attribute(anchor.group(1), "href")
+        cover_photo = attribute(img.group(1), "src")
+        if url is None or cover_photo is None:
+            return None
+        movies.append({
+            "url": url,
+            "cover_photo": cover_photo,
+            "smalls": {"texts": [text(small) for small in smalls]},
+        })
+
+    navigation = None
+    if divs["mainbox2"]:
+        navigation = {"anchors": []}
+        for attrs, anchor_contents in anchor_pattern.findall(divs["mainbox2"][0]):
+            if re.search(r"<a\b", anchor_contents, re.IGNORECASE):
+                return None
+            navigation["anchors"].append({
+                "link": attribute(attrs, "href"),
+                "text": text(anchor_contents),
+            })
+
+    title = title_pattern.search(contents)
+    return {
+        "title": text(title.group(1)) if title else "",
+        "movies": movies,
+        "navigation": navigation,
+    }
+
+
+def final_download_link_page(contents: str) -> dict[str, t.Any] | None:
+    """Fields of `handlers.final_download_link_spec`"""
+    divs = divs_by_class(contents, "mainbox3")
+    if not divs or not divs["mainbox3"] or not supported(divs):
+        return None
+    anchor = anchor_start_pattern.search(divs["mainbox3"][0])
+    if anchor is None:
+        return None
+    href = attribute(anchor.group(1), "href")
+    if href is None:
+        return None
+    return {"link": {"href": href}}
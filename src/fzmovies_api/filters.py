@@ -7,10 +7,16 @@ import typing as t
 from abc import ABC, abstractmethod
 from datetime import UTC, datetime
 
-from fzmovies_api import errors, models
+from fzmovies_api import errors, models, singleflight
+from fzmovies_api.cache import model_cache
 from fzmovies_api.handlers import search_handler
 from fzmovies_api.hunter import Metadata
-from fzmovies_api.utils import assert_membership, category_id_map, get_absolute_url
+from fzmovies_api.utils import (
+    assert_membership,
+    canonical_url,
+    category_id_map,
+    get_absolute_url,
+)
 
 
 class Filter(ABC):
@@ -28,6 +34,14 @@ class Filter(ABC):
         """
         raise NotImplementedError("This method needs to be implemented in subclass.")
 
+    def stream_contents(self) -> t.Iterable[str]:
+        """Get Html contents of the url in parts as they are downloaded
+
+        Returns:
+            t.Iterable[str]: html contents
+        """
+        yield self.get_contents()
+
     @abstractmethod
     def get_results(self) -> models.SearchResults:
         """Get modelled version of the results
@@ -55,13 +69,27 @@ class FilterBase(Filter):
         """
         return Metadata.get_resource(self.url).text
 
+    def stream_contents(self) -> t.Generator[str, None, None]:
+        """Fetch Html contents of the url in parts as they are downloaded
+
+        Returns:
+            t.Generator[str, None, None]: html contents
+        """
+        return Metadata.stream_resource(self.url)
+
     def get_results(self) -> models.SearchResults:
         """Get modelled version of the movie list
 
         Returns:
             models.SearchResults: Results
         """
-        return search_handler(self.get_contents())
+        return model_cache.get_or_make(
+            self.url,
+            lambda: singleflight.group.do(
+                ("search", canonical_url(self.url)),
+                lambda: search_handler(self.get_contents()),
+            ),
+        )
 
 
 class IMDBTop250Filter(FilterBase):
@@ -272,6 +300,9 @@ class MovieGenreFilter(FilterBase):
 class ReleaseYearFilter(FilterBase):
     """Movie releasal year filter"""
 
+    min_year: int = 1920
+    """Earliest year having movie listings"""
+
     def __init__(
         self,
         year: int | None=None,
@@ -284,7 +315,7 @@ class ReleaseYearFilter(FilterBase):
             category (t.Literal["Bollywood", "Hollywood"], optional): Movie category. Defaults to "Hollywood".
         """
         if year is None:
-            year = int(datetime.now(UTC).year)
+            year = self.max_year()
 
         assert isinstance(int(year), int), "Year must be an Integer"
         assert_membership(category, tuple(category_id_map.keys()), "Category")
@@ -292,6 +323,16 @@ class ReleaseYearFilter(FilterBase):
             f"/year.php?year={year}&catID={category_id_map[category]}"
         )
 
+    @staticmethod
+    def max_year() -> int:
+        """Latest year having movie listings - the current one"""
+        return int(datetime.now(UTC).year)
+
+    @classmethod
+    def available_years(cls) -> range:
+        """Years from `min_year` to `max_year` inclusive"""
+        return range(cls.min_year, cls.max_year() + 1)
+
 
 class MovieTagFilter(FilterBase):
     """Movie tag filter"""
@@ -0,0 +1,209 @@
+"""
+This module looks up movies locally, tolerating typos.
+
+Titles - and director or cast names when known - harvested by crawls
+are broken into trigrams and indexed so that a query is matched by the
+trigrams it shares with each entry, ranked by their Dice coefficient.
+Candidates are gathered from the query's rarest trigrams, sparing
+the long posting lists of common ones like `the`, which keeps lookups
+in the sub-millisecond range even for the whole catalogue.
+
+```python
+from fzmovies_api.crawler import FilterCrawler
+from fzmovies_api.fuzzy import FuzzyIndex
+
+index = FuzzyIndex()
+FilterCrawler().run(index.add_movie)
+
+index.did_you_mean("Terminater 2") # 'Terminator 2 Judgment Day'
+```
+"""
+
+import json
+import unicodedata
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from fzmovies_api import models
+from fzmovies_api.utils import searchby_options
+
+min_score = 0.3
+"""Least Dice coefficient of a match"""
+
+max_common_postings = 2_000
+"""Posting lists longer than this are only consulted when the rarer ones
+yield no candidates"""
+
+
+def normalize(text: str) -> str:
+    """Lowercase `text` without accents and punctuation"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join(
+        "".join(
+            character if character.isalnum() else " "
+            for character in decomposed
+            if not unicodedata.combining(character)
+        ).split()
+    )
+
+
+def pad(text: str) -> str:
+    """Words of normalized `text` each padded with spaces. Every trigram
+    of a word is a substring of it."""
+    return "".join(f"  {word} " for word in text.split())
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of the words of normalized `text` padded with spaces"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FuzzyIndex:
+    """Trigram index of titles and names"""
+
+    def __init__(self):
+        """Initializes `FuzzyIndex`"""
+        self._texts: list[str] = []
+        """Entries as added"""
+        self._searchbys: list[str] = []
+        self._padded: list[str] = []
+        """Padded normalized entries for telling trigrams they contain"""
+        self._sizes = array("H")
+        """Number of trigrams of each entry"""
+        self._urls: list[list[str]] = []
+        """Movies of each entry"""
+        self._lookup: dict[tuple[str, str], int] = {}
+        """Normalized text & searchby and their entry"""
+        self._postings: dict[str, array] = {}
+
+    def __repr__(self):
+        return f"<fzmovies_api.fuzzy.FuzzyIndex entries={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str, searchby: str = "Name", url: str | None = None):
+        """Index `text`
+
+        Args:
+            text (str): Movie title, director or cast name.
+            searchby (str, optional): What `text` is - one of `utils.searchby_options`. Defaults to "Name".
+            url (str | None, optional): Link to the movie page. Defaults to None.
+        """
+        assert searchby in searchby_options, (
+            f"searchby must be one of {searchby_options} not '{searchby}'"
+        )
+        normalized = normalize(text)
+        if not normalized:
+            return
+        entry = self._lookup.get((normalized, searchby))
+        if entry is None:
+            entry = self._lookup[normalized, searchby] = len(self._texts)
+            self._texts.append(text)
+            self._searchbys.append(searchby)
+            self._padded.append(pad(normalized))
+            self._urls.append([])
+            grams = trigrams(normalized)
+            self._sizes.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                self._postings.setdefault(gram, array("I")).append(entry)
+        if url is not None and str(url) not in self._urls[entry]:
+            self._urls[entry].append(str(url))
+
+    def add_movie(self, movie: models.MovieInSearch | models.RecommendedMovie):
+        """Index title of `movie`"""
+        self.add(movie.title, "Name", movie.url)
+
+    def search(
+        self,
+        query: str,
+        searchby: str | None = None,
+        limit: int = 10,
+        min_score: float = min_score,
+    ) -> list[models.FuzzyMatch]:
+        """Entries resembling `query`, best first
+
+        Args:
+            query (str): Text with possible typos.
+            searchby (str | None, optional): Entries of one of `utils.searchby_options` only. Defaults to all.
+            limit (int, optional): Matches not to exceed. Defaults to 10.
+            min_score (float, optional): Least Dice coefficient. Defaults to `min_score`.
+
+        Returns:
+            list[models.FuzzyMatch]: Matches
+        """
+        query_grams = trigrams(normalize(query))
+        postings = sorted(
+            (
+                (gram, self._postings[gram])
+                for gram in query_grams
+                if gram in self._postings
+            ),
+            key=lambda gram_posting: len(gram_posting[1]),
+        )
+        if not postings:
+            return []
+
+        shared: Counter[int] = Counter()
+        skipped = []
+        for gram, posting in postings:
+            if len(posting) > max_common_postings and shared:
+                skipped.append(gram)
+            else:
+                shared.update(posting)
+
+        matches = []
+        for entry, count in shared.most_common(max(limit, 10) * 5):
+            if searchby is not None and self._searchbys[entry] != searchby:
+                continue
+            padded = self._padded[entry]
+            count += sum(gram in padded for gram in skipped)
+            score = 2 * count / (len(query_grams) + self._sizes[entry])
+            if score >= min_score:
+                matches.append((score, entry))
+        matches.sort(key=lambda match: (-match[0], len(self._texts[match[1]])))
+
+        return [
+            models.FuzzyMatch(
+                text=self._texts[entry],
+                searchby=self._searchbys[entry],
+                score=round(score, 4),
+                urls=self._urls[entry],
+            )
+            for score, entry in matches[:limit]
+        ]
+
+    def did_you_mean(self, query: str, searchby: str | None = None) -> str | None:
+        """Entry most resembling `query` unless `query` is exactly an entry
+
+        Args:
+            query (str): Text with possible typos.
+            searchby (str | None, optional): Entries of one of `utils.searchby_options` only. Defaults to all.
+
+        Returns:
+            str | None: Suggestion
+        """
+        matches = self.search(query, searchby, limit=1)
+        if not matches or normalize(matches[0].text) == normalize(query):
+            return None
+        return matches[0].text
+
+    def save(self, path: Path | str):
+        """Write the entries to json file `path`"""
+        entries = zip(self._texts, self._searchbys, self._urls, strict=True)
+        Path(path).write_text(json.dumps({"entries": list(entries)}))
+
+    @classmethod
+    def load(cls, path: Path | str) -> "FuzzyIndex":
+        """Read index saved by `save`"""
+        index = cls()
+        for text, searchby, urls in json.loads(Path(path).read_text())["entries"]:
+            index.add(text, searchby)
+            for url in urls:
+                index.add(text, searchby, url)
+        return index
@@ -1,11 +1,137 @@
 """
 Extracts key data from raw html contents
 and use them to generate models
+
+Every page type is described once as an `extraction.Spec`
+whose transform generates the model.
 """
 
 import re
+from operator import itemgetter
+
+from fzmovies_api import errors, fastpath, models, utils
+from fzmovies_api.extraction import Field, Spec
+
+
+def zero_search_results(page_title: str) -> errors.ZeroSearchResults:
+    """Make exception for search results page without movies
+
+    Args:
+        page_title (str): Text of the page's `<title>`
+    """
+    title = page_title.strip().split("-", 1)[1]
+    return errors.ZeroSearchResults(
+        title + " yielded no results. Check the spelling or try broadening your search."
+    )
+
+
+def movie_in_search(url: str, smalls: list[str], cover_photo: str) -> dict[str, str]:
+    """Make `MovieInSearch` fields from the parts of a search result
+
+    Args:
+        url (str): Link to the movie page.
+        smalls (list[str]): Texts of `<small>` tags - title, year, distribution (optional) & about.
+        cover_photo (str): Link to the movie cover photo.
+
+    Returns:
+        dict[str, str]: `MovieInSearch` fields
+    """
+    if len(smalls) == 4:
+        title, year, distribution, about = smalls
+    else:
+        title, year, about = smalls
+        distribution = "Unknown"
+    return {
+        "url": utils.get_absolute_url(url),
+        "title": title.strip(),
+        "year": re.sub(r"\(|\)", "", year.strip()),
+        "distribution": re.sub(r"\(|\)", "", distribution.strip()),
+        "about": about.strip(),
+        "cover_photo": utils.get_absolute_url(cover_photo),
+    }
+
+
+def search_pages(navigation: list[tuple[str, str]]) -> dict[str, str | None]:
+    """Map search results navigation links to `SearchResults` page fields
+
+    Args:
+        navigation (list[tuple[str, str]]): Link and text of `<a>` tags in the navigation section.
+
+    Returns:
+        dict[str, str | None]: first_page, previous_page, next_page & last_page
+    """
+    pages = dict.fromkeys(("first_page", "previous_page", "next_page", "last_page"))
+    text_page_map = {
+        "First": "first_page",
+        "Prev": "previous_page",
+        "Next": "next_page",
+        "Last": "last_page",
+    }
+    for link, text in navigation:
+        page = text_page_map.get(text.strip())
+        if page:
+            pages[page] = link
+    return pages
+
+
+def _search_results(page: dict) -> models.SearchResults:
+    search_result_items: list[dict[str, str]] = []
+    for index, movie in enumerate(page["movies"]):
+        if movie["smalls"] is None:
+            raise zero_search_results(page["title"])
+        for field, selector in (("url", "a[href]"), ("cover_photo", "img[src]")):
+            if movie[field] is None:
+                raise errors.ExtractionError(
+                    "search", f"movies[{index}].{field}", selector
+                )
+        search_result_items.append(
+            movie_in_search(movie["url"], movie["smalls"], movie["cover_photo"])
+        )
+    return models.SearchResults(
+        movies=search_result_items,
+        **search_pages([(nav["link"], nav["text"]) for nav in page["navigation"]]),
+    )
 
-from fzmovies_api import errors, models, utils
+
+search_spec = Spec(
+    "search",
+    {
+        "title": Field("title", required=False, default=""),
+        "movies": Field(
+            "div.mainbox",
+            many=True,
+            fields={
+                # Zero results page has no span and is checked first
+                "url": Field("a", attr="href", required=False),
+                "cover_photo": Field("img", attr="src", required=False),
+                "smalls": Field(
+                    "span",
+                    required=False,
+                    fields={"texts": Field("small", many=True)},
+                    transform=itemgetter("texts"),
+                ),
+            },
+        ),
+        "navigation": Field(
+            "div.mainbox2",
+            required=False,
+            default=[],
+            fields={
+                "anchors": Field(
+                    "a",
+                    many=True,
+                    fields={
+                        "link": Field(attr="href", required=False),
+                        "text": Field(),
+                    },
+                )
+            },
+            transform=itemgetter("anchors"),
+        ),
+    },
+    transform=_search_results,
+    fast_path=fastpath.search_page,
+)
 
 
 def search_handler(contents: str) -> models.SearchResults:
@@ -17,115 +143,92 @@ def search_handler(contents: str) -> models.SearchResults:
     Returns:
         SearchResults: Modelled search results
     """
-    soup = utils.souper(contents)
+    return search_spec.extract(contents)
 
-    search_result_items: list[dict[str, str]] = []
 
-    for search_result in soup.find_all("div", {"class": "mainbox"}):
-        url = search_result.find("a").get("href")
-        span = search_result.find("span")
-        if not span:
-            title = soup.find("title").text.strip().split("-", 1)[1]
-            raise errors.ZeroSearchResults(
-                title
-                + " yielded no results. Check the spelling or try broadening your search."
-            )
-        extract = span.find_all("small")
-        if len(extract) == 4:
-            title_soup, year_soup, distribution_soup, about_soup = extract
-        else:
-            title_soup, year_soup, about_soup = extract
-            distribution_soup = utils.souper("<h4>Unknown</h4>")
-        title = title_soup.text.strip()
-        year = re.sub(r"\(|\)", "", year_soup.text.strip())
-        distribution = re.sub(r"\(|\)", "", distribution_soup.text.strip())
-        about = about_soup.text.strip()
-        cover_photo = search_result.find("img").get("src")
-        search_result_items.append({
-            "url": utils.get_absolute_url(url),
-            "title": title,
-            "year": year,
-            "distribution": distribution,
-            "about": about,
-            "cover_photo": utils.get_absolute_url(cover_photo),
-        })
-
-    pages = soup.find("div", {"class": "mainbox2"})
-    first_page = previous_page = next_page = last_page = None
-    if pages:
-        for nav in pages.find_all("a"):
-            link = nav.get("href")
-            text = nav.text.strip()
-            if text == "First":
-                first_page = link
-            elif text == "Prev":
-                previous_page = link
-            elif text == "Next":
-                next_page = link
-            elif text == "Last":
-                last_page = link
+def _movie_file(movie_file: dict) -> dict[str, str]:
+    urls = movie_file["urls"]
+    dcounter = re.sub(r"\(|\)|\{|\}", "", movie_file["dcounter"]).split(" ")
+    return {
+        "title": urls[0]["text"],
+        "url": utils.get_absolute_url(urls[0]["href"]),
+        "size": " ".join(dcounter[:2]),
+        "hits": dcounter[-3],
+        "mediainfo": utils.get_absolute_url(urls[1]["href"]),
+        "ss": utils.get_absolute_url(urls[2]["href"]) if len(urls) >= 3 else None,
+    }
 
-    return models.SearchResults(
-        movies=search_result_items,
-        next_page=next_page,
-        last_page=last_page,
-        first_page=first_page,
-        previous_page=previous_page,
+
+def _movie_files(page: dict) -> models.MovieFiles:
+    movie_files: list[dict[str, str]] = []
+    for index, movie_file in enumerate(page["files"]):
+        if not movie_file["urls"]:
+            continue
+        if movie_file["dcounter"] is None:
+            raise errors.ExtractionError("movie", f"files[{index}].dcounter", "dcounter")
+        movie_files.append(_movie_file(movie_file))
+    return models.MovieFiles(
+        files=movie_files, trailer=page["trailer"], recommended=page["recommended"]
     )
 
 
+movie_spec = Spec(
+    "movie",
+    {
+        "trailer": Field(
+            'iframe[allow="accelerometer; autoplay; encrypted-media; gyroscope; picture-in-picture"]',
+            attr="src",
+            required=False,
+        ),
+        "recommended": Field(
+            "div.owl-carousel.owl-theme",
+            fields={
+                "movies": Field(
+                    "a",
+                    many=True,
+                    fields={
+                        "title": Field(attr="alt", required=False),
+                        "url": Field(attr="href", transform=utils.get_absolute_url),
+                        "cover_photo": Field(
+                            "img", attr="src", transform=utils.get_absolute_url
+                        ),
+                    },
+                )
+            },
+            transform=itemgetter("movies"),
+        ),
+        "files": Field(
+            "ul.moviesfiles",
+            many=True,
+            fields={
+                "urls": Field(
+                    "a",
+                    many=True,
+                    fields={
+                        "text": Field(),
+                        "href": Field(attr="href", required=False),
+                    },
+                ),
+                "dcounter": Field("dcounter", required=False),
+            },
+        ),
+    },
+    transform=_movie_files,
+)
+
+
 def movie_handler(contents: str) -> models.MovieFiles:
     """Make model from movie metadata (html)"""
-    movie_files: list[dict[str, str]] = []
-    recommended_movies: list[dict[str, str]] = []
-    soup = utils.souper(contents)
-    trailer_soup = soup.find(
-        "iframe",
-        {
-            "allow": "accelerometer; autoplay; encrypted-media; gyroscope; picture-in-picture"
-        },
-    )
+    return movie_spec.extract(contents)
 
-    trailer = trailer_soup.get("src") if trailer_soup else None
-
-    for movie in soup.find("div", {"class": "owl-carousel owl-theme"}).find_all("a"):
-        title = movie.get("alt")
-        url = movie.get("href")
-        cover_photo = movie.find("img").get("src")
-        recommended_movies.append({
-            "title": title,
-            "url": utils.get_absolute_url(url),
-            "cover_photo": utils.get_absolute_url(cover_photo),
-        })
-
-    for movie_file in soup.find_all("ul", {"class": "moviesfiles"}):
-        urls = movie_file.find_all("a")
-        if not urls:
-            continue
-        title_url = urls[0]
-        title = title_url.text.strip()
-        url = title_url.get("href")
-        dcounter = re.sub(
-            r"\(|\)|\{|\}", "", movie_file.find("dcounter").text.strip()
-        ).split(" ")
-        size = " ".join(dcounter[:2])
-        hits = dcounter[-3]
-        mediainfo = urls[1].get("href")
-        if len(urls) >= 3:
-            ss = urls[2].get("href")
-        else:
-            ss = None
-        movie_files.append({
-            "title": title,
-            "url": utils.get_absolute_url(url),
-            "size": size,
-            "hits": hits,
-            "mediainfo": utils.get_absolute_url(mediainfo),
-            "ss": utils.get_absolute_url(ss) if ss else None,
-        })
-    return models.MovieFiles(
-        files=movie_files, trailer=trailer, recommended=recommended_movies
-    )
+
+to_download_spec = Spec(
+    "to-download",
+    {
+        "link": Field("a#downloadlink", attr="href", transform=utils.get_absolute_url),
+    },
+    transform=itemgetter("link"),
+)
 
 
 def to_download_handler(contents: str) -> str:
@@ -137,9 +240,40 @@ def to_download_handler(contents: str) -> str:
     Returns:
         str: to-download-links url
     """
-    soup = utils.souper(contents)
-    link = soup.find("a", {"id": "downloadlink"}).get("href")
-    return utils.get_absolute_url(link)
+    return to_download_spec.extract(contents)
+
+
+download_links_spec = Spec(
+    "download-links",
+    {
+        "info": Field("div.mainbox4"),
+        "filename": Field("div.moviedesc textcolor1"),
+        "size": Field("div.moviedesc textcolor2"),
+        # Links of interest are in the third list
+        "links": Field(
+            "ul.downloadlinks",
+            limit=3,
+            index=-1,
+            fields={
+                "links": Field(
+                    "li",
+                    many=True,
+                    fields={
+                        "url": Field("a", attr="href", transform=utils.get_absolute_url),
+                        "connections": Field(
+                            "dcounter",
+                            transform=lambda dcounter: re.sub(
+                                r"\(|\)", "", dcounter
+                            ).split(" ")[0],
+                        ),
+                    },
+                )
+            },
+            transform=itemgetter("links"),
+        ),
+    },
+    transform=lambda page: models.DownloadMovie(**page),
+)
 
 
 def download_links_handler(contents: str) -> models.DownloadMovie:
@@ -152,36 +286,34 @@ def download_links_handler(contents: str) -> models.DownloadMovie:
     Returns:
         models.DownloadMovie: Models for download links
     """
-    soup = utils.souper(contents)
-    info = soup.find("div", {"class": "mainbox4"}).text.strip()
-    movie_desc = soup.find("div", {"class": "moviedesc"})
-    filename = movie_desc.find("textcolor1").text.strip()
-    size = movie_desc.find("textcolor2").text.strip()
-
-    download_link_items: list[dict] = []
-
-    for dlink in soup.find_all("ul", {"class": "downloadlinks"}, limit=3)[-1].find_all(
-        "li"
-    ):
-        url = dlink.find("a").get("href")
-        connections = re.sub(r"\(|\)", "", dlink.find("dcounter").text.strip()).split(
-            " "
-        )[0]
-        download_link_items.append({
-            "url": utils.get_absolute_url(url),
-            "connections": connections,
-        })
-    return models.DownloadMovie(
-        filename=filename, links=download_link_items, size=size, info=info
-    )
+    return download_links_spec.extract(contents)
+
+
+final_download_link_spec = Spec(
+    "dlink",
+    {"link": Field("div.mainbox3", fields={"href": Field("a", attr="href")})},
+    transform=lambda page: page["link"]["href"],
+    fast_path=fastpath.final_download_link_page,
+)
 
 
 def final_download_link_handler(contents: str) -> str:
     """Extracts the last url pointing to the movie file"""
+    return final_download_link_spec.extract(contents)
 
-    soup = utils.souper(contents)
 
-    return soup.find("div", {"class": "mainbox3"}).find("a").get("href")
+questions_and_answers_spec = Spec(
+    "questions-and-answers",
+    {
+        "questions": Field(
+            "div.question",
+            many=True,
+            transform=lambda question: " ".join(question.split(" ")[1:]),
+        ),
+        "answers": Field("div.answer", many=True),
+    },
+    transform=lambda page: dict(zip(page["questions"], page["answers"], strict=True)),
+)
 
 
 def questions_and_answers_handler(contents: str) -> dict[str, str]:
@@ -191,13 +323,16 @@ def questions_and_answers_handler(contents: str) -> dict[str, str]:
     Returns:
         dict[str, str]: Question and their corresponding answers.
     """
-    soup = utils.souper(contents)
-    formats_soup = soup.find_all("div", {"class": "question"})
-    descriptions_soup = soup.find_all("div", {"class": "answer"})
-    formats_list: list[str] = [
-        " ".join(format.text.strip().split(" ")[1:]) for format in formats_soup
-    ]
-    descriptions_list: list[str] = [
-        description.text.strip() for description in descriptions_soup
-    ]
-    return dict(zip(formats_list, descriptions_list))
+    return questions_and_answers_spec.extract(contents)
+
+
+def fast_path_stats() -> dict[str, dict[str, int]]:
+    """Pages extracted through the fast path or its fallback per page type
+
+    Returns:
+        dict[str, dict[str, int]]: Page type and its counters.
+    """
+    return {
+        spec.name: {"fast": spec.stats["fast"], "fallback": spec.stats["fallback"]}
+        for spec in (search_spec, final_download_link_spec)
+    }
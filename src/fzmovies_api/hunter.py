@@ -9,14 +9,15 @@ that revolves around:
 - Select link
 """
 
+import codecs
 import re
+import threading
 import typing as t
 
-import requests
+from fzmovies_api import errors, logger, singleflight, utils
 
-from fzmovies_api import errors, logger, utils
-
-session = requests.Session()
+if t.TYPE_CHECKING:
+    import requests
 
 headers = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/png,image/svg+xml,*/*;q=0.8",
@@ -26,10 +27,59 @@ headers = {
     "referer": "https://fzmovies.net/",
 }
 
-session.headers.update(headers)
-
 request_timeout = 20
 
+stream_chunk_size = 8 * 1024
+"""Bytes read at a time when streaming html contents"""
+
+_session_lock = threading.Lock()
+
+_index_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Http session shared across the package.
+    `requests` is only imported once the session is first needed.
+
+    Returns:
+        requests.Session: Session accessible as `hunter.session`
+    """
+    session = globals().get("session")
+    if session is None:
+        with _session_lock:
+            session = globals().get("session")
+            if session is None:
+                import requests
+
+                session = requests.Session()
+                session.headers.update(headers)
+                globals()["session"] = session
+    return session
+
+
+def ensure_pool_size(size: int):
+    """Let the shared session keep at least `size` connections open per host
+    so that concurrent requests reuse them instead of discarding them.
+
+    Args:
+        size (int): Connections per host.
+    """
+    from requests.adapters import HTTPAdapter
+
+    session = get_session()
+    with _session_lock:
+        for prefix, adapter in list(session.adapters.items()):
+            if getattr(adapter, "_pool_maxsize", size) < size:
+                session.mount(
+                    prefix, HTTPAdapter(pool_maxsize=size, max_retries=adapter.max_retries)
+                )
+
+
+def __getattr__(name: str):
+    if name == "session":
+        return get_session()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 class Index:
     """
@@ -38,16 +88,30 @@ class Index:
 
     url = utils.site_url
     search_url = utils.get_absolute_url("/csearch.php")
-    searchby_options = ("Name", "Director", "Starcast")
-    category_options = ("All", "Bollywood", "Hollywood", "DHollywood")
+    searchby_options = utils.searchby_options
+    category_options = utils.category_options
     session_is_initialized = False
+    session_cookie: str | None = None
+    """Session cookie set by loading the index page if any"""
+    index_resp: "requests.Response" = None
 
     def __init__(
         self,
     ):
         """Instantiates Index"""
-        if not self.session_is_initialized:
-            load_index_resp = session.get(self.url, timeout=request_timeout)
+        self.initialize_session()
+
+    @classmethod
+    def initialize_session(cls):
+        """Load index page once per session - and again once the session
+        cookie it set is dropped. Concurrent callers wait for the first one
+        instead of loading it too."""
+        if cls.session_is_live():
+            return
+        with _index_lock:
+            if cls.session_is_live():
+                return
+            load_index_resp = get_session().get(cls.url, timeout=request_timeout)
             if not load_index_resp.ok:
                 logger.debug(
                     f"Headers - {load_index_resp.headers} \nResponse - {load_index_resp.text}"
@@ -55,7 +119,18 @@ class Index:
                 raise errors.LoadIndexError(
                     f"Failed to load index page - ({load_index_resp.status_code} : {load_index_resp.reason})"
                 )
-            self.index_resp = load_index_resp
+            Index.index_resp = load_index_resp
+            Index.session_cookie = get_session().cookies.get("PHPSESSID")
+            Index.session_is_initialized = True
+
+    @classmethod
+    def session_is_live(cls) -> bool:
+        """Check whether the index page has been loaded and the session
+        cookie it set - if any - is still held"""
+        return Index.session_is_initialized and (
+            Index.session_cookie is None
+            or get_session().cookies.get("PHPSESSID") is not None
+        )
 
     def __str__(self):
         return f"<fzmoviesIndex_{self.index_resp.reason}>"
@@ -73,6 +148,40 @@ class Index:
             searchby (t.Literal["Name", "Director", "Starcast"], optional): Search category. Defaults to "Name".
             category (t.Literal["All", "Bollywood", "Hollywood", "DHollywood"], optional): Movie category. Defaults to "All".
         """
+        resp = get_session().post(
+            self.search_url,
+            data=self._search_payload(query, searchby, category),
+            timeout=request_timeout,
+        )
+        resp.raise_for_status()
+        return resp.text
+
+    def stream_search(
+        self,
+        query: str,
+        searchby: t.Literal["Name", "Director", "Starcast"] = "Name",
+        category: t.Literal["All", "Bollywood", "Hollywood", "DHollywood"] = "All",
+    ) -> t.Generator[str, None, None]:
+        """
+        Performs `POST` request search yielding html contents as they arrive.
+        Stopping iteration closes the connection.
+
+        Args:
+            query (str): Search query.
+            searchby (t.Literal["Name", "Director", "Starcast"], optional): Search category. Defaults to "Name".
+            category (t.Literal["All", "Bollywood", "Hollywood", "DHollywood"], optional): Movie category. Defaults to "All".
+        """
+        resp = get_session().post(
+            self.search_url,
+            data=self._search_payload(query, searchby, category),
+            timeout=request_timeout,
+            stream=True,
+        )
+        yield from iter_text(resp)
+
+    def _search_payload(
+        self, query: str, searchby: str, category: str
+    ) -> dict[str, str]:
         assert type(query) is str, (
             f"Query must be of {str} datatype only not {type(query)}"
         )
@@ -85,16 +194,38 @@ class Index:
             f"Category '{category}' is NOT one of '{self.category_options}'"
         )
 
-        payload = {
+        return {
             "searchname": query,
             "Search": "Search",
             "searchby": searchby,
             "category": category,
             "vsearch": "",
         }
-        resp = session.post(self.search_url, data=payload, timeout=request_timeout)
+
+
+def iter_text(resp: "requests.Response") -> t.Generator[str, None, None]:
+    """Decode streamed response contents as they arrive then close the response
+
+    Args:
+        resp (requests.Response): Response of a request made with `stream=True`
+
+    Yields:
+        str: Html contents
+    """
+    try:
         resp.raise_for_status()
-        return resp.text
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(
+            errors="replace"
+        )
+        for chunk in resp.iter_content(chunk_size=stream_chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    finally:
+        resp.close()
 
 
 class Metadata:
@@ -114,28 +245,65 @@ class Metadata:
 
     @classmethod
     def get_resource(cls, url: str, timeout: int = 20, *args, **kwargs):
-        """Fetch online resource
+        """Fetch online resource. Identical plain requests in flight
+        are coalesced into one.
 
         Args:
             timeout (int): Http request timeout
             url (str): Url to resource
         """
+        if args or kwargs:
+            return cls._get_resource(url, timeout, *args, **kwargs)
+        return singleflight.group.do(
+            ("GET", utils.canonical_url(url)), cls._get_resource, url, timeout
+        )
+
+    @classmethod
+    def _get_resource(cls, url: str, timeout: int = 20, *args, **kwargs):
+        session = get_session()
         if not session.cookies.get("PHPSESSID"):
             logger.debug("Initializing session")
-            Index()
+            Index.initialize_session()
         resp = session.get(url, *args, timeout=timeout, **kwargs)
         resp.raise_for_status()
         if "text/html" in resp.headers.get("Content-Type", ""):
-            has_expired = re.search(cls.session_expired_pattern, resp.text)
-            if has_expired:
-                raise errors.SessionExpired(
-                    utils.get_absolute_url(
-                        utils.souper(has_expired.group()).find("a").get("href")
-                    ),
-                )
+            cls.raise_for_expired_session(resp.text)
 
         return resp
 
+    @classmethod
+    def stream_resource(
+        cls, url: str, timeout: int = 20, *args, **kwargs
+    ) -> t.Generator[str, None, None]:
+        """Fetch online html resource yielding contents as they arrive.
+        Stopping iteration closes the connection.
+
+        Args:
+            timeout (int): Http request timeout
+            url (str): Url to resource
+        """
+        session = get_session()
+        if not session.cookies.get("PHPSESSID"):
+            logger.debug("Initializing session")
+            Index.initialize_session()
+        resp = session.get(url, *args, timeout=timeout, stream=True, **kwargs)
+        yield from iter_text(resp)
+
+    @classmethod
+    def raise_for_expired_session(cls, contents: str):
+        """Raise `SessionExpired` in case `contents` is the expired download keys page
+
+        Args:
+            contents (str): Html contents or part of it.
+        """
+        has_expired = re.search(cls.session_expired_pattern, contents)
+        if has_expired:
+            raise errors.SessionExpired(
+                utils.get_absolute_url(
+                    utils.souper(has_expired.group()).find("a").get("href")
+                ),
+            )
+
     @classmethod
     def movie_page(cls, movie_url: str) -> str:
         """Requests movie page
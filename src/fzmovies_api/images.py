@@ -0,0 +1,265 @@
+"""
+This module fetches cover photos and screenshots in bulk.
+
+Images are downloaded over the shared session by a bounded pool and kept
+in an on-disk cache addressed by the sha256 of their contents, so that
+repeat requests - and different links to the same image - are served
+locally. Least recently used images are evicted once the cache exceeds
+its size budget.
+
+```python
+from fzmovies_api import Search
+from fzmovies_api.images import ImageFetcher, image_urls
+
+with ImageFetcher() as fetcher:
+    paths = fetcher.fetch_all(image_urls(Search("Heat").results))
+```
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fzmovies_api import errors, hunter, models, singleflight
+from fzmovies_api.export import write_json_atomically
+from fzmovies_api.utils import canonical_url
+
+default_dir = Path(
+    os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+) / "fzmovies_api" / "images"
+"""Where images are cached"""
+
+default_max_size = 256 * 1024 * 1024
+"""Disk budget of the cache in bytes"""
+
+max_image_size = 10 * 1024 * 1024
+"""Larger responses are not taken to be images"""
+
+
+def image_urls(*items: t.Any) -> list[str]:
+    """Links to the images of models - `cover_photo` of movies
+    and `ss` of movie files - in order and without duplicates.
+
+    Args:
+        items: `SearchResults`, `MovieFiles`, `MovieInSearch`, `RecommendedMovie`,
+          `FileMetadata` or iterables of them.
+
+    Returns:
+        list[str]: Image urls
+    """
+    urls: dict[str, None] = {}
+
+    def collect(item):
+        if isinstance(item, models.SearchResults):
+            collect(item.movies)
+        elif isinstance(item, models.MovieFiles):
+            collect(item.files)
+            collect(item.recommended)
+        elif isinstance(item, (models.MovieInSearch, models.RecommendedMovie)):
+            urls.setdefault(str(item.cover_photo))
+        elif isinstance(item, models.FileMetadata):
+            if item.ss is not None:
+                urls.setdefault(str(item.ss))
+        else:
+            for element in item:
+                collect(element)
+
+    collect(items)
+    return list(urls)
+
+
+class ImageCache:
+    """Content-addressed on-disk cache of images"""
+
+    def __init__(
+        self,
+        dir: Path | str = default_dir,
+        max_size: int = default_max_size,
+        clock: t.Callable[[], float] = time.time,
+    ):
+        """Initializes `ImageCache`
+
+        Args:
+            dir (Path | str, optional): Cache directory. Defaults to `default_dir`.
+            max_size (int, optional): Disk budget in bytes. Defaults to `default_max_size`.
+            clock (t.Callable[[], float], optional): Time source. Defaults to time.time.
+        """
+        assert max_size > 0, "max_size must be greater than 0"
+        self.dir = Path(dir)
+        self.max_size = max_size
+        self.clock = clock
+        self.index_file = self.dir / "index.json"
+        self._urls: dict[str, str] = {}
+        """Canonical urls and the digest of their contents"""
+        self._objects: dict[str, list] = {}
+        """Digests and their [size, last used]"""
+        self._lock = threading.Lock()
+        if self.index_file.exists():
+            state = json.loads(self.index_file.read_text())
+            self._urls = state["urls"]
+            self._objects = state["objects"]
+
+    def __repr__(self):
+        return f"<fzmovies_api.images.ImageCache images={len(self._objects)},size={self.size}>"
+
+    def __enter__(self) -> "ImageCache":
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return canonical_url(url) in self._urls
+
+    @property
+    def size(self) -> int:
+        """Bytes taken by the images"""
+        return sum(size for size, _ in self._objects.values())
+
+    def path_of(self, digest: str) -> Path:
+        """Where image with `digest` is kept"""
+        return self.dir / digest[:2] / digest
+
+    def get(self, url: str) -> Path | None:
+        """Cached image of `url` if any"""
+        with self._lock:
+            digest = self._urls.get(canonical_url(url))
+            if digest is None:
+                return None
+            self._objects[digest][1] = self.clock()
+        path = self.path_of(digest)
+        return path if path.exists() else None
+
+    def put(self, url: str, contents: bytes) -> Path:
+        """Cache `contents` of image `url`
+
+        Returns:
+            Path: Where the image is kept.
+        """
+        digest = hashlib.sha256(contents).hexdigest()
+        path = self.path_of(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_name(f"{digest}.{threading.get_ident()}.tmp")
+            temporary.write_bytes(contents)
+            os.replace(temporary, path)
+        with self._lock:
+            self._urls[canonical_url(url)] = digest
+            self._objects[digest] = [len(contents), self.clock()]
+            self._evict(keep=digest)
+        return path
+
+    def _evict(self, keep: str):
+        size = self.size
+        if size <= self.max_size:
+            return
+        evicted = set()
+        for digest, (object_size, _) in sorted(
+            self._objects.items(), key=lambda item: item[1][1]
+        ):
+            if size <= self.max_size:
+                break
+            if digest == keep:
+                continue
+            self.path_of(digest).unlink(missing_ok=True)
+            del self._objects[digest]
+            evicted.add(digest)
+            size -= object_size
+        self._urls = {
+            url: digest for url, digest in self._urls.items() if digest not in evicted
+        }
+
+    def save(self):
+        """Persist the index of the cache"""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            state = {"urls": dict(self._urls), "objects": dict(self._objects)}
+        write_json_atomically(self.index_file, state)
+
+
+class ImageFetcher:
+    """Fetches images concurrently through `ImageCache`"""
+
+    def __init__(
+        self,
+        cache: ImageCache | None = None,
+        workers: int = 8,
+        timeout: float = hunter.request_timeout,
+    ):
+        """Initializes `ImageFetcher`
+
+        Args:
+            cache (ImageCache | None, optional): Where images are kept. Defaults to `ImageCache()`.
+            workers (int, optional): Images downloaded at once. Defaults to 8.
+            timeout (float, optional): Seconds to wait for each image. Defaults to `hunter.request_timeout`.
+        """
+        assert workers > 0, "workers must be greater than 0"
+        self.cache = ImageCache() if cache is None else cache
+        self.workers = workers
+        self.timeout = timeout
+
+    def __enter__(self) -> "ImageFetcher":
+        return self
+
+    def __exit__(self, *args):
+        self.cache.save()
+
+    def _download(self, url: str) -> Path:
+        resp = hunter.get_session().get(url, timeout=self.timeout)
+        content_type = resp.headers.get("content-type", "")
+        if not resp.ok:
+            raise errors.ImageFetchError(
+                f"Failed to fetch image '{url}' - ({resp.status_code} : {resp.reason})"
+            )
+        if not content_type.startswith("image/") or len(resp.content) > max_image_size:
+            raise errors.ImageFetchError(
+                f"Response of '{url}' is not an image - '{content_type}'"
+            )
+        return self.cache.put(url, resp.content)
+
+    def fetch(self, url: str) -> Path:
+        """Local copy of image `url`, downloading it unless cached
+
+        Raises:
+            errors.ImageFetchError: Image could not be fetched.
+
+        Returns:
+            Path: Where the image is kept.
+        """
+        url = str(url)
+        path = self.cache.get(url)
+        if path is not None:
+            return path
+        return singleflight.group.do(("image", canonical_url(url)), self._download, url)
+
+    def fetch_all(self, urls: t.Iterable[str]) -> dict[str, Path | Exception]:
+        """Local copies of many images
+
+        Args:
+            urls (t.Iterable[str]): Image urls.
+
+        Returns:
+            dict[str, Path | Exception]: Url and where the image is kept
+              or the exception that stopped it.
+        """
+        urls = list(dict.fromkeys(str(url) for url in urls))
+        missing = [url for url in urls if url not in self.cache]
+
+        def fetch(url: str) -> Path | Exception:
+            try:
+                return self.fetch(url)
+            except Exception as e:  # noqa: BLE001
+                return e
+
+        if missing:
+            hunter.ensure_pool_size(self.workers)
+        with ThreadPoolExecutor(
+            min(self.workers, len(missing)) or 1, thread_name_prefix="fzmovies-images"
+        ) as pool:
+            return dict(zip(urls, pool.map(fetch, urls), strict=True))
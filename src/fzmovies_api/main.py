@@ -12,15 +12,35 @@ It achieves this through 4 classes
 - `Auto` : Ultimately download items of index 0.
 """
 
+import queue
+import threading
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from os import getcwd, path
 from pathlib import Path
 
-from tqdm import tqdm
-
 import fzmovies_api.handlers as handler
-from fzmovies_api import errors, hunter, logger, models, utils
+from fzmovies_api import (
+    bandwidth,
+    cache,
+    dedup,
+    errors,
+    hunter,
+    logger,
+    mirrors,
+    models,
+    singleflight,
+    utils,
+    writer,
+)
 from fzmovies_api.filters import Filter, SearchNavigatorFilter, fzmoviesFilterType
+from fzmovies_api.streaming import stream_search_handler
+
+if t.TYPE_CHECKING:
+    from fzmovies_api.fuzzy import FuzzyIndex
+    from fzmovies_api.records import MovieRecords
+    from fzmovies_api.spill import SpillingAccumulator
 
 
 class Search(hunter.Index):
@@ -76,23 +96,101 @@ class Search(hunter.Index):
         self._latest_results = resp
         return resp
 
+    @classmethod
+    def batch(
+        cls,
+        queries: t.Iterable[str],
+        searchby: t.Literal["Name", "Director", "Starcast"] = "Name",
+        category: t.Literal["All", "Bollywood", "Hollywood", "DHollywood"] = "All",
+        limit: int = 1_000_000,
+        max_workers: int = 8,
+        seen: dedup.DedupIndex | None = None,
+    ) -> "SearchBatch":
+        """Perform many searches concurrently over the shared session
+
+        Args:
+            queries (t.Iterable[str]): Search queries.
+            searchby (t.Literal["Name", "Director", "Starcast"], optional): Search category. Defaults to "Name".
+            category (t.Literal["All", "Bollywood", "Hollywood", "DHollywood"], optional): Movie category. Defaults to "All".
+            limit (int, optional): Total movies per query not to exceed - `multiple of 20`. Defaults to 1_000_000.
+            max_workers (int, optional): Queries searched at once. Defaults to 8.
+            seen (dedup.DedupIndex, optional): Movies to leave out - those found are added. Defaults to None.
+
+        Returns:
+            SearchBatch: Iterable of deduplicated `models.QueryMatch`.
+        """
+        return SearchBatch(queries, searchby, category, limit, max_workers, seen)
+
+    def stream_results(self) -> t.Generator[models.MovieInSearch, None, None]:
+        """Yield movies of the search results page as soon as each is parsed.
+        Navigation is possible once exhausted.
+
+        Returns:
+            t.Generator[models.MovieInSearch, None, None]
+        """
+        stream = stream_search_handler(
+            self.query.stream_contents()
+            if self.is_filter
+            else self.stream_search(self.query, self.searchby, self.category)
+        )
+        yield from stream
+        self._latest_results = stream.results
+
+    def did_you_mean(self, index: "FuzzyIndex") -> str | None:
+        """Suggest a correction of the query from a local index.
+        No network search is made.
+
+        Args:
+            index (FuzzyIndex): Titles and names harvested by crawls.
+
+        Returns:
+            str | None: Suggestion unless the query is a filter or exactly indexed.
+        """
+        if self.is_filter:
+            return None
+        return index.did_you_mean(self.query, self.searchby)
+
+    @property
+    def latest_results(self) -> models.SearchResults | None:
+        """Results of the page last queried"""
+        return self._latest_results
+
     @property
     def all_results(self) -> models.SearchResults:
         """All search results"""
         return self.get_all_results()
 
     def get_all_results(
-        self, stream: bool = False, limit: int = 1_000_000
-    ) -> models.SearchResults | t.Generator[models.SearchResults, None, None]:
+        self,
+        stream: bool = False,
+        limit: int = 1_000_000,
+        compact: bool = False,
+        memory_budget: int | str | None = None,
+        prefetch: int = 0,
+    ) -> (
+        models.SearchResults
+        | t.Generator[models.SearchResults, None, None]
+        | "MovieRecords"
+        | "SpillingAccumulator"
+    ):
         """Fetch all search results
 
         Args:
             stream (bool, optional): Yield results. Defaults to False.
             limit (int, optional): Total movies not to exceed - `multiple of 20`. Defaults to 1_000_000.
+            compact (bool, optional): Accumulate the movies in a column-oriented
+              `records.MovieRecords` instead of one `SearchResults`. Defaults to False.
+            memory_budget (int | str | None, optional): Bytes - or size i.e `32MB` - of movies
+              held in memory, the rest being spilled to disk by a `spill.SpillingAccumulator`.
+              Implies `compact`. Defaults to None.
+            prefetch (int, optional): Pages fetched and parsed in the background while
+              the current one is consumed. Defaults to 0.
 
         Returns:
-            models.SearchResults | t.Generator[models.SearchResults, None, None]
+            models.SearchResults | t.Generator[models.SearchResults, None, None] | MovieRecords | SpillingAccumulator
         """
+        compact = compact or memory_budget is not None
+        assert not (stream and compact), "Streamed results cannot be compact"
 
         def for_stream(self, limit):
             total_movies_search = 0
@@ -121,7 +219,25 @@ class Search(hunter.Index):
                     cache = cache + results
             return cache
 
-        return for_stream(self, limit) if stream else for_non_stream(self, limit)
+        def for_compact(self, limit):
+            if memory_budget is None:
+                from fzmovies_api.records import MovieRecords
+
+                records = MovieRecords()
+            else:
+                from fzmovies_api.spill import SpillingAccumulator
+
+                records = SpillingAccumulator(memory_budget)
+            for results in for_stream(self, limit):
+                records.extend(results.movies)
+            return records
+
+        assert prefetch >= 0, "prefetch must not be negative"
+        if stream:
+            if prefetch:
+                return utils.read_ahead(for_stream(self, limit), prefetch)
+            return for_stream(self, limit)
+        return for_compact(self, limit) if compact else for_non_stream(self, limit)
 
     def first(self) -> "Search":
         """Navigate to the first page of search-results
@@ -180,20 +296,126 @@ class Search(hunter.Index):
         )
 
 
+class SearchBatch:
+    """Concurrent searches with results deduplicated by movie id.
+
+    Iterating yields `models.QueryMatch` as soon as a movie is first found.
+    Its `queries` grow as later queries list the same movie and are complete
+    once iteration is over. Queries that fail, i.e `errors.ZeroSearchResults`,
+    are recorded in `failures` instead of aborting the batch.
+    """
+
+    def __init__(
+        self,
+        queries: t.Iterable[str],
+        searchby: t.Literal["Name", "Director", "Starcast"] = "Name",
+        category: t.Literal["All", "Bollywood", "Hollywood", "DHollywood"] = "All",
+        limit: int = 1_000_000,
+        max_workers: int = 8,
+        seen: dedup.DedupIndex | None = None,
+    ):
+        """Initializes `SearchBatch`
+
+        Args:
+            queries (t.Iterable[str]): Search queries.
+            searchby (t.Literal["Name", "Director", "Starcast"], optional): Search category. Defaults to "Name".
+            category (t.Literal["All", "Bollywood", "Hollywood", "DHollywood"], optional): Movie category. Defaults to "All".
+            limit (int, optional): Total movies per query not to exceed - `multiple of 20`. Defaults to 1_000_000.
+            max_workers (int, optional): Queries searched at once. Defaults to 8.
+            seen (dedup.DedupIndex, optional): Movies to leave out, i.e found in
+              earlier runs - those found are added. Defaults to None.
+        """
+        self.queries = list(dict.fromkeys(queries))
+        assert self.queries, "At least one query is required"
+        assert all(type(query) is str for query in self.queries), (
+            f"Queries must be of {str} datatype only"
+        )
+        utils.assert_membership(searchby, utils.searchby_options, "Searchby")
+        utils.assert_membership(category, utils.category_options, "Category")
+        assert max_workers > 0, "max_workers must be greater than 0"
+        self.searchby = searchby
+        self.category = category
+        self.limit = limit
+        self.max_workers = max_workers
+        self.seen = seen
+        self.matches: dict[str, models.QueryMatch] = {}
+        """Movie id and its match"""
+        self.failures: dict[str, Exception] = {}
+        """Query and the exception it raised"""
+
+    def __str__(self):
+        return f"<fzmovies_api.main.SearchBatch queries={len(self.queries)},searchby='{self.searchby}',category='{self.category}'>"
+
+    def _search(
+        self, query: str, pages: queue.Queue, stop: threading.Event
+    ) -> None:
+        try:
+            for results in Search(query, self.searchby, self.category).get_all_results(
+                stream=True, limit=self.limit
+            ):
+                if stop.is_set():
+                    break
+                pages.put((query, results, None))
+        except Exception as e:  # noqa: BLE001
+            pages.put((query, None, e))
+        finally:
+            pages.put((query, None, None))
+
+    def __iter__(self) -> t.Generator[models.QueryMatch, None, None]:
+        workers = min(self.max_workers, len(self.queries))
+        hunter.Index.initialize_session()
+        hunter.ensure_pool_size(workers)
+        pages: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for query in self.queries:
+                executor.submit(self._search, query, pages, stop)
+            pending = len(self.queries)
+            while pending:
+                query, results, exception = pages.get()
+                if exception is not None:
+                    logger.debug(f"Search for '{query}' failed - {exception}")
+                    self.failures[query] = exception
+                elif results is None:
+                    pending -= 1
+                else:
+                    for movie in results.movies:
+                        key = utils.movie_id(movie.url)
+                        match = self.matches.get(key)
+                        if match is None:
+                            if self.seen is not None and not self.seen.add(movie.url):
+                                continue
+                            match = self.matches[key] = models.QueryMatch(
+                                movie=movie, queries=[query]
+                            )
+                            yield match
+                        elif query not in match.queries:
+                            match.queries.append(query)
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
 class Navigate:
     """Proceed over to the target movie"""
 
-    def __init__(self, target_movie: models.MovieInSearch):
+    def __init__(self, target_movie: models.MovieInSearch | str):
         """Initializes `Navigate`
 
         Args:
-            search_results (models.MovieInSearch): Modelled search results.
+            target_movie (models.MovieInSearch | str): Modelled search result or link to the movie page.
         """
-        assert isinstance(target_movie, models.MovieInSearch), (
-            "search_results must be an instance of "
-            f"'{models.MovieInSearch}' not '{type(target_movie)}'"
+        assert isinstance(target_movie, (models.MovieInSearch, str)), (
+            "target_movie must be an instance of "
+            f"'{models.MovieInSearch}' or {str} not '{type(target_movie)}'"
         )
         self.target_movie = target_movie
+        self.url = str(
+            target_movie.url
+            if isinstance(target_movie, models.MovieInSearch)
+            else utils.get_absolute_url(target_movie)
+        )
 
     def __str__(self):
         return f"<fzmovies_api.main.Navigate target_movie='{self.target_movie}'>"
@@ -201,12 +423,21 @@ class Navigate:
     @property
     def html_contents(self) -> str:
         """Movie page"""
-        return hunter.Metadata.movie_page(self.target_movie.url)
+        return hunter.Metadata.movie_page(self.url)
 
     @property
     def results(self) -> models.MovieFiles:
-        """Movie files"""
-        return handler.movie_handler(self.html_contents)
+        """Movie files. Cached no longer than their download keys last."""
+        model_cache = cache.model_cache
+        return model_cache.get_or_make(
+            self.url,
+            lambda: singleflight.group.do(
+                ("movie", utils.canonical_url(self.url)),
+                lambda: handler.movie_handler(self.html_contents),
+            ),
+            # Files link to download keys that expire
+            ttl=min(model_cache.ttl, cache.download_key_ttl),
+        )
 
 
 class DownloadLinks:
@@ -234,7 +465,14 @@ class DownloadLinks:
 
     @property
     def results(self) -> models.DownloadMovie:
-        """Links to downloadable movie file"""
+        """Links to downloadable movie file. They are tied to the session
+        and therefore never cached."""
+        return singleflight.group.do(
+            ("download-links", utils.canonical_url(self.movie_file.url)),
+            self._results,
+        )
+
+    def _results(self) -> models.DownloadMovie:
         download_url = handler.to_download_handler(self.html_contents)
         links_page = hunter.Metadata.to_download_links_page(download_url)
 
@@ -244,17 +482,22 @@ class DownloadLinks:
 class Download:
     """Download the movie file"""
 
-    def __init__(self, download_link: models.DownloadLink):
+    def __init__(
+        self, download_link: models.DownloadLink, last_url: str | None = None
+    ):
         """Initializes `Download`
 
         Args:
             download_link (models.DownloadLink): Url for the movie file
+            last_url (str, optional): Already resolved url pointing to the movie file.
+              Skips resolving it from `download_link`. Defaults to None.
         """
         assert isinstance(download_link, models.DownloadLink), (
             "movie_file must be an instance of "
             f"'{models.DownloadLink}' not '{type(download_link)}'"
         )
         self.download_link = download_link
+        self._last_url = last_url
 
     def __str__(self):
         return f"<fzmovies_api.main.Download : {self.download_link}>"
@@ -262,6 +505,8 @@ class Download:
     @property
     def last_url(self) -> str:
         """Last url pointing to movie file"""
+        if self._last_url:
+            return self._last_url
         return handler.final_download_link_handler(
             hunter.Metadata.download_link(self.download_link.url.__str__())
         )
@@ -277,7 +522,15 @@ class Download:
         leave: bool = True,
         colour: str = "cyan",
         simple: bool = True,
-    ):
+        preallocate: bool = True,
+        drop_cache: bool = False,
+        checksum: str | None = None,
+        expected_size: int | str | None = None,
+        rate_limit: bandwidth.RateType = None,
+        weight: float = 1.0,
+        throttle: bandwidth.Throttle | None = None,
+        position: int | None = None,
+    ) -> Path | models.SavedMovie:
         """Save the movie in disk
         Args:
             filename (str): Movie filename
@@ -289,38 +542,60 @@ class Download:
             leave (bool, optional): Keep all traces of the progressbar. Defaults to True.
             colour (str, optional): Progress bar display color. Defaults to "cyan".
             simple (bool, optional): Show percentage and bar only in progressbar. Deafults to False.
+            preallocate (bool, optional): Reserve disk space for the file before downloading. Defaults to True.
+            drop_cache (bool, optional): Evict written contents from OS page cache. Defaults to False.
+            checksum (str, optional): Hash algorithm i.e `sha256` for hashing contents as they stream in.
+              The digest is saved alongside the movie file. Defaults to None.
+            expected_size (int | str, optional): Exact size in bytes or advertised size like `805 MB`
+              i.e `DownloadMovie.size`. Defaults to None.
+            rate_limit (bandwidth.RateType, optional): Download speed cap in bytes per second
+              or human-readable i.e `2MB`. Defaults to None.
+            weight (float, optional): Share of `bandwidth.controller` global rate relative to
+              other downloads. Defaults to 1.0.
+            throttle (bandwidth.Throttle, optional): Registered throttle to use instead of
+              `rate_limit` and `weight`, for adjusting them while downloading. Defaults to None.
+            position (int, optional): Line of the progress bar among concurrent downloads' bars.
+              The bar is labelled with the filename. Defaults to None.
 
         Raises:
             FileExistsError:  Incase of `resume=True` but the download was complete
-            Exception: _description_
+            errors.InsufficientStorage: Disk has no room for the movie file.
+            errors.DownloadError: Server responded with empty contents.
+            errors.IntegrityError: Saved contents are not of the expected size.
 
         Returns:
-            str: Path where the movie contents have been saved to.
+            Path | models.SavedMovie: Path where the movie contents have been saved to
+              or `SavedMovie` along with the digest when `checksum` is specified.
         """
         current_downloaded_size = 0
-        current_downloaded_size_in_mb = 0
         save_to = Path(dir) / filename
         movie_file_url = self.last_url
-
-        def pop_range_in_session_headers():
-            if hunter.session.headers.get("Range"):
-                hunter.session.headers.pop("Range")
+        request_headers = {}
 
         if resume:
             assert path.exists(save_to), f"File not found in path - '{save_to}'"
             current_downloaded_size = path.getsize(save_to)
-            # Set the headers to resume download from the last byte
-            hunter.session.headers.update({
-                "Range": f"bytes={current_downloaded_size}-"
-            })
-            current_downloaded_size_in_mb = current_downloaded_size / 1000000
+            # Resume download from the last byte
+            request_headers["Range"] = f"bytes={current_downloaded_size}-"
 
         default_content_length = 0
 
-        resp = hunter.session.get(movie_file_url, stream=True)
+        resp = hunter.session.get(movie_file_url, stream=True, headers=request_headers)
+
+        if not resp.ok:
+            resp.close()
+            if resume and resp.status_code == 416:
+                # Range starts past the end - done if the file is that large
+                total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+                if total == str(current_downloaded_size):
+                    raise FileExistsError(
+                        f"Download completed for the file in path - '{save_to}'"
+                    )
+            resp.raise_for_status()
 
         size_in_bytes = int(resp.headers.get("content-length", default_content_length))
         if not size_in_bytes:
+            resp.close()
             if resume:
                 raise FileExistsError(
                     f"Download completed for the file in path - '{save_to}'"
@@ -330,57 +605,115 @@ class Download:
                     f"Cannot download file of content-length {size_in_bytes} bytes"
                 )
 
-        if resume:
-            assert size_in_bytes != current_downloaded_size, (
-                f"Download completed for the file in path - '{save_to}'"
-            )
+        if resume and resp.status_code != 206:
+            if resp.status_code != 200:
+                resp.close()
+                raise errors.DownloadError(
+                    f"Cannot resume download - server replied with status {resp.status_code}"
+                )
+            # Server ignored the range and sent the whole file
+            if size_in_bytes == current_downloaded_size:
+                resp.close()
+                raise FileExistsError(
+                    f"Download completed for the file in path - '{save_to}'"
+                )
+            logger.warning(f"Server cannot resume downloads. Restarting '{filename}'")
+            current_downloaded_size = 0
 
-        size_in_mb = (size_in_bytes / 1_000_000) + current_downloaded_size_in_mb
+        size_in_mb = (size_in_bytes + current_downloaded_size) / 1_000_000
         chunk_size_in_bytes = chunk_size * 1_000
 
-        saving_mode = "ab" if resume else "wb"
-        if progress_bar:
-            if not quiet:
-                print(f"{filename}")
-            with tqdm(
-                desc="Downloading",
-                total=round(size_in_mb, 1),
-                bar_format=(
-                    "{l_bar}{bar} | %(size)s MB" % ({"size": round(size_in_mb, 1)})  # noqa: UP031
-                    if simple
-                    else "{l_bar}{bar}{r_bar}"
-                ),
-                initial=current_downloaded_size_in_mb,
-                unit="Mb",
-                colour=colour,
-                leave=leave,
-            ) as p_bar:
-                # p_bar.update(current_downloaded_size)
-                with open(save_to, saving_mode) as fh:
-                    for chunks in resp.iter_content(chunk_size=chunk_size_in_bytes):
-                        fh.write(chunks)
-                        p_bar.update(round(chunk_size_in_bytes / 1_000_000, 1))
-                pop_range_in_session_headers()
-                return save_to
-        else:
-            with open(save_to, saving_mode) as fh:
-                for chunks in resp.iter_content(chunk_size=chunk_size_in_bytes):
-                    fh.write(chunks)
+        hasher = None
+        if checksum:
+            hasher = writer.new_hasher(checksum)
+            if current_downloaded_size:
+                writer.hash_file(save_to, hasher, length=current_downloaded_size)
+
+        file_writer = writer.FileWriter(
+            save_to,
+            offset=current_downloaded_size,
+            expected_size=size_in_bytes,
+            buffer_size=chunk_size_in_bytes,
+            preallocate=preallocate,
+            drop_cache=drop_cache,
+            hasher=hasher,
+        )
+
+        own_throttle = throttle is None
+        if own_throttle:
+            throttle = bandwidth.controller.register(
+                weight=weight, rate=rate_limit, name=filename
+            )
+
+        try:
+            if progress_bar:
+                from tqdm import tqdm
+
+                if not quiet and position is None:
+                    print(f"{filename}")
+                p_bar = tqdm(
+                    desc="Downloading" if position is None else filename[:30],
+                    position=position,
+                    total=round(size_in_mb, 1),
+                    bar_format=(
+                        "{l_bar}{bar} | %(size)s MB" % ({"size": round(size_in_mb, 1)})  # noqa: UP031
+                        if simple
+                        else "{l_bar}{bar}{r_bar}"
+                    ),
+                    initial=round(current_downloaded_size / 1_000_000, 1),
+                    unit="Mb",
+                    colour=colour,
+                    leave=leave,
+                )
+                file_writer.on_flush = lambda flushed: p_bar.update(
+                    flushed / 1_000_000
+                )
+            else:
+                p_bar = nullcontext()
 
+            with p_bar, file_writer:
+                received = writer.stream_to(
+                    resp, file_writer, chunk_size_in_bytes, throttle=throttle
+                )
+        finally:
+            resp.close()
+            if own_throttle:
+                throttle.close()
+
+        if not progress_bar:
             logger.info(f"{filename} - {size_in_mb}MB ✅")
-            pop_range_in_session_headers()
-            return save_to
+
+        if "Content-Encoding" not in resp.headers and received != size_in_bytes:
+            raise errors.IntegrityError(
+                f"Expected {size_in_bytes} bytes but received {received} bytes"
+                f" for the file in path - '{save_to}'"
+            )
+
+        return writer.finalize(
+            save_to,
+            current_downloaded_size + received,
+            expected_size=expected_size,
+            hasher=hasher,
+        )
 
 
 class Auto(Search):
     """Performs a search and proceeds with  every first item
     all the way to downloading."""
 
-    def __init__(self, quality: t.Literal["480p", "720p"] = "720p", *args, **kwargs):
+    def __init__(
+        self,
+        quality: t.Literal["480p", "720p"] = "720p",
+        *args,
+        quality_floor: bool = False,
+        **kwargs,
+    ):
         """Initializes `Auto`
 
         Args:
             quality (t.Literal[480p, 720p], optional): Video quality. Default to 720p.
+            quality_floor (bool, optional): Take `quality` as the least acceptable and
+              download the smallest file meeting it. Defaults to False.
             The rest are arguments for initializing `Search`.
 
         Example:
@@ -401,25 +734,42 @@ class Auto(Search):
         )
         super().__init__(*args, **kwargs)
         self.target = self.results.movies[0]
-        self._movie_file_index = utils.file_index_quality_map.get(quality)
+        self.quality = quality
+        self.quality_floor = quality_floor
 
     def __str__(self):
         return f"<fzmovies_api.main.Auto : {self.target}>"
 
-    def run(self, *args, **kwargs) -> Path:
+    def run(
+        self, *args, probe_links: bool = False, swarm: bool = False, **kwargs
+    ) -> Path | models.SavedMovie:
         """Start auto mode.
         Args:
-            The rest are arguments for `Download.save`
+            probe_links (bool, optional): Download from the fastest link instead
+              of the first one. Defaults to False.
+            swarm (bool, optional): Download from all working links at once. Defaults to False.
+            The rest are arguments for `Download.save` or `swarm.SwarmDownload.save`
 
         Returns:
-            Path: Absolute path to the downloaded movie file
+            Path | models.SavedMovie: Absolute path to the downloaded movie file
         """
-        movie_file = Navigate(self.target).results.files[self._movie_file_index]
+        movie_file = utils.select_file(
+            Navigate(self.target).results.files, self.quality, self.quality_floor
+        )
         download_movie = DownloadLinks(movie_file).results
-        download_link = download_movie.links[0]
         if not kwargs.get("filename"):
             kwargs["filename"] = download_movie.filename
-        return Download(download_link).save(*args, **kwargs)
+        kwargs.setdefault("expected_size", download_movie.size)
+        if swarm:
+            from fzmovies_api.swarm import SwarmDownload
+
+            return SwarmDownload(download_movie.links).save(*args, **kwargs)
+        if probe_links:
+            probe = mirrors.fastest_link(download_movie.links)
+            download = Download(probe.link, last_url=probe.last_url)
+        else:
+            download = Download(download_movie.links[0])
+        return download.save(*args, **kwargs)
 
 
 class Support:
@@ -0,0 +1,162 @@
+"""
+This module picks the best of the several
+`DownloadLink`s offered for a movie file.
+
+Candidates are resolved concurrently through `Download.last_url`
+and probed with a short ranged read that measures time-to-first-byte
+and throughput. Links are then ranked on those plus their
+`connections` count.
+"""
+
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+from fzmovies_api import errors, hunter, logger, models
+
+default_probe_size = 256 * 1024
+"""Bytes read from every candidate"""
+
+connections_penalty = 0.01
+"""Score reduction per connection already served by a link"""
+
+
+def resolve_last_url(download_link: models.DownloadLink) -> str:
+    """Resolve url pointing to the movie file behind `download_link`"""
+    from fzmovies_api.main import Download
+
+    return Download(download_link).last_url
+
+
+def score(probe: models.LinkProbe) -> float:
+    """Rank value of a probed link - higher is better.
+
+    Throughput discounted by time-to-first-byte and the
+    number of connections already served by the link.
+    """
+    if probe.error or not probe.throughput:
+        return 0.0
+    return (
+        probe.throughput
+        / (1 + probe.ttfb)
+        / (1 + probe.link.connections * connections_penalty)
+    )
+
+
+def probe_link(
+    download_link: models.DownloadLink,
+    probe_size: int = default_probe_size,
+    timeout: int = 10,
+    resolve: t.Callable[[models.DownloadLink], str] = resolve_last_url,
+) -> models.LinkProbe:
+    """Resolve and measure a single link. Failures are recorded, not raised.
+
+    Args:
+        download_link (models.DownloadLink): Link to be probed.
+        probe_size (int, optional): Bytes to read. Defaults to `default_probe_size`.
+        timeout (int, optional): Http request timeout. Defaults to 10.
+        resolve (t.Callable, optional): Resolves the final url. Defaults to `resolve_last_url`.
+
+    Returns:
+        models.LinkProbe: Measurements.
+    """
+    last_url = None
+    try:
+        last_url = resolve(download_link)
+        started_at = time.perf_counter()
+        resp = hunter.session.get(
+            last_url,
+            headers={"Range": f"bytes=0-{probe_size - 1}"},
+            stream=True,
+            timeout=timeout,
+        )
+        try:
+            resp.raise_for_status()
+            received = 0
+            first_byte_at = None
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                if first_byte_at is None:
+                    first_byte_at = time.perf_counter()
+                received += len(chunk)
+                if received >= probe_size:
+                    break
+            finished_at = time.perf_counter()
+        finally:
+            resp.close()
+
+        if not received:
+            raise errors.DownloadError("Link served no contents")
+
+        size = None
+        content_range = resp.headers.get("Content-Range", "")
+        if "/" in content_range and not content_range.endswith("*"):
+            size = int(content_range.rsplit("/", 1)[1])
+        elif resp.status_code == 200 and resp.headers.get("content-length"):
+            size = int(resp.headers["content-length"])
+
+        probe = models.LinkProbe(
+            link=download_link,
+            last_url=last_url,
+            ttfb=first_byte_at - started_at,
+            throughput=received / max(finished_at - started_at, 1e-6),
+            size=size,
+            supports_range=resp.status_code == 206,
+        )
+    except Exception as e:  # noqa: BLE001
+        logger.debug(f"Probing {download_link} failed - {e}")
+        probe = models.LinkProbe(link=download_link, last_url=last_url, error=str(e))
+
+    probe.score = score(probe)
+    return probe
+
+
+def rank_links(
+    download_links: list[models.DownloadLink],
+    probe_size: int = default_probe_size,
+    timeout: int = 10,
+    max_workers: int | None = None,
+    resolve: t.Callable[[models.DownloadLink], str] = resolve_last_url,
+) -> list[models.LinkProbe]:
+    """Probe links concurrently and rank them from fastest to slowest.
+    Failed links come last.
+
+    Args:
+        download_links (list[models.DownloadLink]): Candidates i.e `DownloadMovie.links`.
+        probe_size (int, optional): Bytes to read from every link. Defaults to `default_probe_size`.
+        timeout (int, optional): Http request timeout. Defaults to 10.
+        max_workers (int, optional): Links probed at once. Defaults to all of them.
+        resolve (t.Callable, optional): Resolves the final url. Defaults to `resolve_last_url`.
+
+    Returns:
+        list[models.LinkProbe]: Ranked probes.
+    """
+    assert download_links, "At least one download link is required"
+    with ThreadPoolExecutor(max_workers=max_workers or len(download_links)) as executor:
+        probes = list(
+            executor.map(
+                lambda link: probe_link(link, probe_size, timeout, resolve),
+                download_links,
+            )
+        )
+    return sorted(probes, key=lambda probe: probe.score, reverse=True)
+
+
+def fastest_link(
+    download_links: list[models.DownloadLink], *args, **kwargs
+) -> models.LinkProbe:
+    """Probe links and get the fastest working one
+
+    Args:
+        download_links (list[models.DownloadLink]): Candidates i.e `DownloadMovie.links`.
+        The rest are arguments for `rank_links`.
+
+    Raises:
+        errors.DownloadError: None of the links works.
+
+    Returns:
+        models.LinkProbe: Fastest link.
+    """
+    best = rank_links(download_links, *args, **kwargs)[0]
+    if best.error:
+        raise errors.DownloadError(f"None of the download links works - {best.error}")
+    return best
@@ -11,8 +11,12 @@ The models are not limited to:
 - Download links
 """
 
+import typing as t
+from pathlib import Path
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, computed_field
+
+from fzmovies_api import utils
 
 
 class MovieInSearch(BaseModel):
@@ -69,6 +73,36 @@ class SearchResults(BaseModel):
         )
 
 
+class QueryMatch(BaseModel):
+    """Movie found by a batch search
+    `movie` : Movie listed in the results.
+    `queries` : Queries whose results list the movie.
+    """
+
+    movie: MovieInSearch
+    queries: list[str]
+
+    def __str__(self):
+        return f"<QueryMatch movie={self.movie},queries={self.queries}>"
+
+
+class FuzzyMatch(BaseModel):
+    """Locally indexed entry resembling a query
+    `text` : Movie title, director or cast name.
+    `searchby` : What `text` is - Name, Director or Starcast.
+    `score` : Resemblance from 0 to 1.
+    `urls` : Links to the movie pages.
+    """
+
+    text: str
+    searchby: str
+    score: float
+    urls: list[str]
+
+    def __str__(self):
+        return f'<FuzzyMatch text="{self.text}",score={self.score}>'
+
+
 class FileMetadata(BaseModel):
     """Movie file
     `title` : ..
@@ -76,6 +110,8 @@ class FileMetadata(BaseModel):
     `size` : Size of the movie file.
     `hits` : File download count
     `mediainfo` : ..
+    `size_in_bytes` : Size parsed to bytes.
+    `resolution` : Vertical resolution parsed from the title.
     """
 
     title: str
@@ -85,6 +121,18 @@ class FileMetadata(BaseModel):
     mediainfo: HttpUrl
     ss: HttpUrl | None = None
 
+    @computed_field
+    @property
+    def size_in_bytes(self) -> int | None:
+        """`size` in bytes"""
+        return utils.parse_size_or_none(self.size)
+
+    @computed_field
+    @property
+    def resolution(self) -> int | None:
+        """Vertical resolution i.e 720 for a 720p file"""
+        return utils.parse_resolution(self.title)
+
     def __str__(self):
         return f'<FileMetadata title="{self.title}",size="{self.size}">'
 
@@ -104,6 +152,23 @@ class RecommendedMovie(BaseModel):
         return f'<RecommendedMovie title="{self.title}">'
 
 
+class MovieNode(BaseModel):
+    """Movie reached while following recommendations
+    `url` : Link to the movie page
+    `title` : Movie title if known.
+    `cover_photo` : Link to movie's release photo if known.
+    `depth` : Recommendations followed from the nearest seed.
+    """
+
+    url: HttpUrl
+    title: str | None = None
+    cover_photo: HttpUrl | None = None
+    depth: int
+
+    def __str__(self):
+        return f'<MovieNode title="{self.title}",depth={self.depth}>'
+
+
 class MovieFiles(BaseModel):
     """Collection of movie files
     `files` : List of `FileMetadata`
@@ -132,12 +197,42 @@ class DownloadLink(BaseModel):
         return f'<DownloadLink url="{self.url}", connections={self.connections}>'
 
 
+class LinkProbe(BaseModel):
+    """Measured download link
+    `link` : Probed `DownloadLink`
+    `last_url` : Resolved url pointing to the movie file.
+    `ttfb` : Seconds taken to receive the first byte.
+    `throughput` : Bytes per second during the probe.
+    `size` : Size of the movie file in bytes.
+    `supports_range` : Link can serve byte ranges.
+    `error` : Reason the probe failed.
+    `score` : Rank value - higher is better.
+    """
+
+    link: DownloadLink
+    last_url: str | None = None
+    ttfb: float | None = None
+    throughput: float | None = None
+    size: int | None = None
+    supports_range: bool = False
+    error: str | None = None
+    score: float = 0.0
+
+    def __str__(self):
+        return (
+            f"<LinkProbe url=\"{self.link.url}\", score={round(self.score, 2)},"
+            f" error={self.error!r}>"
+        )
+
+
 class DownloadMovie(BaseModel):
     """Download metadata
     `filename` : Movie filename
     `links` : List of `DownloadLink`
     `size` : Movie file size.
     `info` : In-download page message.
+    `size_in_bytes` : Size parsed to bytes.
+    `resolution` : Vertical resolution parsed from the filename.
     """
 
     filename: str
@@ -145,8 +240,60 @@ class DownloadMovie(BaseModel):
     size: str
     info: str
 
+    @computed_field
+    @property
+    def size_in_bytes(self) -> int | None:
+        """`size` in bytes"""
+        return utils.parse_size_or_none(self.size)
+
+    @computed_field
+    @property
+    def resolution(self) -> int | None:
+        """Vertical resolution i.e 720 for a 720p file"""
+        return utils.parse_resolution(self.filename)
+
     def __str__(self):
         return (
             f'<DownloadMovie filename="{self.filename}",'
             f' links={len(self.links)}, size="{self.size}">'
         )
+
+
+class SavedMovie(BaseModel):
+    """Downloaded movie file
+    `path` : Where the movie file has been saved to.
+    `size` : Size of the file in bytes.
+    `algorithm` : Hash algorithm used.
+    `digest` : Hex digest of the file contents.
+    `checksum_file` : Path to the file containing the digest.
+    """
+
+    path: Path
+    size: int
+    algorithm: str
+    digest: str
+    checksum_file: Path
+
+    def __str__(self):
+        return f'<SavedMovie path="{self.path}", {self.algorithm}={self.digest}>'
+
+
+class BulkDownloadResult(BaseModel):
+    """Outcome of an entry of a bulk download
+    `entry` : Query or link to the movie page.
+    `status` : downloaded, skipped or failed.
+    `path` : Where the movie file is.
+    `size` : Bytes of the movie file on disk.
+    `elapsed` : Seconds taken.
+    `error` : Reason for failure or skipping.
+    """
+
+    entry: str
+    status: t.Literal["downloaded", "skipped", "failed"]
+    path: Path | None = None
+    size: int | None = None
+    elapsed: float = 0.0
+    error: str | None = None
+
+    def __str__(self):
+        return f'<BulkDownloadResult entry="{self.entry}",status={self.status}>'
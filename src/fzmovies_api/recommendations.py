@@ -0,0 +1,197 @@
+"""
+This module discovers movies by following the recommendations
+listed on movie pages.
+
+Starting from seed movies, the recommendation graph is walked
+breadth-first, a level at a time, so that every movie is reached at
+its least depth. Pages of a level are fetched concurrently. Nodes and
+edges are handed out as they are found, which makes titles missing
+from the listing filters reachable without fetching every page.
+
+```python
+from fzmovies_api.recommendations import GraphWriter, RecommendationCrawler
+
+with GraphWriter("graph.jsonl") as graph:
+    RecommendationCrawler(["/movie-Heat--hmp4.htm"], max_depth=3).run(
+        graph.write_node, graph.write_edge
+    )
+```
+"""
+
+import json
+import typing as t
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from fzmovies_api import hunter, models
+from fzmovies_api.dedup import DedupIndex
+from fzmovies_api.utils import get_absolute_url, movie_id
+
+Seed = t.Union[models.MovieInSearch, models.RecommendedMovie, str]  # noqa: UP007
+
+
+class RecommendationCrawler:
+    """Walks the recommendation graph breadth-first"""
+
+    def __init__(
+        self,
+        seeds: t.Iterable[Seed],
+        max_depth: int = 2,
+        max_nodes: int = 1_000,
+        workers: int = 8,
+        seen: DedupIndex | None = None,
+    ):
+        """Initializes `RecommendationCrawler`
+
+        Args:
+            seeds (t.Iterable[Seed]): Movies or links to movie pages to start from.
+            max_depth (int, optional): Recommendations followed from the seeds. Defaults to 2.
+            max_nodes (int, optional): Movies reached before discovery stops. Defaults to 1_000.
+            workers (int, optional): Pages fetched at once. Defaults to 8.
+            seen (DedupIndex | None, optional): Movies already known, i.e from listing crawls.
+              They are walked through but not handed out - those handed out are added. Defaults to None.
+        """
+        assert max_depth >= 0, "max_depth must not be negative"
+        assert max_nodes > 0, "max_nodes must be greater than 0"
+        assert workers > 0, "workers must be greater than 0"
+        self.seeds = list(seeds)
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.workers = workers
+        self.seen = seen
+        self.nodes: dict[str, models.MovieNode] = {}
+        """Ids of the movies reached and their nodes"""
+        self.failures: dict[str, Exception] = {}
+        """Movies whose pages could not be fetched"""
+        self.stats: Counter[str] = Counter()
+        """Number of `nodes`, `known` nodes, `edges`, `pages` fetched & `failed`"""
+
+    def __repr__(self):
+        return (
+            f"<fzmovies_api.recommendations.RecommendationCrawler seeds={len(self.seeds)},"
+            f"max_depth={self.max_depth},max_nodes={self.max_nodes}>"
+        )
+
+    @staticmethod
+    def node(seed: Seed, depth: int) -> models.MovieNode:
+        """Make node of `seed` at `depth`"""
+        if isinstance(seed, str):
+            return models.MovieNode(url=get_absolute_url(seed), depth=depth)
+        return models.MovieNode(
+            url=seed.url, title=seed.title, cover_photo=seed.cover_photo, depth=depth
+        )
+
+    def fetch(self, url: str) -> list[models.RecommendedMovie]:
+        """Movies recommended in page `url`"""
+        from fzmovies_api.main import Navigate
+
+        return Navigate(url).results.recommended
+
+    def run(
+        self,
+        on_node: t.Callable[[models.MovieNode], None] | None = None,
+        on_edge: t.Callable[[str, str], None] | None = None,
+    ) -> dict[str, models.MovieNode]:
+        """Walk the graph to `max_depth` or until `max_nodes` movies are reached.
+        Callbacks are called from the calling thread only.
+
+        Args:
+            on_node (t.Callable[[models.MovieNode], None], optional): Receives every
+              movie once, as it is reached, unless it is `seen`. Defaults to None.
+            on_edge (t.Callable[[str, str], None], optional): Receives the ids
+              of a movie and of a movie it recommends - `utils.movie_id`. Edges to
+              movies beyond `max_nodes` are left out. Defaults to None.
+
+        Returns:
+            dict[str, models.MovieNode]: `nodes`
+        """
+
+        def reach(seed: Seed, depth: int) -> str | None:
+            url = seed if isinstance(seed, str) else seed.url
+            key = movie_id(url)
+            if key in self.nodes:
+                return key
+            if len(self.nodes) >= self.max_nodes:
+                return None
+            node = self.nodes[key] = self.node(seed, depth)
+            self.stats["nodes"] += 1
+            if self.seen is not None and not self.seen.add(url):
+                self.stats["known"] += 1
+            elif on_node is not None:
+                on_node(node)
+            return key
+
+        level = [key for key in (reach(seed, 0) for seed in self.seeds) if key]
+        level = list(dict.fromkeys(level))
+        hunter.Index.initialize_session()
+        hunter.ensure_pool_size(self.workers)
+
+        with ThreadPoolExecutor(
+            self.workers, thread_name_prefix="fzmovies-recommendations"
+        ) as pool:
+            for depth in range(1, self.max_depth + 1):
+                if not level:
+                    break
+                fetching = {
+                    pool.submit(self.fetch, str(self.nodes[key].url)): key
+                    for key in level
+                }
+                next_level = []
+                for future in as_completed(fetching):
+                    source = fetching[future]
+                    try:
+                        recommended = future.result()
+                    except Exception as e:  # noqa: BLE001
+                        self.failures[source] = e
+                        self.stats["failed"] += 1
+                        continue
+                    self.stats["pages"] += 1
+                    targets = set()
+                    for movie in recommended:
+                        known = movie_id(movie.url) in self.nodes
+                        target = reach(movie, depth)
+                        if target is None or target == source or target in targets:
+                            continue
+                        targets.add(target)
+                        if not known:
+                            next_level.append(target)
+                        self.stats["edges"] += 1
+                        if on_edge is not None:
+                            on_edge(source, target)
+                level = next_level
+
+        return self.nodes
+
+
+class GraphWriter:
+    """Writes nodes and edges as JSON Lines -
+    `{"node": {...}}` and `{"edge": [source, target]}`"""
+
+    def __init__(self, path: Path | str):
+        """Initializes `GraphWriter`
+
+        Args:
+            path (Path | str): File to write to.
+        """
+        self.path = Path(path)
+        self._fh = open(self.path, "w", encoding="utf-8")
+
+    def __enter__(self) -> "GraphWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write_node(self, node: models.MovieNode):
+        """Write a node as a single line"""
+        self._fh.write(json.dumps({"node": node.model_dump(mode="json")}) + "\n")
+        self._fh.flush()
+
+    def write_edge(self, source: str, target: str):
+        """Write an edge as a single line"""
+        self._fh.write(json.dumps({"edge": [source, target]}) + "\n")
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
@@ -0,0 +1,356 @@
+"""
+This module holds crawled movies compactly.
+
+`MovieRecords` keeps movies column by column instead of as `MovieInSearch`
+models: the text fields are utf-8 encoded back to back in one buffer per
+column with an array of where each ends, years are 16-bit integers and
+distributions - of which the site has a handful - are interned and kept
+as codes. That takes roughly the size of the text itself, a fraction of
+what the models and their `HttpUrl` objects take. Rows are read through
+`MovieRecord`, a slotted view decoding fields on access.
+
+The columns can be written to a file and mapped back into memory, so
+that a crawl is reloaded without being parsed and its pages are shared
+by every process mapping it.
+
+```python
+from fzmovies_api import Search
+from fzmovies_api.records import MovieRecords
+
+records = Search("Action").get_all_results(compact=True)
+records.save("action.records")
+
+with MovieRecords.load("action.records") as records:
+    print(records[0].title)
+```
+"""
+
+import mmap
+import os
+import struct
+import sys
+import typing as t
+from array import array
+from pathlib import Path
+
+from fzmovies_api import models
+
+magic = b"FZRECS01"
+"""Leading bytes of records files"""
+
+header = struct.Struct("<8sQQ")
+"""Magic, the number of rows and the size of the distribution names"""
+
+string_fields = ("url", "title", "about", "cover_photo")
+"""Text fields of `MovieInSearch` in the order they are written"""
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _little_endian(column: t.Any) -> t.Any:
+    if sys.byteorder == "big" and not isinstance(column, (bytearray, bytes)):
+        column = array(column.typecode if isinstance(column, array) else column.format, column)
+        column.byteswap()
+    return column
+
+
+def write_column(fh: t.BinaryIO, column: t.Any):
+    """Write buffer `column` little-endian to `fh`, padded to 8 bytes"""
+    fh.write(_little_endian(column))
+    fh.write(b"\0" * (_aligned(fh.tell()) - fh.tell()))
+
+
+class ColumnReader:
+    """Reads columns written by `write_column` out of a buffer in turn"""
+
+    def __init__(self, view: memoryview, offset: int = 0):
+        self.view = view
+        self.offset = offset
+        self.views: list[memoryview] = [view]
+        """Views taken - to be released before the buffer is closed"""
+
+    def take(self, size: int, format: str | None = None, align: bool = True) -> t.Any:
+        """Next `size` bytes as a view cast to `format`"""
+        part = self.view[self.offset : self.offset + size]
+        self.views.append(part)
+        self.offset += size
+        if align:
+            self.offset = _aligned(self.offset)
+        if format is None:
+            return part
+        part = part.cast(format)
+        self.views.append(part)
+        if sys.byteorder == "big":
+            part = array(format, part)
+            part.byteswap()
+        return part
+
+
+def map_file(
+    path: Path | str, magic: bytes, kind: str
+) -> tuple[mmap.mmap, ColumnReader]:
+    """Map file `path` read-only after checking its leading `magic`
+
+    Raises:
+        ValueError: `path` does not start with `magic`.
+
+    Returns:
+        tuple[mmap.mmap, ColumnReader]: The mapping and a reader of it
+    """
+    with open(path, "rb") as fh:
+        try:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            mapped = None  # Empty file
+    if mapped is None or mapped[: len(magic)] != magic:
+        if mapped is not None:
+            mapped.close()
+        raise ValueError(f"'{path}' is not a {kind} file")
+    return mapped, ColumnReader(memoryview(mapped))
+
+
+def release(mapped: mmap.mmap, views: list[memoryview]):
+    """Release `views` of `mapped` and unmap it"""
+    for view in reversed(views):
+        view.release()
+    views.clear()
+    mapped.close()
+
+
+class StringColumn:
+    """Utf-8 texts back to back and where each ends"""
+
+    __slots__ = ("ends", "data")
+
+    def __init__(self, ends: t.Any = None, data: t.Any = None):
+        self.ends = array("Q") if ends is None else ends
+        self.data = bytearray() if data is None else data
+
+    def append(self, text: str):
+        self.data += text.encode()
+        self.ends.append(len(self.data))
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def __getitem__(self, row: int) -> str:
+        return str(self.raw(row), "utf-8")
+
+    def raw(self, row: int) -> bytes:
+        start = self.ends[row - 1] if row else 0
+        return bytes(self.data[start : self.ends[row]])
+
+
+class MovieRecord:
+    """Read-only view of a row of `MovieRecords`"""
+
+    __slots__ = ("_records", "_row")
+
+    def __init__(self, records: "MovieRecords", row: int):
+        self._records = records
+        self._row = row
+
+    def __str__(self):
+        return f'<MovieRecord title="{self.title}",year={self.year}>'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        if not isinstance(other, MovieRecord):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    @property
+    def url(self) -> str:
+        """Link to the movie page"""
+        return self._records._strings["url"][self._row]
+
+    @property
+    def title(self) -> str:
+        """Movie title"""
+        return self._records._strings["title"][self._row]
+
+    @property
+    def year(self) -> int:
+        """Movie release year"""
+        return self._records._years[self._row]
+
+    @property
+    def distribution(self) -> str:
+        """Movie distribution name"""
+        return self._records.distributions[self._records._distributions[self._row]]
+
+    @property
+    def about(self) -> str:
+        """Movie plot"""
+        return self._records._strings["about"][self._row]
+
+    @property
+    def cover_photo(self) -> str:
+        """Link to movie's release photo"""
+        return self._records._strings["cover_photo"][self._row]
+
+    def as_dict(self) -> dict[str, t.Any]:
+        """Fields of the movie"""
+        return {
+            "url": self.url,
+            "title": self.title,
+            "year": self.year,
+            "distribution": self.distribution,
+            "about": self.about,
+            "cover_photo": self.cover_photo,
+        }
+
+    def model(self) -> models.MovieInSearch:
+        """The movie as `MovieInSearch`"""
+        return models.MovieInSearch(**self.as_dict())
+
+
+class MovieRecords:
+    """Column-oriented store of `MovieInSearch`"""
+
+    def __init__(self, movies: t.Iterable[models.MovieInSearch | MovieRecord] = ()):
+        """Initializes `MovieRecords`
+
+        Args:
+            movies (t.Iterable[models.MovieInSearch | MovieRecord], optional): Movies to begin with. Defaults to ().
+        """
+        self._strings = {field: StringColumn() for field in string_fields}
+        self._years = array("H")
+        self._distributions = array("H")
+        """Codes of the distribution names of each row"""
+        self.distributions: list[str] = []
+        """Distribution names interned"""
+        self._codes: dict[str, int] = {}
+        self._mmap: mmap.mmap | None = None
+        self._views: list[memoryview] = []
+        self.extend(movies)
+
+    def __repr__(self):
+        return f"<fzmovies_api.records.MovieRecords movies={len(self)},nbytes={self.nbytes}>"
+
+    def __len__(self) -> int:
+        return len(self._years)
+
+    def __getitem__(self, row: int) -> MovieRecord:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("MovieRecords index out of range")
+        return MovieRecord(self, row)
+
+    def __iter__(self) -> t.Iterator[MovieRecord]:
+        for row in range(len(self)):
+            yield MovieRecord(self, row)
+
+    def __enter__(self) -> "MovieRecords":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def readonly(self) -> bool:
+        """Whether the records are mapped from a file"""
+        return bool(self._views)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes taken by the columns"""
+        return (
+            sum(
+                len(strings.data) + strings.ends.itemsize * len(strings.ends)
+                for strings in self._strings.values()
+            )
+            + self._years.itemsize * len(self._years)
+            + self._distributions.itemsize * len(self._distributions)
+        )
+
+    def append(self, movie: models.MovieInSearch | MovieRecord):
+        """Add `movie`"""
+        assert not self.readonly, "Records mapped from a file are read-only"
+        code = self._codes.get(movie.distribution)
+        if code is None:
+            code = self._codes[movie.distribution] = len(self.distributions)
+            self.distributions.append(movie.distribution)
+        for field in string_fields:
+            self._strings[field].append(str(getattr(movie, field)))
+        self._years.append(movie.year)
+        self._distributions.append(code)
+
+    def extend(self, movies: t.Iterable[models.MovieInSearch | MovieRecord]):
+        """Add `movies`"""
+        for movie in movies:
+            self.append(movie)
+
+    def models(self) -> list[models.MovieInSearch]:
+        """The movies as `MovieInSearch`"""
+        return [record.model() for record in self]
+
+    def dump(self, fh: t.BinaryIO):
+        """Write the records to binary file `fh` at an 8-byte aligned offset"""
+        names = "\n".join(self.distributions).encode()
+        write_column(fh, header.pack(magic, len(self), len(names)) + names)
+        for field in string_fields:
+            write_column(fh, self._strings[field].ends)
+            write_column(fh, self._strings[field].data)
+        write_column(fh, self._years)
+        write_column(fh, self._distributions)
+
+    def save(self, path: Path | str):
+        """Write the records to `path` without leaving it half-written"""
+        path = Path(path)
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as fh:
+            self.dump(fh)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "MovieRecords":
+        """Map records saved by `save` into memory. Fields are read from
+        the file as they are accessed.
+
+        Raises:
+            ValueError: `path` is not a records file.
+
+        Returns:
+            MovieRecords: Read-only records
+        """
+        mapped, reader = map_file(path, magic, "records")
+        records = cls.from_reader(reader)
+        records._mmap = mapped
+        return records
+
+    @classmethod
+    def from_reader(cls, reader: "ColumnReader") -> "MovieRecords":
+        """Records written by `dump` at the offset of `reader`. They stay
+        backed by its buffer."""
+        magic_, rows, names_size = header.unpack(reader.take(header.size, align=False))
+        if magic_ != magic:
+            raise ValueError("Buffer holds no records")
+        records = cls()
+        records._views = reader.views
+        names = str(reader.take(names_size), "utf-8")
+        records.distributions = names.split("\n") if names_size else []
+        records._codes = {name: code for code, name in enumerate(records.distributions)}
+        for field in string_fields:
+            ends = reader.take(8 * rows, "Q")
+            data = reader.take(ends[-1] if rows else 0)
+            records._strings[field] = StringColumn(ends, data)
+        records._years = reader.take(2 * rows, "H")
+        records._distributions = reader.take(2 * rows, "H")
+        return records
+
+    def close(self):
+        """Unmap records loaded from a file"""
+        if self._mmap is None:
+            return
+        views, self._views = self._views, []
+        self._strings = {field: StringColumn() for field in string_fields}
+        self._years = array("H")
+        self._distributions = array("H")
+        release(self._mmap, views)
+        self._mmap = None
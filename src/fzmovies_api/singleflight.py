@@ -0,0 +1,84 @@
+"""
+This module coalesces identical calls in flight.
+
+While a call for a key is running, further calls for the same key
+wait for it and share its result (or exception) instead of repeating
+the work - i.e a single network fetch and parse of a page serves every
+concurrent caller. Nothing is kept once the call completes.
+"""
+
+import threading
+import typing as t
+from collections import Counter
+
+T = t.TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "exception", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[t.Hashable, _Call] = {}
+        self.stats: Counter[str] = Counter()
+        """Number of `calls` made and those `shared` - spared the work"""
+
+    def __repr__(self):
+        return f"<fzmovies_api.singleflight.SingleFlight calls={self.stats['calls']},shared={self.stats['shared']}>"
+
+    def do(self, key: t.Hashable, function: t.Callable[..., T], *args, **kwargs) -> T:
+        """Call `function` unless a call for `key` is in flight, in which case
+        wait for it and share its outcome.
+
+        Args:
+            key (t.Hashable): Identity of the call.
+            function (t.Callable[..., T]): Work to be done.
+            The rest are arguments for `function`.
+
+        Returns:
+            T: Value returned by `function`.
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.stats["shared"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    @property
+    def in_flight(self) -> int:
+        """Calls currently running"""
+        return len(self._calls)
+
+
+group = SingleFlight()
+"""Coalesces page fetches and parses across the package"""
@@ -0,0 +1,117 @@
+"""
+This module accumulates movies within a memory budget.
+
+`SpillingAccumulator` gathers movies in `records.MovieRecords` and, once
+those exceed the budget, writes them out to a segment file in a temporary
+directory and starts afresh. Iterating maps the segments back one at a
+time, so only a segment's worth of pages is resident however long the
+crawl.
+
+```python
+from fzmovies_api.crawler import FilterCrawler
+from fzmovies_api.spill import SpillingAccumulator
+
+with SpillingAccumulator("32MB") as movies:
+    FilterCrawler().run(movies.append)
+    for movie in movies:
+        print(movie.title)
+```
+"""
+
+import tempfile
+import typing as t
+from pathlib import Path
+
+from fzmovies_api import models, utils
+from fzmovies_api.records import MovieRecord, MovieRecords
+
+default_memory_budget = 64 * 1024 * 1024
+"""Bytes of movies held in memory before they are spilled"""
+
+
+class SpillingAccumulator:
+    """Movies held in memory up to a budget and on disk beyond it"""
+
+    def __init__(
+        self,
+        memory_budget: int | str = default_memory_budget,
+        dir: Path | str | None = None,
+    ):
+        """Initializes `SpillingAccumulator`
+
+        Args:
+            memory_budget (int | str, optional): Bytes - or size i.e `32MB` - of movies
+              held in memory. Defaults to `default_memory_budget`.
+            dir (Path | str | None, optional): Where the temporary segments directory
+              is made. Defaults to the system's temporary directory.
+        """
+        if isinstance(memory_budget, str):
+            memory_budget = utils.parse_size(memory_budget)
+        assert memory_budget > 0, "memory_budget must be greater than 0"
+        self.memory_budget = memory_budget
+        self.dir = dir
+        self.segments: list[Path] = []
+        """Files of the movies spilled, in order"""
+        self.spilled = 0
+        """Movies in `segments`"""
+        self._buffer = MovieRecords()
+        self._temporary: tempfile.TemporaryDirectory | None = None
+
+    def __repr__(self):
+        return (
+            f"<fzmovies_api.spill.SpillingAccumulator movies={len(self)},"
+            f"segments={len(self.segments)}>"
+        )
+
+    def __len__(self) -> int:
+        return self.spilled + len(self._buffer)
+
+    def __enter__(self) -> "SpillingAccumulator":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, movie: models.MovieInSearch | MovieRecord):
+        """Add `movie`, spilling the movies in memory if over the budget"""
+        self._buffer.append(movie)
+        if self._buffer.nbytes >= self.memory_budget:
+            self.spill()
+
+    def extend(self, movies: t.Iterable[models.MovieInSearch | MovieRecord]):
+        """Add `movies`"""
+        for movie in movies:
+            self.append(movie)
+
+    def spill(self):
+        """Write the movies in memory to a new segment"""
+        if not self._buffer:
+            return
+        if self._temporary is None:
+            self._temporary = tempfile.TemporaryDirectory(
+                prefix="fzmovies-spill-", dir=self.dir
+            )
+        path = Path(self._temporary.name) / f"{len(self.segments):06d}.records"
+        self._buffer.save(path)
+        self.segments.append(path)
+        self.spilled += len(self._buffer)
+        self._buffer = MovieRecords()
+
+    def __iter__(self) -> t.Iterator[models.MovieInSearch]:
+        """Movies in the order they were added. Segments are mapped one
+        at a time as they are reached."""
+        for segment in list(self.segments):
+            with MovieRecords.load(segment) as records:
+                for record in records:
+                    yield record.model()
+        for record in self._buffer:
+            yield record.model()
+
+    def close(self):
+        """Discard the movies and remove the segments"""
+        self._buffer = MovieRecords()
+        self.segments.clear()
+        self.spilled = 0
+        if self._temporary is not None:
+            self._temporary.cleanup()
+            self._temporary = None
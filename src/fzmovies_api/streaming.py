@@ -0,0 +1,211 @@
+"""
+This module parses search results pages incrementally
+as their html contents are being downloaded.
+
+Movies are emitted as soon as their `div.mainbox` closes and
+the expired download keys page is detected from the first
+chunks it arrives in. The whole page is read, so that results
+are those of `handlers.search_handler`.
+"""
+
+import re
+import typing as t
+from collections import deque
+from html.parser import HTMLParser
+
+from fzmovies_api import models
+from fzmovies_api.handlers import movie_in_search, search_pages, zero_search_results
+from fzmovies_api.hunter import Metadata
+
+expired_session_marker = re.compile(r"Your\s+download\s+keys\s+have\s+expired")
+"""Message of the expired download keys page - however it is broken across
+lines or chunks"""
+
+
+class SearchPageParser(HTMLParser):
+    """Incremental counterpart of `handlers.search_handler`"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.movies: deque[dict[str, str]] = deque()
+        """Movies parsed and not yet consumed"""
+        self.navigation: list[tuple[str, str]] = []
+        """Link and text of `<a>` tags in the first `div.mainbox2`"""
+        self.movies_seen = 0
+        self._title: list[str] = []
+        self._in_title = False
+        self._movie: dict | None = None
+        self._movie_depth = 0
+        self._span_depth = 0
+        self._small: list[str] | None = None
+        self._pages_depth = 0
+        self._pages_seen = False
+        self._anchor: tuple[str, list[str]] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        if tag == "div":
+            classes = (dict(attrs).get("class") or "").split()
+            if self._movie is not None:
+                self._movie_depth += 1
+            elif "mainbox" in classes:
+                self._movie = {"url": None, "cover_photo": None, "smalls": None}
+                self._movie_depth = 1
+            if self._pages_depth:
+                self._pages_depth += 1
+            elif "mainbox2" in classes and not self._pages_seen:
+                self._pages_depth = 1
+
+        elif tag == "title" and not self._title:
+            self._in_title = True
+
+        if self._movie is not None:
+            self._movie_starttag(tag, dict(attrs))
+
+        if self._pages_depth and tag == "a" and self._anchor is None:
+            self._anchor = (dict(attrs).get("href"), [])
+
+    def _movie_starttag(self, tag: str, attrs: dict[str, str | None]):
+        movie = self._movie
+        if tag == "a" and movie["url"] is None:
+            movie["url"] = attrs.get("href")
+        elif tag == "img" and movie["cover_photo"] is None:
+            movie["cover_photo"] = attrs.get("src")
+        elif tag == "span":
+            if self._span_depth:
+                self._span_depth += 1
+            elif movie["smalls"] is None:
+                # Only the first span holds the details
+                movie["smalls"] = []
+                self._span_depth = 1
+        elif tag == "small" and self._span_depth and self._small is None:
+            self._small = []
+
+    def handle_endtag(self, tag: str):
+        if tag == "title":
+            self._in_title = False
+
+        elif tag == "small" and self._small is not None:
+            self._movie["smalls"].append("".join(self._small))
+            self._small = None
+
+        elif tag == "span" and self._span_depth:
+            self._span_depth -= 1
+
+        elif tag == "a" and self._anchor is not None:
+            link, text = self._anchor
+            self.navigation.append((link, "".join(text)))
+            self._anchor = None
+
+        elif tag == "div":
+            if self._movie is not None:
+                self._movie_depth -= 1
+                if not self._movie_depth:
+                    self._finish_movie()
+            if self._pages_depth:
+                self._pages_depth -= 1
+                if not self._pages_depth:
+                    self._pages_seen = True
+
+    def handle_data(self, data: str):
+        if self._in_title:
+            self._title.append(data)
+        if self._small is not None:
+            self._small.append(data)
+        if self._anchor is not None:
+            self._anchor[1].append(data)
+
+    def _finish_movie(self):
+        movie, self._movie = self._movie, None
+        self._span_depth = 0
+        self._small = None
+        if movie["smalls"] is None:
+            raise zero_search_results("".join(self._title))
+        self.movies.append(
+            movie_in_search(movie["url"], movie["smalls"], movie["cover_photo"])
+        )
+        self.movies_seen += 1
+
+    def close(self):
+        super().close()
+        if self._movie is not None:
+            self._finish_movie()
+
+
+class SearchResultsStream:
+    """Movies of a search results page yielded as they are parsed.
+    `results` is available once iteration is over."""
+
+    def __init__(self, chunks: t.Iterable[str]):
+        """Initializes `SearchResultsStream`
+
+        Args:
+            chunks (t.Iterable[str]): Html contents of the page in parts.
+        """
+        self.chunks = chunks
+        self._results: models.SearchResults | None = None
+
+    def __iter__(self) -> t.Generator[models.MovieInSearch, None, None]:
+        assert self._results is None, "Search results have already been streamed"
+        parser = SearchPageParser()
+        movies: list[models.MovieInSearch] = []
+        tail = ""
+        expired: str | None = None
+        try:
+            for chunk in self.chunks:
+                if expired is None:
+                    window = tail + chunk
+                    found = expired_session_marker.search(window)
+                    if found is None:
+                        tail = window[-256:]
+                    else:
+                        expired = window[found.start() :]
+                else:
+                    expired += chunk
+                if expired is not None and "</a" in expired:
+                    self._raise_for_expired_session(expired)
+
+                parser.feed(chunk)
+                while parser.movies:
+                    movie = models.MovieInSearch(**parser.movies.popleft())
+                    movies.append(movie)
+                    yield movie
+            if expired is not None and "<a" in expired:
+                self._raise_for_expired_session(expired)
+            parser.close()
+            while parser.movies:
+                movie = models.MovieInSearch(**parser.movies.popleft())
+                movies.append(movie)
+                yield movie
+        finally:
+            close = getattr(self.chunks, "close", None)
+            if close is not None:
+                close()
+
+        self._results = models.SearchResults(
+            movies=movies, **search_pages(parser.navigation)
+        )
+
+    @staticmethod
+    def _raise_for_expired_session(contents: str):
+        # Lines are joined as `Metadata.raise_for_expired_session` looks
+        # for the message and its link within one
+        Metadata.raise_for_expired_session(" ".join(contents.split()))
+
+    @property
+    def results(self) -> models.SearchResults:
+        """Modelled search results"""
+        assert self._results is not None, "Stream the search results first"
+        return self._results
+
+
+def stream_search_handler(chunks: t.Iterable[str]) -> SearchResultsStream:
+    """Make models from search results (html) while it's being downloaded
+
+    Args:
+        chunks (t.Iterable[str]): Html formatted data in parts
+        i.e `Metadata.stream_resource(url)`
+
+    Returns:
+        SearchResultsStream: Iterable of `MovieInSearch` with final `SearchResults`
+    """
+    return SearchResultsStream(chunks)
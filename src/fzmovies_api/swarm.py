@@ -0,0 +1,656 @@
+"""
+This module downloads a single movie file from
+several `DownloadLink`s at the same time.
+
+Every link in `DownloadMovie.links` points at the same file
+on a different server. The file is split into byte ranges
+that working links pull concurrently. Once no range is left, idle links
+take over the tail of the range held by the slowest link, and
+ranges of failing links are handed to the rest.
+
+```python
+from fzmovies_api import DownloadLinks
+from fzmovies_api.swarm import SwarmDownload
+
+download_movie = DownloadLinks(movie_file).results
+SwarmDownload(download_movie.links).save(download_movie.filename)
+```
+"""
+
+import json
+import os
+import threading
+import time
+import typing as t
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from os import getcwd
+from pathlib import Path
+
+from fzmovies_api import bandwidth, errors, hunter, logger, mirrors, models, writer
+
+default_segment_size = 16 * 1024 * 1024
+"""Size in bytes of the ranges a file is split into"""
+
+min_segment_size = 1024 * 1024
+"""Ranges smaller than this are never split"""
+
+probe_size = 256 * 1024
+"""Bytes read from every link while looking for working ones"""
+
+
+class Source:
+    """A working link along with its measured speed"""
+
+    def __init__(self, probe: models.LinkProbe):
+        self.link = probe.link
+        self.url = probe.last_url
+        self.received = 0
+        self.elapsed = 0.0
+        self.initial_rate = probe.throughput or 0.0
+        self.failures = 0
+
+    def __str__(self):
+        return f"<fzmovies_api.swarm.Source url='{self.url}',rate={round(self.rate)}>"
+
+    @property
+    def rate(self) -> float:
+        """Bytes per second"""
+        if self.elapsed:
+            return self.received / self.elapsed
+        return self.initial_rate
+
+
+class Segment:
+    """Byte range `[start, end)` of which `[start, position)` is claimed"""
+
+    __slots__ = ("start", "position", "end", "source")
+
+    def __init__(self, start: int, end: int, source: Source | None = None):
+        self.start = start
+        self.position = start
+        self.end = end
+        self.source = source
+
+    def __repr__(self):
+        return f"<Segment {self.start}-{self.position}-{self.end}>"
+
+
+class SegmentScheduler:
+    """Hands out ranges to sources and keeps track of completed ones"""
+
+    def __init__(
+        self,
+        size: int,
+        done: list[tuple[int, int]] | None = None,
+        segment_size: int = default_segment_size,
+        min_size: int = min_segment_size,
+    ):
+        """Initializes `SegmentScheduler`
+
+        Args:
+            size (int): File size in bytes.
+            done (list[tuple[int, int]], optional): Already downloaded ranges. Defaults to None.
+            segment_size (int, optional): Range size. Defaults to `default_segment_size`.
+            min_size (int, optional): Ranges smaller than this are never split. Defaults to `min_segment_size`.
+        """
+        self.size = size
+        self.min_size = min_size
+        self.done: list[tuple[int, int]] = []
+        self.completed = 0
+        self._pending: deque[Segment] = deque()
+        self._active: set[Segment] = set()
+        self._condition = threading.Condition()
+
+        for start, end in done or ():
+            self._mark_done(start, end)
+        cursor = 0
+        for start, end in [*self.done, (size, size)]:
+            while cursor < start:
+                stop = min(cursor + segment_size, start)
+                self._pending.append(Segment(cursor, stop))
+                cursor = stop
+            cursor = max(cursor, end)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.done == [(0, self.size)] or self.size == 0
+
+    @property
+    def contiguous(self) -> int:
+        """Bytes completed from the start of the file without gaps"""
+        with self._condition:
+            if self.done and self.done[0][0] == 0:
+                return self.done[0][1]
+            return 0
+
+    def _mark_done(self, start: int, end: int):
+        if start >= end:
+            return
+        merged: list[tuple[int, int]] = []
+        for done_start, done_end in sorted([*self.done, (start, end)]):
+            if merged and done_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], done_end))
+            else:
+                merged.append((done_start, done_end))
+        self.done = merged
+        self.completed = sum(done_end - done_start for done_start, done_end in merged)
+
+    def acquire(self, source: Source) -> Segment | None:
+        """Get range for `source` to download. Waits while ranges are still in flight.
+
+        Returns:
+            Segment | None: Range or None when there is nothing left.
+        """
+        with self._condition:
+            while True:
+                if self._pending:
+                    segment = self._pending.popleft()
+                    segment.source = source
+                    self._active.add(segment)
+                    return segment
+                segment = self._steal(source)
+                if segment is not None:
+                    return segment
+                if not self._active:
+                    return None
+                self._condition.wait(0.5)
+
+    def _steal(self, thief: Source) -> Segment | None:
+        victim = None
+        longest = 0.0
+        for segment in self._active:
+            if segment.source is thief:
+                continue
+            remaining = segment.end - segment.position
+            if remaining < 2 * self.min_size:
+                continue
+            eta = remaining / max(segment.source.rate, 1.0)
+            if eta > longest:
+                victim, longest = segment, eta
+        if victim is None:
+            return None
+
+        remaining = victim.end - victim.position
+        thief_rate = thief.rate or victim.source.rate or 1.0
+        share = thief_rate / (thief_rate + max(victim.source.rate, 1.0))
+        split = victim.end - int(remaining * share)
+        split -= split % writer.block_size
+        split = max(split, victim.position + self.min_size)
+        if victim.end - split < self.min_size:
+            return None
+
+        stolen = Segment(split, victim.end, thief)
+        victim.end = split
+        self._active.add(stolen)
+        logger.debug(f"{thief} took over {stolen} from {victim.source}")
+        return stolen
+
+    def claim(self, segment: Segment, count: int) -> tuple[int, int]:
+        """Claim up to `count` bytes of `segment` for writing
+
+        Returns:
+            tuple[int, int]: File offset and number of bytes claimed.
+        """
+        with self._condition:
+            offset = segment.position
+            claimed = max(0, min(count, segment.end - offset))
+            segment.position += claimed
+            return offset, claimed
+
+    def complete(self, segment: Segment):
+        """Mark `segment` as downloaded"""
+        with self._condition:
+            self._active.discard(segment)
+            self._mark_done(segment.start, segment.position)
+            self._condition.notify_all()
+
+    def release(self, segment: Segment):
+        """Return unfinished part of `segment` for other sources to download"""
+        with self._condition:
+            self._active.discard(segment)
+            self._mark_done(segment.start, segment.position)
+            if segment.position < segment.end:
+                self._pending.appendleft(Segment(segment.position, segment.end))
+            self._condition.notify_all()
+
+
+class PrefixHasher:
+    """Hashes a file written out of order as its contiguous prefix grows
+
+    Bytes written right where the hashed prefix ends are hashed straight
+    from the download buffer. Only ranges written ahead of the prefix -
+    by other sources or in an earlier run - are read back from the file,
+    once the prefix reaches them. With N sources that is still about
+    (N - 1) / N of the file, though recently written and so mostly read
+    from the page cache. Reading back takes place outside the lock so that
+    the sources keep writing meanwhile.
+    """
+
+    def __init__(
+        self,
+        hasher,
+        path: Path,
+        written: t.Iterable[tuple[int, int]] = (),
+    ):
+        """Initializes `PrefixHasher`
+
+        Args:
+            hasher (hashlib object): Hash to be updated.
+            path (Path): File being written.
+            written (t.Iterable[tuple[int, int]], optional): Ranges already in the file. Defaults to ().
+        """
+        self.hasher = hasher
+        self.path = path
+        self.hashed = 0
+        """Bytes hashed from the start of the file"""
+        self.read_back = 0
+        """Bytes hashed by reading them back from the file"""
+        self._ahead: list[tuple[int, int]] = []
+        """Merged ranges written beyond `hashed`"""
+        self._lock = threading.Lock()
+        self._reading = False
+        """Some thread is reading back from `hashed` with the lock released"""
+        for start, end in written:
+            self._add(start, end)
+        with self._lock:
+            self._catch_up()
+
+    def _add(self, start: int, end: int):
+        index = bisect_left(self._ahead, (start, end))
+        if index and self._ahead[index - 1][1] >= start:
+            index -= 1
+            start = self._ahead[index][0]
+            end = max(end, self._ahead.pop(index)[1])
+        while index < len(self._ahead) and self._ahead[index][0] <= end:
+            end = max(end, self._ahead.pop(index)[1])
+        self._ahead.insert(index, (start, end))
+
+    def _catch_up(self):
+        # Called with the lock held
+        while not self._reading and self._ahead and self._ahead[0][0] <= self.hashed:
+            _, end = self._ahead.pop(0)
+            if end <= self.hashed:
+                continue
+            start = self.hashed
+            self._reading = True
+            self._lock.release()
+            try:
+                writer.hash_file(self.path, self.hasher, start, end - start)
+            finally:
+                self._lock.acquire()
+                self._reading = False
+            self.read_back += end - start
+            self.hashed = end
+
+    def written(self, offset: int, data: memoryview):
+        """Account for `data` having been written at `offset`"""
+        with self._lock:
+            if offset == self.hashed and not self._reading:
+                self.hasher.update(data)
+                self.hashed += len(data)
+                self._catch_up()
+            elif offset >= self.hashed:
+                self._add(offset, offset + len(data))
+
+
+def parts_file(save_to: Path) -> Path:
+    """Path to file recording downloaded ranges of `save_to`"""
+    return save_to.with_name(f"{save_to.name}.fzparts")
+
+
+class SwarmDownload:
+    """Download a movie file from several links at once"""
+
+    def __init__(
+        self,
+        download_links: list[models.DownloadLink],
+        resolve: t.Callable[[models.DownloadLink], str] = mirrors.resolve_last_url,
+    ):
+        """Initializes `SwarmDownload`
+
+        Args:
+            download_links (list[models.DownloadLink]): Links to the same movie file i.e `DownloadMovie.links`
+            resolve (t.Callable, optional): Resolves the final url of a link. Defaults to `mirrors.resolve_last_url`.
+        """
+        assert download_links, "At least one download link is required"
+        for download_link in download_links:
+            assert isinstance(download_link, models.DownloadLink), (
+                "download_links must be instances of "
+                f"'{models.DownloadLink}' not '{type(download_link)}'"
+            )
+        self.download_links = download_links
+        self.resolve = resolve
+        self.sources: list[Source] = []
+
+    def __str__(self):
+        return f"<fzmovies_api.swarm.SwarmDownload links={len(self.download_links)}>"
+
+    def _fetch(
+        self,
+        source: Source,
+        segment: Segment,
+        scheduler: SegmentScheduler,
+        fd: int,
+        buffer: memoryview,
+        throttle: bandwidth.Throttle,
+        abort: threading.Event,
+        timeout: int,
+        prefix: PrefixHasher | None = None,
+    ):
+        resp = hunter.session.get(
+            source.url,
+            headers={"Range": f"bytes={segment.position}-{segment.end - 1}"},
+            stream=True,
+            timeout=timeout,
+        )
+        try:
+            resp.raise_for_status()
+            if resp.status_code != 206:
+                raise errors.DownloadError(f"{source} does not serve byte ranges")
+            read_into = writer.response_reader(resp) or writer.chunks_reader(
+                resp.iter_content(chunk_size=len(buffer))
+            )
+            started_at = time.perf_counter()
+            while not abort.is_set():
+                wanted = min(len(buffer), segment.end - segment.position)
+                if wanted <= 0:
+                    break
+                count = read_into(buffer[:wanted])
+                if not count:
+                    break
+                offset, claimed = scheduler.claim(segment, count)
+                written = 0
+                try:
+                    while written < claimed:
+                        written += os.pwrite(
+                            fd, buffer[written:claimed], offset + written
+                        )
+                except OSError:
+                    # Disk errors are fatal for all sources
+                    abort.set()
+                    raise
+                if prefix is not None:
+                    prefix.written(offset, buffer[:claimed])
+                throttle.consume(claimed)
+                now = time.perf_counter()
+                source.received += claimed
+                source.elapsed += now - started_at
+                started_at = now
+                if claimed < count:
+                    # Tail of the range was taken over by another source
+                    break
+        finally:
+            resp.close()
+
+        if segment.position < segment.end:
+            raise errors.DownloadError(
+                f"{source} ended the range {segment} prematurely"
+            )
+
+    def _work(
+        self,
+        source: Source,
+        scheduler: SegmentScheduler,
+        fd: int,
+        throttle: bandwidth.Throttle,
+        abort: threading.Event,
+        max_failures: int,
+        timeout: int,
+        read_size: int,
+        prefix: PrefixHasher | None = None,
+    ):
+        buffer = memoryview(bytearray(read_size))
+        while not abort.is_set():
+            segment = scheduler.acquire(source)
+            if segment is None:
+                return
+            try:
+                self._fetch(
+                    source,
+                    segment,
+                    scheduler,
+                    fd,
+                    buffer,
+                    throttle,
+                    abort,
+                    timeout,
+                    prefix,
+                )
+            except Exception as e:  # noqa: BLE001
+                scheduler.release(segment)
+                if abort.is_set():
+                    raise
+                source.failures += 1
+                logger.debug(f"{source} failed ({source.failures}) - {e}")
+                if source.failures >= max_failures:
+                    logger.warning(f"Dropping download source {source} - {e}")
+                    return
+            else:
+                scheduler.complete(segment)
+                source.failures = 0
+
+    def _discover_sources(
+        self, probe_size: int, timeout: int
+    ) -> tuple[list[Source], int | None, models.LinkProbe]:
+        probes = mirrors.rank_links(
+            self.download_links,
+            probe_size=probe_size,
+            timeout=timeout,
+            resolve=self.resolve,
+        )
+        working = [probe for probe in probes if not probe.error]
+        if not working:
+            raise errors.DownloadError(
+                f"None of the download links works - {probes[0].error}"
+            )
+        size = working[0].size
+        sources = [
+            Source(probe)
+            for probe in working
+            if probe.supports_range and probe.size == size
+        ]
+        return sources, size, working[0]
+
+    def save(
+        self,
+        filename: str,
+        dir: str = getcwd(),
+        progress_bar: bool = True,
+        quiet: bool = False,
+        resume: bool = False,
+        leave: bool = True,
+        colour: str = "cyan",
+        simple: bool = True,
+        chunk_size: int = 256,
+        segment_size: int = default_segment_size,
+        connections_per_source: int = 1,
+        max_failures: int = 3,
+        timeout: int = 20,
+        preallocate: bool = True,
+        checksum: str | None = None,
+        expected_size: int | str | None = None,
+        rate_limit: bandwidth.RateType = None,
+        weight: float = 1.0,
+        throttle: bandwidth.Throttle | None = None,
+    ) -> Path | models.SavedMovie:
+        """Save the movie in disk pulling byte ranges from all working links
+
+        Args:
+            filename (str): Movie filename
+            dir (str, optional): Directory for saving the contents Defaults to current directory.
+            progress_bar (bool, optional): Display download progress bar. Defaults to True.
+            quiet (bool, optional): Not to stdout anything. Defaults to False.
+            resume (bool, optional): Resume the incomplete download. Defaults to False.
+            leave (bool, optional): Keep all traces of the progressbar. Defaults to True.
+            colour (str, optional): Progress bar display color. Defaults to "cyan".
+            simple (bool, optional): Show percentage and bar only in progressbar. Defaults to True.
+            chunk_size (int, optional): Bytes in KB read from a link at a time - capped
+              at `min_segment_size`. Defaults to 256.
+            segment_size (int, optional): Size in bytes of ranges. Defaults to `default_segment_size`.
+            connections_per_source (int, optional): Concurrent ranges per link. Defaults to 1.
+            max_failures (int, optional): Consecutive failures before a link is dropped. Defaults to 3.
+            timeout (int, optional): Http request timeout. Defaults to 20.
+            preallocate (bool, optional): Reserve disk space for the file before downloading. Defaults to True.
+            checksum (str, optional): Hash algorithm i.e `sha256`. Computed while downloading -
+              only ranges arriving ahead of the contiguous prefix are read back. Defaults to None.
+            expected_size (int | str, optional): Exact or advertised size. Defaults to None.
+            rate_limit (bandwidth.RateType, optional): Combined download speed cap. Defaults to None.
+            weight (float, optional): Share of `bandwidth.controller` global rate. Defaults to 1.0.
+            throttle (bandwidth.Throttle, optional): Registered throttle to use instead. Defaults to None.
+
+        Raises:
+            FileExistsError:  Incase of `resume=True` but the download was complete
+            errors.InsufficientStorage: Disk has no room for the movie file.
+            errors.DownloadError: All links failed. Downloaded ranges are kept for resuming.
+            errors.IntegrityError: Saved contents are not of the expected size.
+
+        Returns:
+            Path | models.SavedMovie: Path where the movie contents have been saved to
+              or `SavedMovie` along with the digest when `checksum` is specified.
+        """
+        from tqdm import tqdm
+
+        # Reads never span more than the smallest range a file is split into
+        chunk_size_in_bytes = min(chunk_size * 1_000, min_segment_size)
+        save_to = Path(dir) / filename
+        sources, size, best = self._discover_sources(probe_size, timeout)
+        self.sources = sources
+        if not sources or not size:
+            logger.info("Download links cannot serve byte ranges. Using single link.")
+            from fzmovies_api.main import Download
+
+            return Download(best.link, last_url=best.last_url).save(
+                filename,
+                dir=dir,
+                progress_bar=progress_bar,
+                quiet=quiet,
+                resume=resume,
+                leave=leave,
+                colour=colour,
+                simple=simple,
+                chunk_size=chunk_size,
+                preallocate=preallocate,
+                checksum=checksum,
+                expected_size=expected_size,
+                rate_limit=rate_limit,
+                weight=weight,
+                throttle=throttle,
+            )
+
+        state_file = parts_file(save_to)
+        done: list[tuple[int, int]] = []
+        if resume:
+            assert save_to.exists(), f"File not found in path - '{save_to}'"
+            if state_file.exists():
+                state = json.loads(state_file.read_text())
+                if state["size"] == size:
+                    done = [tuple(part) for part in state["done"]]
+            else:
+                done = [(0, min(save_to.stat().st_size, size))]
+
+        scheduler = SegmentScheduler(size, done, segment_size)
+        if resume and scheduler.is_complete:
+            raise FileExistsError(f"Download completed for the file in path - '{save_to}'")
+
+        writer.ensure_free_space(save_to.parent, size - scheduler.completed)
+        fd = os.open(save_to, os.O_RDWR | os.O_CREAT | (0 if resume else os.O_TRUNC))
+
+        hasher = writer.new_hasher(checksum) if checksum else None
+        prefix = PrefixHasher(hasher, save_to, scheduler.done) if hasher else None
+
+        own_throttle = throttle is None
+        if own_throttle:
+            throttle = bandwidth.controller.register(
+                weight=weight, rate=rate_limit, name=filename
+            )
+
+        def save_state():
+            state_file.write_text(json.dumps({"size": size, "done": scheduler.done}))
+
+        abort = threading.Event()
+        try:
+            if preallocate:
+                writer.preallocate(fd, 0, size)
+            os.ftruncate(fd, size)
+            save_state()
+
+            if progress_bar:
+                if not quiet:
+                    print(f"{filename}")
+                p_bar = tqdm(
+                    desc=f"Downloading ({len(sources)} links)",
+                    total=round(size / 1_000_000, 1),
+                    bar_format=(
+                        "{l_bar}{bar} | %(size)s MB" % ({"size": round(size / 1_000_000, 1)})  # noqa: UP031
+                        if simple
+                        else "{l_bar}{bar}{r_bar}"
+                    ),
+                    initial=round(scheduler.completed / 1_000_000, 1),
+                    unit="Mb",
+                    colour=colour,
+                    leave=leave,
+                )
+            else:
+                p_bar = nullcontext()
+
+            with p_bar, ThreadPoolExecutor(
+                max_workers=len(sources) * connections_per_source
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        self._work,
+                        source,
+                        scheduler,
+                        fd,
+                        throttle,
+                        abort,
+                        max_failures,
+                        timeout,
+                        chunk_size_in_bytes,
+                        prefix,
+                    )
+                    for source in sources
+                    for _ in range(connections_per_source)
+                ]
+                reported = 0
+                last_saved_at = time.monotonic()
+                try:
+                    while True:
+                        finished, pending = wait(futures, timeout=0.25)
+                        if progress_bar:
+                            received = sum(source.received for source in sources)
+                            p_bar.update((received - reported) / 1_000_000)
+                            reported = received
+                        if time.monotonic() - last_saved_at > 2:
+                            save_state()
+                            last_saved_at = time.monotonic()
+                        if not pending:
+                            break
+                except BaseException:
+                    abort.set()
+                    raise
+                for future in finished:
+                    future.result()
+        finally:
+            os.close(fd)
+            if own_throttle:
+                throttle.close()
+            if not scheduler.is_complete:
+                save_state()
+
+        if not scheduler.is_complete:
+            raise errors.DownloadError(
+                f"All download links failed. Resume to continue downloading '{save_to}'"
+            )
+
+        state_file.unlink(missing_ok=True)
+        if not progress_bar:
+            logger.info(f"{filename} - {size / 1_000_000}MB ✅")
+        if prefix is not None and prefix.hashed < size:
+            # Safety net - every range written is accounted for by `prefix`
+            writer.hash_file(save_to, hasher, prefix.hashed, size - prefix.hashed)
+
+        return writer.finalize(save_to, size, expected_size=expected_size, hasher=hasher)
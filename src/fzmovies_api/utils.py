@@ -4,26 +4,54 @@ performing common and frequently required tasks
 as well as storing common variables across the package
 """
 
+import posixpath
+import queue
+import re
+import threading
 import typing as t
-from urllib.parse import urljoin
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urljoin, urlsplit
 
-from bs4 import BeautifulSoup as bts
+from fzmovies_api import errors
+
+T = t.TypeVar("T")
+
+if t.TYPE_CHECKING:
+    from bs4 import BeautifulSoup as bts
+
+    from fzmovies_api.models import FileMetadata
 
 mirror_hosts = ("https://fzmovies.live", "https://fzmovies.host")
 
 site_url = mirror_hosts[0]
 
+site_hostnames = {urlsplit(host).hostname for host in mirror_hosts} | {"fzmovies.net"}
+"""Hosts serving the same pages"""
+
 
 file_index_quality_map = {"480p": 0, "720p": 1}
 
+searchby_options = ("Name", "Director", "Starcast")
+
+category_options = ("All", "Bollywood", "Hollywood", "DHollywood")
+
 category_id_map = {
     "Bollywood": 1,
     "Hollywood": 2,
 }
 
+movie_page_path_pattern = re.compile(r"^/movie-(.+)\.htm$", re.IGNORECASE)
+
+size_unit_powers = {"B": 0, "KB": 1, "MB": 2, "GB": 3, "TB": 4}
+
+size_pattern = re.compile(r"(\d+(?:\.\d+)?)\s*([KMGT]?)i?B", re.IGNORECASE)
 
-def souper(contents: str) -> bts:
+resolution_pattern = re.compile(r"(?<![0-9])([0-9]{3,4})p(?![a-z0-9])", re.IGNORECASE)
+
+
+def souper(contents: str) -> "bts":
     """Converts str object to `soup`"""
+    from bs4 import BeautifulSoup as bts
+
     return bts(contents, "html.parser")
 
 
@@ -32,6 +60,50 @@ def get_absolute_url(relative_url: str) -> str:
     return urljoin(site_url, relative_url)
 
 
+def canonical_url(url: str) -> str:
+    """Normalize url so that a page maps to a single value regardless
+    of the mirror serving it, relativeness, percent-encoding, query order
+    and fragment.
+
+    Args:
+        url (str): Absolute or relative url.
+
+    Returns:
+        str: Canonical absolute url.
+    """
+    parts = urlsplit(get_absolute_url(str(url)))
+    hostname = (parts.hostname or "").removeprefix("www.")
+    if hostname in site_hostnames:
+        scheme, netloc = urlsplit(site_url)[:2]
+    else:
+        scheme, netloc = parts.scheme, hostname
+        if parts.port and parts.port != {"http": 80, "https": 443}.get(scheme):
+            netloc += f":{parts.port}"
+    path = posixpath.normpath(re.sub(r"/{2,}", "/", parts.path) or "/")
+    path = quote(unquote(path), safe="/-._~!$&'()*+,;=:@")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{scheme}://{netloc}{path}" + (f"?{query}" if query else "")
+
+
+def movie_id(url: str) -> str:
+    """Identity of a movie regardless of the form of the link to its page
+    i.e `/movie-Heat--hmp4.htm` and `https://fzmovies.host/movie-Heat--hmp4.htm?ref=1`
+    are both `heat--hmp4`.
+
+    Args:
+        url (str): Absolute or relative link to the movie page.
+
+    Returns:
+        str: Movie id. Canonical url for links that are not movie pages.
+    """
+    canonical = canonical_url(url)
+    parts = urlsplit(canonical)
+    match = movie_page_path_pattern.match(unquote(parts.path))
+    if match is None or parts.hostname not in site_hostnames:
+        return canonical
+    return match.group(1).casefold()
+
+
 def assert_membership(value: t.Any, elements: t.Iterable, identity="Value"):
     """Asserts value is a member of elements
 
@@ -41,3 +113,167 @@ def assert_membership(value: t.Any, elements: t.Iterable, identity="Value"):
         identity (str, optional):. Defaults to "Value".
     """
     assert value in elements, f"{identity} '{value}' is not one of {elements}"
+
+
+def _split_size(size: str) -> tuple[str, int]:
+    match = size_pattern.search(size.replace(",", ""))
+    if not match:
+        raise ValueError(f"Unrecognized file size '{size}'")
+    value, prefix = match.groups()
+    return value, size_unit_powers[prefix.upper() + "B"]
+
+
+def parse_size(size: str, base: t.Literal[1000, 1024] = 1000) -> int:
+    """Converts human-readable size i.e `1.2 GB` to bytes
+
+    Args:
+        size (str): Size with its unit.
+        base (t.Literal[1000, 1024], optional): Unit multiplier. Defaults to 1000.
+
+    Returns:
+        int: Size in bytes
+    """
+    value, power = _split_size(size)
+    return int(float(value) * base**power)
+
+
+def size_matches(
+    actual: int, size: str, tolerance: float = 0.02, strict: bool = True
+) -> bool:
+    """Checks whether `actual` bytes agree with human-readable `size`
+    taking into account its rounding and either decimal or binary units.
+
+    Args:
+        actual (int): Size in bytes.
+        size (str): Size with its unit i.e `805 MB`.
+        tolerance (float, optional): Relative allowance. Defaults to 0.02.
+        strict (bool, optional): Raise ValueError on unrecognized `size` otherwise
+          consider it a match. Defaults to True.
+
+    Returns:
+        bool: Sizes agree.
+    """
+    try:
+        value, power = _split_size(size)
+    except ValueError:
+        if strict:
+            raise
+        return True
+    rounding = 0.5 * 10 ** -len(value.partition(".")[2])
+    for base in (1000, 1024):
+        multiplier = base**power
+        low = (float(value) - rounding) * multiplier * (1 - tolerance)
+        high = (float(value) + rounding) * multiplier * (1 + tolerance)
+        if low <= actual <= high:
+            return True
+    return False
+
+
+def parse_size_or_none(size: str) -> int | None:
+    """Bytes of human-readable `size` or None when it is unrecognized"""
+    try:
+        return parse_size(size)
+    except ValueError:
+        return None
+
+
+def parse_resolution(text: str) -> int | None:
+    """Vertical resolution mentioned in `text` i.e 720 for `Movie.2020.720p.mp4`"""
+    match = resolution_pattern.search(text)
+    return int(match.group(1)) if match else None
+
+
+def select_file(
+    files: list["FileMetadata"], quality: str = "720p", floor: bool = False
+) -> "FileMetadata":
+    """Pick movie file of `quality`
+
+    Args:
+        files (list[FileMetadata]): Files of the movie.
+        quality (str, optional): One of `file_index_quality_map`. Defaults to "720p".
+        floor (bool, optional): Take `quality` as the least acceptable and pick
+          the smallest file meeting it. Defaults to False.
+
+    Raises:
+        errors.DownloadError: No file meets `quality`.
+
+    Returns:
+        FileMetadata: Movie file.
+    """
+    assert_membership(quality, file_index_quality_map, "Movie quality")
+    if floor:
+        least = parse_resolution(quality)
+        candidates = [
+            file for file in files if file.resolution and file.resolution >= least
+        ]
+        if candidates:
+            return min(
+                candidates,
+                key=lambda file: (
+                    file.size_in_bytes is None,
+                    file.size_in_bytes or 0,
+                    file.resolution,
+                ),
+            )
+    else:
+        index = file_index_quality_map[quality]
+        if index < len(files):
+            return files[index]
+    raise errors.DownloadError(
+        f"No movie file of {'at least ' if floor else ''}{quality} quality"
+    )
+
+
+def read_ahead(items: t.Iterable[T], size: int) -> t.Generator[T, None, None]:
+    """Yield `items` while a background thread produces up to
+    `size` of the next ones
+
+    Exceptions raised producing an item are raised where it would have been
+    yielded. The thread stops once the generator is closed.
+
+    Args:
+        items (t.Iterable[T]): Items slow to produce i.e pages fetched.
+        size (int): Items produced ahead, not to be exceeded.
+
+    Yields:
+        T: Items in order
+    """
+    assert size > 0, "size must be greater than 0"
+    buffer: queue.Queue = queue.Queue()
+    # A slot is taken before producing an item - not after, while it waits
+    # to be queued - so that no more than `size` are ever produced ahead
+    slots = threading.Semaphore(size)
+    stop = threading.Event()
+    done = object()
+
+    def acquire() -> bool:
+        while not stop.is_set():
+            if slots.acquire(timeout=0.1):
+                return True
+        return False
+
+    def produce():
+        iterator = iter(items)
+        try:
+            while acquire():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    buffer.put((done, None))
+                    return
+                buffer.put((item, None))
+        except Exception as e:  # noqa: BLE001
+            buffer.put((done, e))
+
+    threading.Thread(target=produce, name="fzmovies-read-ahead", daemon=True).start()
+    try:
+        while True:
+            item, exception = buffer.get()
+            slots.release()
+            if exception is not None:
+                raise exception
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,448 @@
+"""
+This module provides the write path used when
+saving movie files to disk.
+
+Contents are read into a single reusable buffer
+and flushed to an unbuffered file descriptor in large,
+block-aligned writes. The target size is reserved up-front
+so that running out of disk space surfaces before
+the download starts rather than at 95%.
+
+Contents can also be hashed as they stream in,
+sparing a second pass over multi-GB files.
+"""
+
+import ctypes
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import typing as t
+from pathlib import Path
+
+from fzmovies_api import errors, logger, models, utils
+
+block_size = 4096
+"""Writes are aligned to multiples of this size in bytes"""
+
+default_buffer_size = 4 * 1024 * 1024
+"""Default size in bytes of the reusable write buffer"""
+
+FALLOC_FL_KEEP_SIZE = 0x01
+
+_libc_fallocate: t.Callable | None | bool = False
+
+
+def _get_libc_fallocate() -> t.Callable | None:
+    global _libc_fallocate
+    if _libc_fallocate is False:
+        _libc_fallocate = None
+        if sys.platform.startswith("linux"):
+            try:
+                function = ctypes.CDLL(None, use_errno=True).fallocate
+            except (OSError, AttributeError):
+                pass
+            else:
+                function.argtypes = (
+                    ctypes.c_int,
+                    ctypes.c_int,
+                    ctypes.c_int64,
+                    ctypes.c_int64,
+                )
+                function.restype = ctypes.c_int
+                _libc_fallocate = function
+    return _libc_fallocate
+
+
+def align(size: int, to: int = block_size) -> int:
+    """Round `size` up to the nearest multiple of `to`"""
+    return max(to, -(-size // to) * to)
+
+
+def ensure_free_space(dir: str | Path, required: int):
+    """Asserts the disk containing `dir` can hold `required` more bytes
+
+    Raises:
+        errors.InsufficientStorage: Disk is almost full.
+    """
+    free = shutil.disk_usage(dir).free
+    if free < required:
+        raise errors.InsufficientStorage(
+            f"{required} bytes are required but only {free} bytes are free in '{dir}'"
+        )
+
+
+def preallocate(fd: int, offset: int, length: int) -> bool:
+    """Reserve disk blocks for `length` bytes from `offset` without changing the
+    apparent file size, so an interrupted download can still be resumed.
+
+    Args:
+        fd (int): File descriptor.
+        offset (int): Start of the region to reserve.
+        length (int): Size of the region in bytes.
+
+    Raises:
+        errors.InsufficientStorage: Disk cannot hold the region.
+
+    Returns:
+        bool: Whether the blocks were reserved.
+    """
+    fallocate = _get_libc_fallocate()
+    if fallocate is None or length <= 0:
+        return False
+    if fallocate(fd, FALLOC_FL_KEEP_SIZE, offset, length) == 0:
+        return True
+    error_number = ctypes.get_errno()
+    if error_number in (errno.ENOSPC, errno.EFBIG):
+        raise errors.InsufficientStorage(
+            f"Failed to reserve {length} bytes - {os.strerror(error_number)}"
+        )
+    logger.debug(f"Preallocation not supported - {os.strerror(error_number)}")
+    return False
+
+
+def advise(fd: int, offset: int, length: int, advice: str):
+    """Pass `posix_fadvise` hint where supported
+
+    Args:
+        fd (int): File descriptor.
+        offset (int): Start of the region.
+        length (int): Size of the region. 0 means up to end of file.
+        advice (str): One of `sequential`, `dontneed`.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    advice_map = {
+        "sequential": os.POSIX_FADV_SEQUENTIAL,
+        "dontneed": os.POSIX_FADV_DONTNEED,
+    }
+    try:
+        os.posix_fadvise(fd, offset, length, advice_map[advice])
+    except OSError:
+        pass
+
+
+class FileWriter:
+    """Appends contents to a file through a reusable buffer.
+
+    ```python
+    with FileWriter(path, offset=0, expected_size=size) as writer:
+        writer.write(chunk)
+    ```
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        offset: int = 0,
+        expected_size: int | None = None,
+        buffer_size: int = default_buffer_size,
+        preallocate: bool = True,
+        drop_cache: bool = False,
+        on_flush: t.Callable[[int], None] | None = None,
+        hasher: t.Any | None = None,
+    ):
+        """Initializes `FileWriter`
+
+        Args:
+            path (str | Path): Target file.
+            offset (int, optional): Bytes already in the file; writing continues from here. Defaults to 0.
+            expected_size (int, optional): Bytes still to be written. Defaults to None.
+            buffer_size (int, optional): Reusable buffer size in bytes. Defaults to `default_buffer_size`.
+            preallocate (bool, optional): Reserve `expected_size` on disk up-front. Defaults to True.
+            drop_cache (bool, optional): Evict written pages from page cache. Defaults to False.
+            on_flush (t.Callable[[int], None], optional): Called with number of bytes flushed. Defaults to None.
+            hasher (hashlib object, optional): Updated with every byte written. Defaults to None.
+        """
+        self.path = Path(path)
+        self.offset = offset
+        self.expected_size = expected_size
+        self.buffer = bytearray(align(buffer_size))
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+        self.written = 0
+        self.preallocate = preallocate
+        self.drop_cache = drop_cache
+        self.on_flush = on_flush
+        self.hasher = hasher
+        self._fh = None
+
+    def __enter__(self) -> "FileWriter":
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self) -> "FileWriter":
+        """Open the file and reserve space for the expected contents"""
+        if self.expected_size:
+            ensure_free_space(self.path.parent, self.expected_size)
+
+        self._fh = open(self.path, "r+b" if self.offset else "wb", buffering=0)
+        self._fh.seek(self.offset)
+        fd = self._fh.fileno()
+        if self.expected_size and self.preallocate:
+            preallocate(fd, self.offset, self.expected_size)
+        advise(fd, 0, 0, "sequential")
+        return self
+
+    @property
+    def _limit(self) -> int:
+        """Buffer fill level at which the next write ends on a block boundary"""
+        position = self.offset + self.written
+        return len(self.buffer) - (position % block_size)
+
+    def readinto_from(
+        self, read_into: t.Callable[[memoryview], int], max_size: int | None = None
+    ) -> int:
+        """Fill free space of the buffer using `read_into`, flushing when full
+
+        Args:
+            read_into (t.Callable[[memoryview], int]): Function like `io.RawIOBase.readinto`
+            max_size (int, optional): Bytes not to exceed in a single read. Defaults to None.
+
+        Returns:
+            int: Number of bytes read. 0 signals end of contents.
+        """
+        end = self._limit
+        if max_size:
+            end = min(end, self.filled + max_size)
+        count = read_into(self.view[self.filled : end])
+        if count:
+            self.filled += count
+            if self.filled >= self._limit:
+                self.flush()
+        return count or 0
+
+    def write(self, data: bytes):
+        """Copy `data` into the buffer, flushing whenever it is full"""
+        data = memoryview(data)
+        while data:
+            space = self._limit - self.filled
+            taken = data[:space]
+            self.view[self.filled : self.filled + len(taken)] = taken
+            self.filled += len(taken)
+            data = data[len(taken) :]
+            if self.filled >= self._limit:
+                self.flush()
+
+    def flush(self):
+        """Write buffered contents to disk"""
+        if not self.filled:
+            return
+        position = self.offset + self.written
+        pending = self.view[: self.filled]
+        if self.hasher is not None:
+            self.hasher.update(pending)
+        while pending:
+            count = self._fh.write(pending)
+            pending = pending[count:]
+        if self.drop_cache:
+            advise(self._fh.fileno(), position, self.filled, "dontneed")
+        self.written += self.filled
+        if self.on_flush:
+            self.on_flush(self.filled)
+        self.filled = 0
+
+    def close(self):
+        """Flush pending contents and close the file"""
+        if self._fh is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._fh.close()
+            self._fh = None
+            self.view.release()
+
+
+def response_reader(resp) -> t.Callable[[memoryview], int] | None:
+    """Get a function that reads the body of `requests.Response` straight
+    into a buffer, bypassing per-chunk bytes objects.
+
+    Only possible when the body is not content-encoded.
+
+    Returns:
+        t.Callable[[memoryview], int] | None: `readinto`-like function.
+    """
+    if resp.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    # urllib3 keeps the `http.client` response it wraps private as `_fp`;
+    # reading it directly spares a bytes object per read. Other versions or
+    # transports may not have it, so the public `read` is fallen back to.
+    fp = getattr(resp.raw, "_fp", None)
+    if fp is not None and hasattr(fp, "readinto"):
+        return fp.readinto
+    read = getattr(resp.raw, "read", None)
+    if read is None:
+        return None
+
+    def read_into(buffer: memoryview) -> int:
+        data = read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    return read_into
+
+
+def chunks_reader(
+    chunks: t.Iterator[bytes],
+) -> t.Callable[[memoryview], int]:
+    """Adapt an iterator of bytes i.e `iter_content` into a `readinto`-like function"""
+    leftover = memoryview(b"")
+
+    def read_into(view: memoryview) -> int:
+        nonlocal leftover
+        if not leftover:
+            leftover = memoryview(next(chunks, b""))
+        count = min(len(view), len(leftover))
+        view[:count] = leftover[:count]
+        leftover = leftover[count:]
+        return count
+
+    return read_into
+
+
+throttled_read_size = 64 * 1024
+"""Bytes read at a time when bandwidth is throttled"""
+
+
+def stream_to(resp, writer: FileWriter, chunk_size: int, throttle=None) -> int:
+    """Stream the body of `resp` into `writer`
+
+    Args:
+        resp (requests.Response): Streamed response.
+        writer (FileWriter): Opened writer.
+        chunk_size (int): Chunk size for `iter_content` fallback.
+        throttle (bandwidth.Throttle, optional): Bandwidth limiter. Defaults to None.
+
+    Returns:
+        int: Total bytes received.
+    """
+    received = 0
+    read_into = response_reader(resp)
+    if read_into is not None:
+        while True:
+            # Smaller reads only while a rate is in effect
+            limited = throttle is not None and throttle.allowed_rate is not None
+            count = writer.readinto_from(
+                read_into, throttled_read_size if limited else None
+            )
+            if not count:
+                break
+            received += count
+            if limited:
+                throttle.consume(count)
+    else:
+        if throttle is not None and throttle.allowed_rate is not None:
+            chunk_size = min(chunk_size, throttled_read_size)
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            writer.write(chunk)
+            received += len(chunk)
+            if throttle is not None:
+                throttle.consume(len(chunk))
+    return received
+
+
+def new_hasher(algorithm: str):
+    """Create hashlib object for `algorithm` i.e `sha256`, `md5`, `blake2b`"""
+    assert algorithm in hashlib.algorithms_available, (
+        f"Hash algorithm '{algorithm}' is not one of {sorted(hashlib.algorithms_available)}"
+    )
+    return hashlib.new(algorithm)
+
+
+def hash_file(
+    path: str | Path,
+    hasher,
+    start: int = 0,
+    length: int | None = None,
+    buffer_size: int = default_buffer_size,
+):
+    """Update `hasher` with contents of a file region through a reusable buffer
+
+    Args:
+        path (str | Path): File to be read.
+        hasher (hashlib object): Hash to be updated.
+        start (int, optional): Region offset. Defaults to 0.
+        length (int, optional): Region size. Defaults to the rest of the file.
+        buffer_size (int, optional): Read buffer size. Defaults to `default_buffer_size`.
+    """
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    remaining = length if length is not None else os.path.getsize(path) - start
+    with open(path, "rb", buffering=0) as fh:
+        fh.seek(start)
+        while remaining > 0:
+            count = fh.readinto(view[: min(buffer_size, remaining)])
+            if not count:
+                break
+            hasher.update(view[:count])
+            remaining -= count
+
+
+def write_checksum_file(path: str | Path, algorithm: str, digest: str) -> Path:
+    """Save `digest` alongside `path` in a format understood by `sha256sum -c` & co.
+
+    Returns:
+        Path: Path to the sidecar i.e `movie.mkv.sha256`
+    """
+    path = Path(path)
+    sidecar = path.with_name(f"{path.name}.{algorithm}")
+    sidecar.write_text(f"{digest}  {path.name}\n")
+    return sidecar
+
+
+def read_checksum_file(path: str | Path, algorithm: str) -> str | None:
+    """Read digest saved by `write_checksum_file` if any"""
+    path = Path(path)
+    sidecar = path.with_name(f"{path.name}.{algorithm}")
+    if not sidecar.is_file():
+        return None
+    return sidecar.read_text().split(" ", 1)[0].strip() or None
+
+
+def finalize(
+    path: Path,
+    size: int,
+    expected_size: int | str | None = None,
+    hasher=None,
+) -> Path | models.SavedMovie:
+    """Verify size of a saved movie file and record its digest
+
+    Args:
+        path (Path): Saved movie file.
+        size (int): Bytes saved.
+        expected_size (int | str, optional): Exact size in bytes or advertised size. Defaults to None.
+        hasher (hashlib object, optional): Hash of the contents. Defaults to None.
+
+    Raises:
+        errors.IntegrityError: `size` is not exactly `expected_size` bytes.
+
+    Returns:
+        Path | models.SavedMovie: `path` or `SavedMovie` along with the digest when hashed.
+    """
+    if isinstance(expected_size, int):
+        if size != expected_size:
+            raise errors.IntegrityError(
+                f"Expected {expected_size} bytes but saved {size} bytes"
+                f" in path - '{path}'"
+            )
+    elif expected_size and not utils.size_matches(size, expected_size, strict=False):
+        logger.warning(
+            f"Size of '{path}' ({size} bytes) does not"
+            f" match the advertised size - {expected_size}"
+        )
+
+    if hasher is None:
+        return path
+
+    digest = hasher.hexdigest()
+    return models.SavedMovie(
+        path=path,
+        size=size,
+        algorithm=hasher.name,
+        digest=digest,
+        checksum_file=write_checksum_file(path, hasher.name, digest),
+    )
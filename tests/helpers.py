@@ -0,0 +1,83 @@
+"""Fixtures shared by the test modules"""
+
+import tempfile
+import unittest
+
+from fzmovies_api import models
+from fzmovies_api.bench import SyntheticServer, pattern_block
+
+site = "https://fzmovies.live"
+
+
+def movie(
+    name: str,
+    year: int = 2020,
+    distribution: str = "Hollywood",
+    host: str = site,
+    about: str | None = None,
+) -> models.MovieInSearch:
+    return models.MovieInSearch(
+        url=f"{host}/movie-{name}--hmp4.htm",
+        title=name,
+        year=year,
+        distribution=distribution,
+        about=f"About {name}" if about is None else about,
+        cover_photo=f"{host}/imdb_images/{name}.jpg",
+    )
+
+
+def search_results(count: int = 1) -> models.SearchResults:
+    return models.SearchResults(movies=[movie(f"Movie {index}") for index in range(count)])
+
+
+class Page:
+    """Stands for a `Search` cursor over `pages`"""
+
+    def __init__(self, pages: list[models.SearchResults]):
+        self.pages = pages
+
+    @property
+    def results(self) -> models.SearchResults:
+        return self.pages[0]
+
+    def next(self) -> "Page":
+        return Page(self.pages[1:])
+
+
+movie_page = """<html><body>
+<iframe width="560" src="https://www.youtube.com/embed/xyz" allow="accelerometer; autoplay; encrypted-media; gyroscope; picture-in-picture"></iframe>
+<div class="owl-carousel owl-theme">
+ <a href="/movie-Alpha--hmp4.htm" alt="Alpha"><img src="/imdb_images/alpha.jpg"></a>
+ <a href="/movie-Beta--hmp4.htm" alt="Beta (2019)"><img src="/imdb_images/beta.jpg"></a>
+</div>
+<ul class="moviesfiles"><li><a href="download1.php?downloadoptionskey=1">Movie 480p</a>
+ <dcounter>(450 MB) {1234 hits }</dcounter> <a href="/mediainfo.php?id=1">MediaInfo</a></li></ul>
+<ul class="moviesfiles"><li><a href="download1.php?downloadoptionskey=2">Movie 720p</a>
+ <dcounter>(1.2 GB) {5678 hits }</dcounter> <a href="/mediainfo.php?id=2">MediaInfo</a> <a href="/ss.php?id=2">SS</a></li></ul>
+<ul class="moviesfiles"><li>Nothing</li></ul>
+</body></html>"""
+
+file_size = 5_000_123
+
+
+def synthetic_contents(size: int, start: int = 0) -> bytes:
+    repeats = (start + size) // len(pattern_block) + 1
+    return (pattern_block * repeats)[start : start + size]
+
+
+class LocalServerTestBase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SyntheticServer().__enter__()
+        cls.url = cls.server.url_for(file_size)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__()
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
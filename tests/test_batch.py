@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from helpers import movie
+
+from fzmovies_api import errors, hunter, models
+from fzmovies_api.dedup import DedupIndex
+from fzmovies_api.main import Search
+from fzmovies_api.utils import canonical_url, movie_id
+
+catalogue = {
+    "alpha": [[movie("Alpha"), movie("Shared")], [movie("Alpha 2")]],
+    "beta": [[movie("Beta"), movie("Shared", host="https://fzmovies.host")]],
+    "gamma": errors.ZeroSearchResults("'gamma' yielded no results"),
+}
+
+
+def get_all_results(self, stream=False, limit=1_000_000):
+    pages = catalogue[self.query]
+    if isinstance(pages, Exception):
+        raise pages
+    for movies in pages:
+        yield models.SearchResults(movies=movies)
+
+
+class TestSearchBatch(unittest.TestCase):
+    def setUp(self):
+        patches = (
+            mock.patch.object(hunter.Index, "session_is_initialized", True),
+            mock.patch.object(Search, "get_all_results", get_all_results),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_deduplicates_and_tags_queries(self):
+        batch = Search.batch(["alpha", "beta", "gamma", "alpha"], max_workers=3)
+        matches = list(batch)
+        titles = sorted(match.movie.title for match in matches)
+        self.assertEqual(titles, ["Alpha", "Alpha 2", "Beta", "Shared"])
+        shared = batch.matches[movie_id("/movie-Shared--hmp4.htm")]
+        self.assertEqual(sorted(shared.queries), ["alpha", "beta"])
+        self.assertIn(shared, matches)
+        self.assertEqual(list(batch.failures), ["gamma"])
+        self.assertIsInstance(batch.failures["gamma"], errors.ZeroSearchResults)
+
+    def test_stopping_early(self):
+        batch = Search.batch(["alpha", "beta"], max_workers=1)
+        first = next(iter(batch))
+        self.assertIsInstance(first, models.QueryMatch)
+
+    def test_seen_across_runs(self):
+        seen = DedupIndex(["/movie-Alpha--hmp4.htm"])
+        titles = [match.movie.title for match in Search.batch(["alpha"], seen=seen)]
+        self.assertEqual(sorted(titles), ["Alpha 2", "Shared"])
+        titles = [match.movie.title for match in Search.batch(["alpha", "beta"], seen=seen)]
+        self.assertEqual(titles, ["Beta"])
+
+
+class TestCanonicalUrl(unittest.TestCase):
+    def test_mirrors_and_relative_urls(self):
+        expected = "https://fzmovies.live/movie-Alpha--hmp4.htm"
+        for url in (
+            "/movie-Alpha--hmp4.htm",
+            "https://fzmovies.host/movie-Alpha--hmp4.htm",
+            "https://WWW.fzmovies.net/./movie-Alpha%2D%2Dhmp4.htm#files",
+        ):
+            self.assertEqual(canonical_url(url), expected)
+
+    def test_query_order(self):
+        self.assertEqual(
+            canonical_url("/download1.php?b=2&a=1"),
+            canonical_url("https://fzmovies.live/download1.php?a=1&b=2"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
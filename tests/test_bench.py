@@ -0,0 +1,56 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from fzmovies_api import bench
+from fzmovies_api.swarm import min_segment_size
+
+
+class TestBenchmarkDownload(unittest.TestCase):
+    def test_all_modes_with_default_chunk_sizes(self):
+        with tempfile.TemporaryDirectory() as dir:
+            results = bench.benchmark_download(
+                size=1, modes=bench.download_modes, progress_bars=(False,), dir=dir
+            )
+            path = bench.save_results(results, Path(dir) / "results")
+            self.assertEqual(path.suffix, ".json")
+            saved = json.loads(path.read_text())
+
+        self.assertEqual(
+            set(saved["meta"]),
+            {
+                "fzmovies_api",
+                "python",
+                "platform",
+                "cpu_count",
+                "size_bytes",
+                "repeat",
+                "swarm_sources",
+                "timestamp",
+            },
+        )
+        self.assertEqual(saved["meta"]["size_bytes"], 1_000_000)
+        expected = [
+            (mode, chunk_size)
+            for mode in bench.download_modes
+            for chunk_size in bench.default_chunk_sizes
+            if mode != "swarm" or chunk_size * 1_000 <= min_segment_size
+        ]
+        self.assertEqual(
+            [(result["mode"], result["chunk_size_kb"]) for result in saved["results"]],
+            expected,
+        )
+        for result in saved["results"]:
+            self.assertTrue(result["complete"])
+            self.assertEqual(result["run"], 1)
+            self.assertGreater(result["throughput_mb_s"], 0)
+            self.assertEqual(
+                result["bytes"], 750_000 if result["mode"] == "resumed" else 1_000_000
+            )
+            for key in ("seconds", "cpu_seconds", "cpu_percent", "read_syscalls"):
+                self.assertIn(key, result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import hashlib
+import io
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from helpers import LocalServerTestBase, file_size, synthetic_contents
+
+from fzmovies_api import Download, errors, models, writer
+from fzmovies_api.bulk import BulkDownload, movie_page_pattern, read_entries, schedule
+
+
+class TestBulkDownload(LocalServerTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.movies = {
+            entry: models.DownloadMovie(
+                filename=f"{entry}.mkv",
+                links=[models.DownloadLink(url=self.url, connections=0)],
+                size="5 MB",
+                info="",
+            )
+            for entry in ("alpha", "beta", "gamma")
+        }
+        patches = (
+            mock.patch.object(
+                Download, "last_url", property(lambda self: str(self.download_link.url))
+            ),
+            mock.patch.object(BulkDownload, "resolve", self.resolve),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def resolve(self, entry: str) -> models.DownloadMovie:
+        if entry == "missing":
+            raise errors.ZeroSearchResults(f"'{entry}' yielded no results")
+        return self.movies[entry]
+
+    def bulk(self, entries: list[str]) -> BulkDownload:
+        return BulkDownload(entries, workers=2, dir=self.dir.name, progress_bar=False)
+
+    def test_read_entries(self):
+        lines = io.StringIO("Avatar\n\n# comment\n  /movie-Titanic--hmp4.htm  \n")
+        self.assertEqual(read_entries(lines), ["Avatar", "/movie-Titanic--hmp4.htm"])
+        self.assertTrue(movie_page_pattern.match("https://fzmovies.net/movie-Up--hmp4.htm"))
+        self.assertIsNone(movie_page_pattern.match("Up 2009"))
+
+    def test_run(self):
+        results = self.bulk(["alpha", "missing", "beta", "gamma"]).run()
+        self.assertEqual(
+            [result.status for result in results],
+            ["downloaded", "failed", "downloaded", "downloaded"],
+        )
+        self.assertIn("no results", results[1].error)
+        for result in results[::2]:
+            self.assertEqual(result.path.read_bytes(), synthetic_contents(file_size))
+            self.assertIsNotNone(writer.read_checksum_file(result.path, "sha256"))
+
+    def test_skips_complete_and_resumes_partial(self):
+        self.bulk(["alpha"]).run()
+        partial = Path(self.dir.name) / "beta.mkv"
+        partial.write_bytes(synthetic_contents(1_000_000))
+
+        alpha, beta = self.bulk(["alpha", "beta"]).run()
+        self.assertEqual((alpha.status, alpha.error), ("skipped", "checksum matches"))
+        self.assertEqual(beta.status, "downloaded")
+        self.assertEqual(partial.read_bytes(), synthetic_contents(file_size))
+
+    def test_complete_without_sidecar(self):
+        path = Path(self.dir.name) / "alpha.mkv"
+        path.write_bytes(synthetic_contents(file_size))
+        with mock.patch.object(Download, "save") as save:
+            (alpha,) = self.bulk(["alpha"]).run()
+        save.assert_not_called()
+        self.assertEqual((alpha.status, alpha.error), ("skipped", "checksum matches"))
+        self.assertEqual(
+            writer.read_checksum_file(path, "sha256"),
+            hashlib.sha256(synthetic_contents(file_size)).hexdigest(),
+        )
+
+    def test_size_checked_before_hashing(self):
+        path = Path(self.dir.name) / "alpha.mkv"
+        contents = synthetic_contents(1_000_000)
+        path.write_bytes(contents)
+        writer.write_checksum_file(path, "sha256", hashlib.sha256(contents).hexdigest())
+        bulk = self.bulk(["alpha"])
+        with mock.patch.object(writer, "hash_file", wraps=writer.hash_file) as hash_file:
+            self.assertFalse(bulk.is_complete(path, "5 MB"))
+            hash_file.assert_not_called()
+            self.assertTrue(bulk.is_complete(path, "1 MB"))
+            hash_file.assert_called_once()
+
+    def test_schedule(self):
+        jobs = [
+            (entry, self.movies[entry].model_copy(update={"size": size}))
+            for entry, size in (("alpha", "3 MB"), ("beta", "1 MB"), ("gamma", "?"))
+        ]
+        ordered, deferred = schedule(jobs, "sjf")
+        self.assertEqual([entry for entry, _ in ordered], ["beta", "alpha", "gamma"])
+        self.assertEqual(deferred, [])
+        ordered, deferred = schedule(jobs, "fifo", budget=3_500_000)
+        self.assertEqual([entry for entry, _ in ordered], ["alpha"])
+        self.assertEqual([entry for entry, _ in deferred], ["beta", "gamma"])
+        ordered, _ = schedule(jobs, "sjf", budget=4_000_000)
+        self.assertEqual([entry for entry, _ in ordered], ["beta", "alpha"])
+
+    def test_window(self):
+        self.movies["beta"] = self.movies["beta"].model_copy(update={"size": "9 MB"})
+        bulk = BulkDownload(
+            ["alpha", "beta"],
+            dir=self.dir.name,
+            progress_bar=False,
+            order="sjf",
+            window=2,
+            bandwidth="4MB",
+        )
+        self.assertEqual(bulk.budget, 8_000_000)
+        alpha, beta = bulk.run()
+        self.assertEqual(alpha.status, "downloaded")
+        self.assertEqual((beta.status, beta.error), ("skipped", "does not fit in the window"))
+
+    def test_same_file_downloaded_once(self):
+        self.movies["delta"] = self.movies["alpha"]
+        results = self.bulk(["alpha", "delta"]).run()
+        self.assertEqual(
+            sorted(result.status for result in results), ["downloaded", "skipped"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
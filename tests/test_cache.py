@@ -0,0 +1,138 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from helpers import movie_page, search_results
+
+from fzmovies_api import cache, hunter, models
+from fzmovies_api.cache import ModelCache
+from fzmovies_api.main import DownloadLinks, Navigate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestModelCache(unittest.TestCase):
+    def test_hit_by_canonical_url(self):
+        model_cache = ModelCache()
+        results = search_results()
+        model_cache.put("/movietags.php?tag=a&b=1", results)
+        self.assertIs(
+            model_cache.get("https://fzmovies.host/movietags.php?b=1&tag=a"), results
+        )
+        self.assertIsNone(model_cache.get("/movietags.php?tag=b"))
+        self.assertEqual(model_cache.stats, {"hits": 1, "misses": 1})
+
+    def test_ttl(self):
+        clock = FakeClock()
+        model_cache = ModelCache(ttl=10, clock=clock)
+        model_cache.put("/a.htm", search_results())
+        model_cache.put("/b.htm", search_results(), ttl=30)
+        clock.now = 11
+        self.assertNotIn("/a.htm", model_cache)
+        self.assertIn("/b.htm", model_cache)
+        self.assertEqual(model_cache.stats["expired"], 1)
+        self.assertEqual(model_cache.size, ModelCache.sizeof(search_results()))
+
+    def test_least_recently_used_evicted_over_budget(self):
+        size = ModelCache.sizeof(search_results())
+        model_cache = ModelCache(max_size=size * 2)
+        model_cache.put("/a.htm", search_results())
+        model_cache.put("/b.htm", search_results())
+        model_cache.get("/a.htm")
+        model_cache.put("/c.htm", search_results())
+        self.assertIn("/a.htm", model_cache)
+        self.assertNotIn("/b.htm", model_cache)
+        self.assertEqual(model_cache.stats["evicted"], 1)
+        # Larger than the whole budget
+        model_cache.put("/d.htm", search_results(10))
+        self.assertNotIn("/d.htm", model_cache)
+        self.assertLessEqual(model_cache.size, model_cache.max_size)
+
+    def test_download_key_urls_excluded(self):
+        model_cache = ModelCache()
+        made = []
+        for url in (
+            "/download.php?downloadkey=abc",
+            "/dlink.php?id=1",
+            "https://fzmovies.live/download1.php?downloadoptionskey=2",
+        ):
+            model_cache.get_or_make(url, lambda: made.append(1) or search_results())
+            model_cache.get_or_make(url, lambda: made.append(1) or search_results())
+        self.assertEqual(len(made), 6)
+        self.assertEqual(len(model_cache), 0)
+
+    def test_download_links_not_cached(self):
+        movie_file = models.FileMetadata(
+            title="Movie 720p",
+            url="https://fzmovies.live/download1.php?downloadoptionskey=2",
+            size="1.2 GB",
+            hits=5,
+            mediainfo="https://fzmovies.live/mediainfo.php?id=2",
+        )
+        model_cache = ModelCache()
+        with (
+            mock.patch.object(cache, "model_cache", model_cache),
+            mock.patch.object(
+                DownloadLinks, "_results", side_effect=[object(), object()]
+            ) as results_mock,
+        ):
+            first = DownloadLinks(movie_file).results
+            second = DownloadLinks(movie_file).results
+        self.assertIsNot(first, second)
+        self.assertEqual(results_mock.call_count, 2)
+        self.assertEqual(len(model_cache), 0)
+
+    def test_thread_safety(self):
+        size = ModelCache.sizeof(search_results())
+        model_cache = ModelCache(max_size=size * 50)
+
+        def work(index):
+            model_cache.put(f"/{index % 80}.htm", search_results())
+            model_cache.get(f"/{(index * 7) % 80}.htm")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(2000)))
+        self.assertEqual(model_cache.size, size * len(model_cache))
+        self.assertLessEqual(len(model_cache), 50)
+
+    def test_navigate_results_cached(self):
+        movie = search_results().movies[0]
+        model_cache = ModelCache()
+        with (
+            mock.patch.object(cache, "model_cache", model_cache),
+            mock.patch.object(
+                hunter.Metadata, "movie_page", return_value=movie_page
+            ) as movie_page_mock,
+        ):
+            first = Navigate(movie).results
+            second = Navigate(movie).results
+        self.assertIs(first, second)
+        self.assertEqual(movie_page_mock.call_count, 1)
+
+    def test_navigate_keys_not_served_stale(self):
+        movie = search_results().movies[0]
+        clock = FakeClock()
+        model_cache = ModelCache(ttl=cache.download_key_ttl * 10, clock=clock)
+        with (
+            mock.patch.object(cache, "model_cache", model_cache),
+            mock.patch.object(
+                hunter.Metadata, "movie_page", return_value=movie_page
+            ) as movie_page_mock,
+        ):
+            first = Navigate(movie).results
+            self.assertIn("downloadoptionskey=", str(first.files[0].url))
+            clock.now = cache.download_key_ttl - 1
+            self.assertIs(Navigate(movie).results, first)
+            clock.now = cache.download_key_ttl + 1
+            self.assertIsNot(Navigate(movie).results, first)
+        self.assertEqual(movie_page_mock.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from helpers import movie
+
+from fzmovies_api.catalog import CatalogSnapshot, write_snapshot
+from fzmovies_api.records import MovieRecords
+
+movies = [
+    movie("The Godfather", 1972),
+    movie("The Godfather Part II", 1974),
+    movie("Heat", 1995),
+    movie("Amélie", 2001),
+    movie("the-godless", 2010),
+]
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = Path(self.dir.name) / "catalogue.snapshot"
+
+    def test_lookups(self):
+        written = write_snapshot(MovieRecords(movies + movies[:2]), self.path)
+        self.assertEqual(written, 5)
+        with CatalogSnapshot(self.path) as catalogue:
+            self.assertEqual(len(catalogue), 5)
+            heat = catalogue.get("https://www.fzmovies.net/movie-heat--hmp4.htm?ref=home")
+            self.assertEqual(heat.model(), movies[2])
+            self.assertIn("/movie-Amélie--hmp4.htm", catalogue)
+            self.assertNotIn("/movie-Up--hmp4.htm", catalogue)
+            titles = [record.title for record in catalogue.search_title("THE GOD")]
+            self.assertEqual(
+                titles, ["The Godfather", "The Godfather Part II", "the-godless"]
+            )
+            self.assertEqual(len(catalogue.search_title("the god", limit=2)), 2)
+            self.assertEqual(catalogue.search_title("ame")[0].title, "Amélie")
+            self.assertEqual(catalogue.search_title("zz"), [])
+            self.assertEqual(
+                sorted(record.title for record in catalogue),
+                sorted(model.title for model in movies),
+            )
+
+    def test_empty_and_invalid(self):
+        write_snapshot([], self.path)
+        with CatalogSnapshot(self.path) as catalogue:
+            self.assertEqual(len(catalogue), 0)
+            self.assertIsNone(catalogue.get("/movie-Heat--hmp4.htm"))
+            self.assertEqual(catalogue.search_title("heat"), [])
+
+        self.path.write_bytes(b"")
+        with self.assertRaises(ValueError):
+            CatalogSnapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
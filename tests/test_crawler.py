@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from helpers import movie
+
+from fzmovies_api import hunter, models
+from fzmovies_api.crawler import FilterCrawler, filter_space
+from fzmovies_api.filters import (
+    AlphabeticalOrderFilter,
+    MovieGenreFilter,
+    OscarsFilter,
+    ReleaseYearFilter,
+)
+from fzmovies_api.utils import canonical_url, get_absolute_url
+
+action = MovieGenreFilter("Action")
+drama = MovieGenreFilter("Drama")
+action_page_2 = get_absolute_url("/genre.php?catID=2&genre=Action&pg=2")
+
+site = {
+    canonical_url(action.url): models.SearchResults(
+        movies=[movie("Heat"), movie("Ronin")], next_page=action_page_2
+    ),
+    canonical_url(action_page_2): models.SearchResults(
+        movies=[movie("Drive"), movie("Heat")], next_page=action_page_2
+    ),
+    canonical_url(drama.url): models.SearchResults(movies=[movie("Up"), movie("Drive")]),
+}
+
+
+class TestFilterCrawler(unittest.TestCase):
+    def setUp(self):
+        self.fetched = []
+        self.unreachable = set()
+        patches = (
+            mock.patch.object(hunter.Index, "session_is_initialized", True),
+            mock.patch.object(FilterCrawler, "fetch", self.fetch),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.checkpoint = Path(self.dir.name) / "crawl.checkpoint"
+
+    def fetch(self, url: str) -> models.SearchResults:
+        self.fetched.append(canonical_url(url))
+        if canonical_url(url) in self.unreachable:
+            raise ConnectionError(url)
+        return site[canonical_url(url)]
+
+    def test_filter_space(self):
+        listings = list(filter_space(categories=["Hollywood"], years=[2019, 2020]))
+        self.assertEqual(len(listings), len({canonical_url(f.url) for f in listings}))
+        count = lambda cls: sum(isinstance(f, cls) for f in listings)  # noqa: E731
+        self.assertEqual(count(MovieGenreFilter), len(MovieGenreFilter.available_genres))
+        self.assertEqual(
+            count(AlphabeticalOrderFilter), len(AlphabeticalOrderFilter.available_ranges)
+        )
+        self.assertEqual(count(OscarsFilter), len(OscarsFilter.categories))
+        self.assertEqual(count(ReleaseYearFilter), 2)
+        self.assertEqual(
+            ReleaseYearFilter.available_years()[-1], ReleaseYearFilter.max_year()
+        )
+
+    def test_run(self):
+        movies = []
+        crawler = FilterCrawler([action, drama], workers=2)
+        stats = crawler.run(movies.append)
+        self.assertEqual(sorted(m.title for m in movies), ["Drive", "Heat", "Ronin", "Up"])
+        self.assertEqual(stats["pages"], 3)
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual(stats["listings"], 2)
+        self.assertFalse(crawler.pending)
+
+    def test_resume_from_checkpoint(self):
+        self.unreachable.add(canonical_url(action_page_2))
+        movies = []
+        crawler = FilterCrawler([action, drama], checkpoint=self.checkpoint)
+        crawler.run(movies.append)
+        self.assertIn(canonical_url(action.url), crawler.failures)
+        self.assertTrue(self.checkpoint.exists())
+
+        self.unreachable.clear()
+        self.fetched.clear()
+        crawler = FilterCrawler([action, drama], checkpoint=self.checkpoint)
+        crawler.run(movies.append)
+        self.assertEqual(self.fetched, [canonical_url(action_page_2)])
+        self.assertEqual(sorted(m.title for m in movies), ["Drive", "Heat", "Ronin", "Up"])
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_checkpoint_written_before_seen(self):
+        writes = []
+        crawler = FilterCrawler([action], checkpoint=self.checkpoint)
+        with (
+            mock.patch(
+                "fzmovies_api.crawler.write_json_atomically",
+                lambda *args: writes.append("checkpoint"),
+            ),
+            mock.patch.object(crawler.seen, "save", lambda path: writes.append("seen")),
+        ):
+            crawler.save_checkpoint()
+        self.assertEqual(writes, ["checkpoint", "seen"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from fzmovies_api.dedup import DedupIndex
+from fzmovies_api.utils import movie_id
+
+
+class TestMovieId(unittest.TestCase):
+    def test_forms_of_a_link_agree(self):
+        ids = {
+            movie_id(url)
+            for url in (
+                "/movie-Heat--hmp4.htm",
+                "movie-Heat--hmp4.htm",
+                "https://fzmovies.live/movie-Heat--hmp4.htm",
+                "https://www.fzmovies.host//movie-heat--hmp4.htm?ref=home#top",
+                "https://fzmovies.net/movie-Heat--hmp4.htm",
+            )
+        }
+        self.assertEqual(ids, {"heat--hmp4"})
+        self.assertNotEqual(movie_id("/movie-Heat--hmp4.htm"), movie_id("/movie-Up--hmp4.htm"))
+        self.assertEqual(
+            movie_id("https://example.com/movie-Heat--hmp4.htm"),
+            "https://example.com/movie-Heat--hmp4.htm",
+        )
+
+
+class TestDedupIndex(unittest.TestCase):
+    def test_add_and_contains(self):
+        index = DedupIndex(capacity=4)
+        self.assertTrue(index.add("/movie-Heat--hmp4.htm"))
+        self.assertFalse(index.add("https://fzmovies.host/movie-Heat--hmp4.htm?x=1"))
+        self.assertIn("https://fzmovies.live/movie-Heat--hmp4.htm", index)
+        self.assertNotIn("/movie-Up--hmp4.htm", index)
+        urls = [f"/movie-Movie {number}--hmp4.htm" for number in range(5_000)]
+        self.assertEqual(index.update(urls), 5_000)
+        self.assertEqual(len(index), 5_001)
+        self.assertTrue(all(url in index for url in urls))
+        self.assertLessEqual(index.size, 5_001 * 8 * 4)
+
+    def test_save_and_load(self):
+        index = DedupIndex(f"/movie-{number}--hmp4.htm" for number in range(3_000))
+        with tempfile.TemporaryDirectory() as dir:
+            path = Path(dir) / "movies.seen"
+            index.save(path)
+            loaded = DedupIndex.load(path)
+            self.assertEqual(len(DedupIndex.load(Path(dir) / "missing.seen")), 0)
+            path.write_bytes(b"not an index file")
+            with self.assertRaises(ValueError):
+                DedupIndex.load(path)
+        self.assertEqual(len(loaded), 3_000)
+        self.assertEqual(loaded.fingerprints(), index.fingerprints())
+        self.assertFalse(loaded.add("/movie-2999--hmp4.htm"))
+        merged = DedupIndex(["/movie-Heat--hmp4.htm"])
+        self.assertEqual(merged.merge(loaded), 3_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
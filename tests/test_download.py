@@ -0,0 +1,387 @@
+import hashlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import requests
+from helpers import LocalServerTestBase, file_size, synthetic_contents
+
+from fzmovies_api import (
+    Download,
+    bandwidth,
+    errors,
+    hunter,
+    mirrors,
+    models,
+    utils,
+    writer,
+)
+from fzmovies_api.swarm import (
+    PrefixHasher,
+    SegmentScheduler,
+    Source,
+    SwarmDownload,
+    parts_file,
+)
+
+
+class TestDownloadSave(LocalServerTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.download = Download(
+            models.DownloadLink(url=self.url, connections=0), last_url=self.url
+        )
+
+    def test_save(self):
+        saved_to = self.download.save(
+            "movie.mkv", dir=self.dir.name, progress_bar=False, chunk_size=333
+        )
+        self.assertEqual(saved_to.read_bytes(), synthetic_contents(file_size))
+
+    def test_save_with_progress_bar(self):
+        saved_to = self.download.save(
+            "movie.mkv", dir=self.dir.name, quiet=True, leave=False
+        )
+        self.assertEqual(saved_to.stat().st_size, file_size)
+
+    def test_resume(self):
+        partial = 1_234_567
+        Path(self.dir.name, "movie.mkv").write_bytes(synthetic_contents(partial))
+        saved_to = self.download.save(
+            "movie.mkv", dir=self.dir.name, progress_bar=False, resume=True
+        )
+        self.assertEqual(saved_to.read_bytes(), synthetic_contents(file_size))
+
+    def test_resume_complete_download(self):
+        Path(self.dir.name, "movie.mkv").write_bytes(synthetic_contents(file_size))
+        with self.assertRaises(FileExistsError):
+            self.download.save(
+                "movie.mkv", dir=self.dir.name, progress_bar=False, resume=True
+            )
+
+    def test_resume_rejected_range(self):
+        path = Path(self.dir.name, "movie.mkv")
+        path.write_bytes(synthetic_contents(file_size))
+        for total, exception in (
+            (file_size, FileExistsError),
+            (file_size + 1, requests.HTTPError),
+        ):
+            resp = requests.Response()
+            resp.status_code = 416
+            resp.headers.update(
+                {"Content-Range": f"bytes */{total}", "Content-Length": "44"}
+            )
+            resp.raw = io.BytesIO(b"<html><body>Range Not Satisfiable</body></html>"[:44])
+            with mock.patch.object(hunter.session, "get", return_value=resp):
+                with self.assertRaises(exception):
+                    self.download.save(
+                        "movie.mkv", dir=self.dir.name, progress_bar=False, resume=True
+                    )
+            self.assertEqual(path.read_bytes(), synthetic_contents(file_size))
+
+    def test_checksum(self):
+        saved = self.download.save(
+            "movie.mkv", dir=self.dir.name, progress_bar=False, checksum="sha256"
+        )
+        self.assertIsInstance(saved, models.SavedMovie)
+        digest = hashlib.sha256(synthetic_contents(file_size)).hexdigest()
+        self.assertEqual(saved.digest, digest)
+        self.assertEqual(writer.read_checksum_file(saved.path, "sha256"), digest)
+
+    def test_checksum_on_resume(self):
+        Path(self.dir.name, "movie.mkv").write_bytes(synthetic_contents(999_999))
+        saved = self.download.save(
+            "movie.mkv",
+            dir=self.dir.name,
+            progress_bar=False,
+            resume=True,
+            checksum="md5",
+        )
+        self.assertEqual(
+            saved.digest, hashlib.md5(synthetic_contents(file_size)).hexdigest()
+        )
+
+    def test_expected_size(self):
+        with self.assertRaises(errors.IntegrityError):
+            self.download.save(
+                "movie.mkv",
+                dir=self.dir.name,
+                progress_bar=False,
+                expected_size=file_size + 1,
+            )
+
+    def test_rate_limit(self):
+        started_at = time.perf_counter()
+        self.download.save(
+            "movie.mkv", dir=self.dir.name, progress_bar=False, rate_limit="10MB"
+        )
+        self.assertGreater(time.perf_counter() - started_at, 0.35)
+
+    def test_rank_links(self):
+        links = [
+            models.DownloadLink(url=url, connections=0)
+            for url in (
+                "http://127.0.0.1:1/broken.bin",
+                self.url,
+                self.server.url_for(100),
+            )
+        ]
+        probes = mirrors.rank_links(links, resolve=lambda link: str(link.url))
+        self.assertIsNone(probes[0].error)
+        self.assertTrue(probes[0].supports_range)
+        self.assertIsNotNone(probes[-1].error)
+        best = mirrors.fastest_link(links, resolve=lambda link: str(link.url))
+        self.assertEqual(best.last_url, str(best.link.url))
+
+
+class TestSwarmDownload(LocalServerTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.swarm = SwarmDownload(
+            [
+                models.DownloadLink(url=url, connections=0)
+                for url in (
+                    "http://127.0.0.1:1/broken.bin",
+                    f"{self.url}?source=1",
+                    f"{self.url}?source=2",
+                    f"{self.url}?source=3",
+                )
+            ],
+            resolve=lambda link: str(link.url),
+        )
+
+    def test_swarm_save(self):
+        saved = self.swarm.save(
+            "movie.mkv",
+            dir=self.dir.name,
+            progress_bar=False,
+            segment_size=1_000_000,
+            checksum="sha256",
+            expected_size=file_size,
+        )
+        self.assertEqual(len(self.swarm.sources), 3)
+        self.assertEqual(saved.path.read_bytes(), synthetic_contents(file_size))
+        self.assertEqual(
+            saved.digest, hashlib.sha256(synthetic_contents(file_size)).hexdigest()
+        )
+        self.assertFalse(parts_file(saved.path).exists())
+
+    def test_swarm_chunk_larger_than_segments(self):
+        saved_to = self.swarm.save(
+            "movie.mkv", dir=self.dir.name, progress_bar=False, chunk_size=4096
+        )
+        self.assertEqual(saved_to.read_bytes(), synthetic_contents(file_size))
+
+    def test_swarm_resume(self):
+        Path(self.dir.name, "movie.mkv").write_bytes(synthetic_contents(2_000_000))
+        saved_to = self.swarm.save(
+            "movie.mkv", dir=self.dir.name, progress_bar=False, resume=True
+        )
+        self.assertEqual(saved_to.read_bytes(), synthetic_contents(file_size))
+
+
+class TestSegmentScheduler(unittest.TestCase):
+
+    def test_pending_excludes_done_ranges(self):
+        scheduler = SegmentScheduler(
+            10_000_000, done=[(0, 3_000_000)], segment_size=4_000_000
+        )
+        link = models.DownloadLink(url="http://a.b/c", connections=0)
+        source = Source(models.LinkProbe(link=link))
+        first = scheduler.acquire(source)
+        self.assertEqual((first.start, first.end), (3_000_000, 7_000_000))
+        second = scheduler.acquire(source)
+        self.assertEqual((second.start, second.end), (7_000_000, 10_000_000))
+
+    def test_steal_from_slow_source(self):
+        link = models.DownloadLink(url="http://a.b/c", connections=0)
+        slow = Source(models.LinkProbe(link=link, throughput=1_000_000))
+        fast = Source(models.LinkProbe(link=link, throughput=3_000_000))
+        scheduler = SegmentScheduler(16_000_000, segment_size=16_000_000)
+        held = scheduler.acquire(slow)
+        stolen = scheduler.acquire(fast)
+        self.assertEqual(held.end, stolen.start)
+        self.assertEqual(stolen.end, 16_000_000)
+        self.assertGreater(stolen.end - stolen.start, held.end - held.start)
+        scheduler.claim(held, held.end - held.start)
+        scheduler.complete(held)
+        scheduler.release(stolen)
+        self.assertEqual(scheduler.contiguous, held.end)
+        self.assertFalse(scheduler.is_complete)
+
+
+class TestPrefixHasher(unittest.TestCase):
+
+    def test_out_of_order_writes(self):
+        contents = synthetic_contents(1000)
+        with tempfile.TemporaryDirectory() as dir:
+            path = Path(dir, "movie.mkv")
+            path.write_bytes(contents)
+            prefix = PrefixHasher(hashlib.sha256(), path, written=[(900, 1000)])
+            view = memoryview(contents)
+            for start, end in ((0, 100), (300, 400), (200, 300), (100, 200)):
+                prefix.written(start, view[start:end])
+            self.assertEqual(prefix.hashed, 400)
+            # Only ranges written ahead of the prefix were read back
+            self.assertEqual(prefix.read_back, 200)
+            prefix.written(400, view[400:900])
+        self.assertEqual(prefix.hashed, 1000)
+        self.assertEqual(prefix.read_back, 300)
+        self.assertEqual(
+            prefix.hasher.hexdigest(), hashlib.sha256(contents).hexdigest()
+        )
+
+    def test_writes_proceed_while_reading_back(self):
+        contents = synthetic_contents(1000)
+        view = memoryview(contents)
+        hash_file = writer.hash_file
+        # Written by other sources meanwhile - they would deadlock on the lock
+        others = [(500, 600), (100, 200)]
+
+        def reading_back(*args):
+            self.assertFalse(prefix._lock.locked())
+            while others:
+                start, end = others.pop(0)
+                prefix.written(start, view[start:end])
+            hash_file(*args)
+
+        with tempfile.TemporaryDirectory() as dir:
+            path = Path(dir, "movie.mkv")
+            path.write_bytes(contents)
+            prefix = PrefixHasher(hashlib.sha256(), path, written=[(100, 500)])
+            with mock.patch.object(writer, "hash_file", reading_back):
+                prefix.written(0, view[0:100])
+            prefix.written(600, view[600:1000])
+        self.assertEqual(prefix.hashed, 1000)
+        self.assertEqual(prefix.read_back, 500)
+        self.assertEqual(
+            prefix.hasher.hexdigest(), hashlib.sha256(contents).hexdigest()
+        )
+
+
+class TestBandwidthController(unittest.TestCase):
+
+    def test_weighted_shares(self):
+        controller = bandwidth.BandwidthController(rate="10MB")
+        bulk = controller.register(weight=1)
+        interactive = controller.register(weight=4, rate="3MB")
+        # Interactive is capped below its 8MB share - bulk takes the rest
+        self.assertEqual(bulk.allowed_rate, 7_000_000)
+        self.assertEqual(interactive.allowed_rate, 3_000_000)
+        other = controller.register(weight=1)
+        self.assertEqual(bulk.allowed_rate, 3_500_000)
+        self.assertEqual(other.allowed_rate, 3_500_000)
+        # Idle downloads leave their share to the others
+        other._last_used -= other.idle_seconds + 1
+        self.assertEqual(bulk.allowed_rate, 7_000_000)
+        other.close()
+        interactive.close()
+        self.assertEqual(bulk.allowed_rate, 10_000_000)
+        bulk.weight = 2
+        controller.rate = None
+        self.assertIsNone(bulk.allowed_rate)
+
+    def test_schedule(self):
+        schedule = bandwidth.Schedule(
+            [("08:00", "17:00", "1MB"), ("22:00", "06:00", 0)], default="5MB"
+        )
+        self.assertEqual(schedule.rate_at(datetime(2024, 1, 1, 9)), 1_000_000)
+        self.assertEqual(schedule.rate_at(datetime(2024, 1, 1, 23)), 0)
+        self.assertEqual(schedule.rate_at(datetime(2024, 1, 1, 2)), 0)
+        self.assertEqual(schedule.rate_at(datetime(2024, 1, 1, 19)), 5_000_000)
+
+
+class TestSizeParsing(unittest.TestCase):
+
+    def test_parse_size(self):
+        self.assertEqual(utils.parse_size("1.2 GB"), 1_200_000_000)
+        self.assertEqual(utils.parse_size("805 MB", base=1024), 805 * 1024**2)
+
+    def test_size_matches(self):
+        self.assertTrue(utils.size_matches(805 * 1024**2, "805 MB"))
+        self.assertTrue(utils.size_matches(1_234_000_000, "1.2 GB"))
+        self.assertFalse(utils.size_matches(600_000_000, "805 MB"))
+
+    def test_model_sizes_and_resolutions(self):
+        movie_file = models.FileMetadata(
+            title="Movie 720p",
+            url="https://fzmovies.live/download1.php?downloadoptionskey=2",
+            size="1.2 GB",
+            hits=5,
+            mediainfo="https://fzmovies.live/mediainfo.php?id=2",
+        )
+        self.assertEqual(movie_file.size_in_bytes, 1_200_000_000)
+        self.assertEqual(movie_file.resolution, 720)
+        self.assertEqual(movie_file.model_dump()["size_in_bytes"], 1_200_000_000)
+        self.assertEqual(utils.parse_resolution("Movie.2020.1080p.x265.mp4"), 1080)
+        self.assertIsNone(utils.parse_resolution("Movie.2020.mp4"))
+        self.assertIsNone(utils.parse_size_or_none("unknown"))
+
+    def test_select_file(self):
+        def movie_file(title, size):
+            return models.FileMetadata(
+                title=title,
+                url="https://fzmovies.live/download1.php",
+                size=size,
+                hits=0,
+                mediainfo="https://fzmovies.live/mediainfo.php",
+            )
+
+        files = [
+            movie_file("Movie 480p", "450 MB"),
+            movie_file("Movie 720p", "1.2 GB"),
+            movie_file("Movie 720p x265", "700 MB"),
+        ]
+        self.assertIs(utils.select_file(files, "720p"), files[1])
+        self.assertIs(utils.select_file(files, "720p", floor=True), files[2])
+        self.assertIs(utils.select_file(files, "480p", floor=True), files[0])
+        with self.assertRaises(errors.DownloadError):
+            utils.select_file(files[:1], "720p")
+        with self.assertRaises(errors.DownloadError):
+            utils.select_file(files[:1], "720p", floor=True)
+
+
+class TestFileWriter(unittest.TestCase):
+
+    def test_block_aligned_writes(self):
+        with tempfile.TemporaryDirectory() as dir:
+            target = Path(dir, "file")
+            target.write_bytes(b"x" * 100)
+            flushed: list[int] = []
+            with writer.FileWriter(
+                target, offset=100, buffer_size=8192, on_flush=flushed.append
+            ) as file_writer:
+                file_writer.write(b"y" * 20_000)
+            self.assertEqual((100 + flushed[0]) % writer.block_size, 0)
+            self.assertEqual(sum(flushed), 20_000)
+            self.assertEqual(target.read_bytes(), b"x" * 100 + b"y" * 20_000)
+
+    def test_insufficient_storage(self):
+        with tempfile.TemporaryDirectory() as dir:
+            with self.assertRaises(errors.InsufficientStorage):
+                writer.FileWriter(
+                    os.path.join(dir, "file"), expected_size=2**62
+                ).open()
+
+    def test_response_reader_without_private_fp(self):
+        class Response:
+            headers = {}
+            raw = io.BytesIO(b"body")
+
+        read_into = writer.response_reader(Response())
+        buffer = bytearray(3)
+        self.assertEqual(read_into(memoryview(buffer)), 3)
+        self.assertEqual(buffer, b"bod")
+        self.assertEqual(read_into(memoryview(buffer)), 1)
+        self.assertEqual(read_into(memoryview(buffer)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from click.testing import CliRunner
+from helpers import movie, site
+
+import fzmovies_api
+import fzmovies_api.console
+import fzmovies_api.main
+from fzmovies_api import errors, models
+from fzmovies_api.console import stream_jsonl
+from fzmovies_api.export import JSONLinesExport, checkpoint_file
+
+pages = {
+    f"{site}/page{number}": models.SearchResults(
+        movies=[movie(f"Movie {number * 10 + index}") for index in range(3)],
+        next_page=f"{site}/page{number + 1}" if number < 3 else None,
+    )
+    for number in range(1, 4)
+}
+
+
+class FakeSearch:
+    """Pages through `pages` - fails while streaming `fail_on` once"""
+
+    fail_on: str | None = None
+
+    def __init__(self, query):
+        self.url = str(getattr(query, "url", f"{site}/page1"))
+        self.latest_results = None
+
+    def stream_results(self):
+        for index, result in enumerate(pages[self.url].movies):
+            if self.url == FakeSearch.fail_on and index == 1:
+                FakeSearch.fail_on = None
+                raise KeyboardInterrupt
+            yield result
+        self.latest_results = pages[self.url]
+
+    @property
+    def results(self):
+        self.latest_results = pages[self.url]
+        return self.latest_results
+
+    def next(self):
+        return FakeSearch(type("Filter", (), {"url": str(self.latest_results.next_page)}))
+
+    get_all_results = fzmovies_api.main.Search.get_all_results
+
+
+def read_titles(path: Path) -> list[str]:
+    return [json.loads(line)["title"] for line in path.read_text().splitlines()]
+
+
+class TestJSONLinesExport(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = Path(self.dir.name) / "movies.jsonl"
+        patch = mock.patch.object(fzmovies_api, "Search", FakeSearch)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_streams_all_pages(self):
+        stream_jsonl(FakeSearch("query"), "query", self.path, 1_000_000, False, True)
+        self.assertEqual(len(read_titles(self.path)), 9)
+        self.assertFalse(checkpoint_file(self.path).exists())
+
+    def test_stdout(self):
+        stream = StringIO()
+        with JSONLinesExport(None, "query", stream=stream) as export:
+            export.write_movie(movie("Movie 1"))
+            export.end_page(None)
+        self.assertEqual(json.loads(stream.getvalue())["title"], "Movie 1")
+
+    def test_resume_after_interruption(self):
+        FakeSearch.fail_on = f"{site}/page2"
+        with self.assertRaises(KeyboardInterrupt):
+            stream_jsonl(FakeSearch("query"), "query", self.path, 1_000_000, False, True)
+        state = json.loads(checkpoint_file(self.path).read_text())
+        self.assertEqual(state["page"], 1)
+        self.assertEqual(state["next_page"], f"{site}/page2")
+        # Partially written page is in the file
+        self.assertEqual(len(read_titles(self.path)), 4)
+
+        stream_jsonl(FakeSearch("query"), "query", self.path, 1_000_000, True, True)
+        titles = read_titles(self.path)
+        self.assertEqual(titles, [result.title for page in pages.values() for result in page.movies])
+        self.assertFalse(checkpoint_file(self.path).exists())
+
+    def test_resume_of_different_search(self):
+        FakeSearch.fail_on = f"{site}/page2"
+        with self.assertRaises(KeyboardInterrupt):
+            stream_jsonl(FakeSearch("query"), "query", self.path, 1_000_000, False, True)
+        with self.assertRaises(errors.FzmoviesAPIException):
+            JSONLinesExport(self.path, "other", resume=True)
+
+    def test_resume_after_completion(self):
+        stream_jsonl(FakeSearch("query"), "query", self.path, 1_000_000, False, True)
+        titles = read_titles(self.path)
+        stream_jsonl(FakeSearch("query"), "query", self.path, 1_000_000, True, True)
+        self.assertEqual(read_titles(self.path), titles)
+        with JSONLinesExport(self.path, "query", resume=True) as export:
+            self.assertTrue(export.is_complete)
+            self.assertEqual(export.total, 9)
+        self.assertEqual(read_titles(self.path), titles)
+
+    def test_prefetch(self):
+        stream_jsonl(
+            FakeSearch("query"), "query", self.path, 1_000_000, False, True, prefetch=2
+        )
+        titles = [result.title for page in pages.values() for result in page.movies]
+        self.assertEqual(read_titles(self.path), titles)
+        self.assertFalse(checkpoint_file(self.path).exists())
+
+    def test_no_prefetch_by_default(self):
+        with (
+            mock.patch.object(fzmovies_api, "Search"),
+            mock.patch.object(
+                fzmovies_api.console, "stream_jsonl", return_value=None
+            ) as stream,
+        ):
+            result = CliRunner().invoke(
+                fzmovies_api.console.Search.discover, ["query", "-F", "jsonl", "-q"]
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(stream.call_args.args[-1], 0)
+
+    def test_limit(self):
+        stream_jsonl(FakeSearch("query"), "query", self.path, 4, False, True)
+        self.assertEqual(len(read_titles(self.path)), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
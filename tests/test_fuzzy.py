@@ -0,0 +1,72 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fzmovies_api import hunter
+from fzmovies_api.fuzzy import FuzzyIndex, normalize, trigrams
+from fzmovies_api.main import Search
+
+titles = (
+    "Terminator 2 Judgment Day",
+    "The Terminator",
+    "The Shawshank Redemption",
+    "Schindlers List",
+    "The Godfather - Part 1",
+    "Amélie",
+    "Pulp Fiction",
+)
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FuzzyIndex()
+        for title in titles:
+            self.index.add(title, url=f"/movie-{title}--hmp4.htm")
+        self.index.add("Quentin Tarantino", "Director", "/movie-Pulp Fiction--hmp4.htm")
+
+    def test_normalize(self):
+        self.assertEqual(normalize("  Amélie:  The-Movie! "), "amelie the movie")
+        self.assertEqual(trigrams("up"), {"  u", " up", "up "})
+
+    def test_search(self):
+        matches = self.index.search("terminater")
+        self.assertEqual(matches[0].text, "The Terminator")
+        self.assertIn("Terminator 2 Judgment Day", [match.text for match in matches])
+        self.assertEqual(self.index.search("amelie")[0].text, "Amélie")
+        self.assertEqual(self.index.search("xyzzy"), [])
+        director = self.index.search("tarantno", searchby="Director")
+        self.assertEqual(director[0].urls, ["/movie-Pulp Fiction--hmp4.htm"])
+        self.assertEqual(self.index.search("tarantno", searchby="Starcast"), [])
+
+    def test_did_you_mean(self):
+        self.assertEqual(self.index.did_you_mean("Shawshenk Redemtion"), "The Shawshank Redemption")
+        self.assertIsNone(self.index.did_you_mean("pulp fiction"))
+        with mock.patch.object(hunter.Index, "session_is_initialized", True):
+            search = Search("Shindlers list")
+        self.assertEqual(search.did_you_mean(self.index), "Schindlers List")
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = Path(dir) / "titles.json"
+            self.index.save(path)
+            loaded = FuzzyIndex.load(path)
+        self.assertEqual(len(loaded), len(self.index))
+        self.assertEqual(loaded.search("godfater"), self.index.search("godfater"))
+
+    def test_large_index_is_fast(self):
+        index = FuzzyIndex()
+        for number in range(50_000):
+            index.add(f"The Movie Number {number} Part {number % 7}")
+        index.add("The Shawshank Redemption")
+        started_at = time.perf_counter()
+        for _ in range(20):
+            match = index.search("shawshenk")[0]
+        elapsed = (time.perf_counter() - started_at) / 20
+        self.assertEqual(match.text, "The Shawshank Redemption")
+        self.assertLess(elapsed, 0.005)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,318 @@
+import unittest
+
+from helpers import movie_page
+
+from fzmovies_api import errors, extraction, fastpath, handlers
+from fzmovies_api.extraction import Field, Spec
+from fzmovies_api.handlers import search_handler
+from fzmovies_api.streaming import stream_search_handler
+
+movie_template = """
+<div class="mainbox">
+  <table><tr>
+    <td><a href="/movie-{id}.htm"><img src="/imdb_images/{id}.jpg" class="imglarge"></a></td>
+    <td><span class="moviename">
+      <a href="/movie-{id}.htm"><small><b>Movie &amp; {id}</b></small></a><br>
+      <small>({year})</small><br>{distribution}
+      <small>About movie {id}
+      spanning lines</small>
+    </span></td>
+  </tr></table>
+</div>
+"""
+
+navigation = """
+<div class="mainbox2">
+  <a href="https://fzmovies.net/search.php?pg=1">First</a>
+  <a href="https://fzmovies.net/search.php?pg=1">Prev</a> 2
+  <a href="https://fzmovies.net/search.php?pg=3">Next</a>
+  <a href="https://fzmovies.net/search.php?pg=9">Last</a>
+</div>
+"""
+
+footer = '<div class="mainbox3">Footer</div></body></html>'
+
+to_download_page = '<html><body><p><a id="downloadlink" href="download.php?downloadkey=abc">Download</a></p></body></html>'
+
+download_links_page = """<html><body>
+<div class="mainbox4">  Links expire in 30 minutes </div>
+<div class="moviedesc"><textcolor1>Movie.2020.480p.mp4</textcolor1> <textcolor2>450 MB</textcolor2></div>
+<ul class="downloadlinks"><li>ad</li></ul>
+<ul class="downloadlinks"><li>ad</li></ul>
+<ul class="downloadlinks">
+ <li><a href="dlink.php?id=1">Link 1</a> <dcounter>(12 connections)</dcounter></li>
+ <li><a href="dlink.php?id=2">Link 2</a> <dcounter>(3 connections)</dcounter></li>
+</ul>
+<ul class="downloadlinks"><li><a href="x">x</a><dcounter>(9 x)</dcounter></li></ul>
+</body></html>"""
+
+dlink_page = '<html><body><div class="mainbox3"><p>Here</p><a href="https://d.example.com/movie.mp4">Download</a></div></body></html>'
+
+qa_page = """<html><body>
+<div class="question">1. What is CAM?</div><div class="answer"> Recorded in a cinema. </div>
+<div class="question">2. What is HD?</div><div class="answer">High definition</div>
+</body></html>"""
+
+
+def search_page(movies: int = 3, with_navigation: bool = True) -> str:
+    items = "".join(
+        movie_template.format(
+            id=id,
+            year=2000 + id,
+            distribution="<small>(Hollywood)</small>" if id % 2 else "",
+        )
+        for id in range(movies)
+    )
+    return (
+        "<html><head><title>Fzmovies - Search Results</title></head><body>"
+        + items
+        + (navigation if with_navigation else "")
+        + footer
+    )
+
+
+def with_scripts(contents: str) -> str:
+    return contents.replace(
+        "</head>",
+        "<script>var ads = [];</script><style>.mainbox { margin: 0 }</style></head>",
+        1,
+    ).replace("<body>", "<body><!-- top ad -->", 1)
+
+
+def in_chunks(contents: str, size: int = 37):
+    for offset in range(0, len(contents), size):
+        yield contents[offset : offset + size]
+
+
+class TestStreamSearchHandler(unittest.TestCase):
+    def test_matches_search_handler(self):
+        for with_navigation in (True, False):
+            contents = search_page(with_navigation=with_navigation)
+            stream = stream_search_handler(in_chunks(contents))
+            movies = list(stream)
+            self.assertEqual(stream.results, search_handler(contents))
+            self.assertEqual(movies, stream.results.movies)
+            self.assertEqual(len(movies), 3)
+
+    def test_movies_are_yielded_before_page_ends(self):
+        contents = search_page(movies=5)
+        consumed = []
+
+        def chunks():
+            for chunk in in_chunks(contents):
+                consumed.append(chunk)
+                yield chunk
+
+        first = next(iter(stream_search_handler(chunks())))
+        self.assertEqual(first.title, "Movie & 0")
+        self.assertLess(len("".join(consumed)), len(contents) / 2)
+
+    def test_movies_after_navigation(self):
+        contents = search_page(movies=2).replace(
+            footer,
+            movie_template.format(id=7, year=2007, distribution="") + footer,
+        )
+        stream = stream_search_handler(in_chunks(contents))
+        movies = list(stream)
+        self.assertEqual(stream.results, search_handler(contents))
+        self.assertEqual([movie.title for movie in movies][-1], "Movie & 7")
+        self.assertEqual(
+            str(stream.results.next_page), "https://fzmovies.net/search.php?pg=3"
+        )
+
+    def test_zero_results(self):
+        contents = (
+            "<html><head><title>Fzmovies - Search results for 'xyz'</title></head>"
+            '<body><div class="mainbox"><a href="/">Home</a> No movies</div></body></html>'
+        )
+        with self.assertRaises(errors.ZeroSearchResults):
+            search_handler(contents)
+        with self.assertRaises(errors.ZeroSearchResults):
+            list(stream_search_handler(in_chunks(contents)))
+
+    def test_expired_session(self):
+        contents = (
+            "<html><body>\n<p>Your download keys have expired. "
+            '<a href="/movie-1.htm">Restart</a></p>\n'
+            + "<p>padding</p>" * 1000
+            + "</body></html>"
+        )
+        consumed = []
+
+        def chunks():
+            for chunk in in_chunks(contents, 64):
+                consumed.append(chunk)
+                yield chunk
+
+        with self.assertRaises(errors.SessionExpired):
+            list(stream_search_handler(chunks()))
+        self.assertLess(len(consumed), 10)
+
+    def test_expired_session_across_chunks_and_lines(self):
+        contents = (
+            "<html><body>\n<p>Your download\n  keys have\nexpired. "
+            '<a href="/movie-1.htm">Restart</a></p>\n</body></html>'
+        )
+        for size in (5, 13, 37):
+            with self.assertRaises(errors.SessionExpired) as raised:
+                list(stream_search_handler(in_chunks(contents, size)))
+            self.assertTrue(raised.exception.redirect_to.endswith("/movie-1.htm"))
+
+
+class TestHandlers(unittest.TestCase):
+    def test_movie_handler(self):
+        movie = handlers.movie_handler(movie_page)
+        self.assertEqual(str(movie.trailer), "https://www.youtube.com/embed/xyz")
+        self.assertEqual([m.title for m in movie.recommended], ["Alpha", "Beta (2019)"])
+        self.assertEqual(len(movie.files), 2)
+        self.assertEqual(movie.files[1].size, "1.2 GB")
+        self.assertEqual(movie.files[1].hits, 5678)
+        self.assertIsNone(movie.files[0].ss)
+        self.assertTrue(str(movie.files[1].ss).endswith("/ss.php?id=2"))
+
+    def test_to_download_handler(self):
+        self.assertTrue(
+            handlers.to_download_handler(to_download_page).endswith(
+                "/download.php?downloadkey=abc"
+            )
+        )
+
+    def test_download_links_handler(self):
+        download_movie = handlers.download_links_handler(download_links_page)
+        self.assertEqual(download_movie.filename, "Movie.2020.480p.mp4")
+        self.assertEqual(download_movie.size, "450 MB")
+        self.assertEqual(download_movie.info, "Links expire in 30 minutes")
+        self.assertEqual([link.connections for link in download_movie.links], [12, 3])
+
+    def test_final_download_link_handler(self):
+        self.assertEqual(
+            handlers.final_download_link_handler(dlink_page),
+            "https://d.example.com/movie.mp4",
+        )
+
+    def test_questions_and_answers_handler(self):
+        self.assertEqual(
+            handlers.questions_and_answers_handler(qa_page),
+            {"What is CAM?": "Recorded in a cinema.", "What is HD?": "High definition"},
+        )
+
+    def test_extraction_error_names_failed_selector(self):
+        with self.assertRaises(errors.ExtractionError) as context:
+            handlers.download_links_handler(
+                download_links_page.replace("textcolor2", "textcolor3")
+            )
+        self.assertEqual(context.exception.field, "size")
+        self.assertEqual(context.exception.selector, "div.moviedesc textcolor2")
+
+        with self.assertRaises(errors.ExtractionError) as context:
+            handlers.final_download_link_handler('<div class="mainbox3"></div>')
+        self.assertEqual(context.exception.field, "link.href")
+
+
+class TestFastPath(unittest.TestCase):
+    def tree_path(self, handler, contents):
+        extraction.fast_paths_enabled = False
+        try:
+            return handler(contents)
+        finally:
+            extraction.fast_paths_enabled = True
+
+    def test_matches_tree_path(self):
+        for handler, contents in (
+            (search_handler, search_page()),
+            (search_handler, search_page(with_navigation=False)),
+            (search_handler, search_page().replace("&amp;", "&lt;&gt;")),
+            (search_handler, with_scripts(search_page())),
+            (handlers.final_download_link_handler, dlink_page),
+            (
+                handlers.final_download_link_handler,
+                with_scripts(dlink_page.replace("<html>", "<html><head></head>")),
+            ),
+        ):
+            fast = (
+                fastpath.search_page
+                if handler is search_handler
+                else fastpath.final_download_link_page
+            )
+            self.assertIsNotNone(fast(contents))
+            self.assertEqual(handler(contents), self.tree_path(handler, contents))
+
+    def test_falls_back_on_unexpected_markup(self):
+        stats = handlers.search_spec.stats
+        for contents in (
+            # Nested results
+            search_page().replace(
+                '<span class="moviename">', '<span class="moviename"><div class="mainbox">'
+            ),
+            # Comment may hide tags
+            search_page().replace("<td>", "<td><!-- <small>x</small> -->", 1),
+            # Unclosed result
+            search_page(with_navigation=False).replace("</div>\n", "", 1),
+        ):
+            self.assertIsNone(fastpath.search_page(contents))
+            fallbacks = stats["fallback"]
+            try:
+                handler_result = search_handler(contents)
+            except errors.FzmoviesAPIException as e:
+                handler_result = e
+            self.assertEqual(stats["fallback"], fallbacks + 1)
+            try:
+                tree_result = self.tree_path(search_handler, contents)
+            except errors.FzmoviesAPIException as e:
+                tree_result = e
+            if isinstance(tree_result, Exception):
+                self.assertIs(type(handler_result), type(tree_result))
+            else:
+                self.assertEqual(handler_result, tree_result)
+
+    def test_zero_results_falls_back(self):
+        contents = (
+            "<html><head><title>Fzmovies - Search results for 'xyz'</title></head>"
+            '<body><div class="mainbox"><a href="/">Home</a> No movies</div></body></html>'
+        )
+        fallbacks = handlers.search_spec.stats["fallback"]
+        with self.assertRaises(errors.ZeroSearchResults):
+            search_handler(contents)
+        self.assertEqual(handlers.search_spec.stats["fallback"], fallbacks + 1)
+
+    def test_mismatching_fields_fall_back(self):
+        spec = Spec(
+            "test",
+            {"link": Field("a", attr="href")},
+            fast_path=lambda contents: {"link": ["not", "a", "string"]},
+        )
+        self.assertEqual(spec.extract('<a href="/x">x</a>'), {"link": "/x"})
+        self.assertEqual(spec.stats, {"fallback": 1})
+
+    def test_stats(self):
+        before = handlers.fast_path_stats()["dlink"]["fast"]
+        handlers.final_download_link_handler(dlink_page)
+        self.assertEqual(handlers.fast_path_stats()["dlink"]["fast"], before + 1)
+
+
+class TestExtraction(unittest.TestCase):
+    def test_index_limit_and_defaults(self):
+        spec = Spec(
+            "test",
+            {
+                "second": Field("li", index=1),
+                "last_of_two": Field("li", index=-1, limit=2),
+                "all": Field("li", many=True, transform=int),
+                "missing": Field("p", required=False, default="none"),
+                "href": Field("a", attr="href", required=False),
+            },
+        )
+        self.assertEqual(
+            spec.extract("<ul><li>1</li><li>2</li><li>3</li></ul><a>x</a>"),
+            {
+                "second": "2",
+                "last_of_two": "2",
+                "all": [1, 2, 3],
+                "missing": "none",
+                "href": None,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
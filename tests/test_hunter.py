@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from fzmovies_api import hunter
+
+
+class TestIndexSession(unittest.TestCase):
+    def setUp(self):
+        self.session = requests.Session()
+        self.loads = 0
+
+        def get(url, **kwargs):
+            self.loads += 1
+            self.session.cookies.set("PHPSESSID", f"session-{self.loads}")
+            resp = requests.Response()
+            resp.status_code = 200
+            return resp
+
+        patches = (
+            mock.patch.object(hunter, "get_session", lambda: self.session),
+            mock.patch.object(self.session, "get", get),
+            mock.patch.object(hunter.Index, "session_is_initialized", False),
+            mock.patch.object(hunter.Index, "session_cookie", None),
+            mock.patch.object(hunter.Index, "index_resp", None),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_reinitialized_once_cookie_is_dropped(self):
+        hunter.Index.initialize_session()
+        hunter.Index.initialize_session()
+        self.assertEqual(self.loads, 1)
+        self.assertTrue(hunter.Index.session_is_live())
+
+        self.session.cookies.clear()
+        self.assertFalse(hunter.Index.session_is_live())
+        hunter.Index.initialize_session()
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(hunter.Index.session_cookie, "session-2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fzmovies_api import errors, models
+from fzmovies_api.images import ImageCache, ImageFetcher, image_urls
+
+images = {
+    "/a.jpg": b"\xff\xd8 image a",
+    "/a-copy.jpg": b"\xff\xd8 image a",
+    "/b.png": b"\x89PNG b",
+}
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    requests: list[str] = []
+
+    def do_GET(self):
+        ImageHandler.requests.append(self.path)
+        if self.path == "/page.html":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            body = b"<html></html>"
+        elif self.path in images:
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            body = images[self.path]
+        else:
+            self.send_response(404)
+            body = b""
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestImageFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ImageHandler.requests.clear()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_fetch_all_and_serve_locally(self):
+        paths = ("/a.jpg", "/a-copy.jpg", "/b.png", "/page.html", "/gone.jpg")
+        urls = [self.base + path for path in paths]
+        with ImageFetcher(ImageCache(self.dir.name), workers=3) as fetcher:
+            paths = fetcher.fetch_all(urls + urls[:1])
+        self.assertEqual(paths[urls[0]].read_bytes(), images["/a.jpg"])
+        self.assertEqual(paths[urls[0]], paths[urls[1]])
+        self.assertIsInstance(paths[urls[3]], errors.ImageFetchError)
+        self.assertIsInstance(paths[urls[4]], errors.ImageFetchError)
+        self.assertEqual(len(ImageHandler.requests), 5)
+
+        ImageHandler.requests.clear()
+        fetcher = ImageFetcher(ImageCache(self.dir.name))
+        self.assertEqual(fetcher.fetch(urls[2]).read_bytes(), images["/b.png"])
+        self.assertEqual(ImageHandler.requests, [])
+
+    def test_eviction(self):
+        clock = iter(range(100))
+        cache = ImageCache(self.dir.name, max_size=20, clock=lambda: next(clock))
+        a = cache.put("/a.jpg", b"a" * 10)
+        cache.put("/b.jpg", b"b" * 10)
+        cache.get("/a.jpg")
+        cache.put("/c.jpg", b"c" * 10)
+        self.assertIn("/a.jpg", cache)
+        self.assertNotIn("/b.jpg", cache)
+        self.assertTrue(a.exists())
+        self.assertLessEqual(cache.size, 20)
+
+    def test_image_urls(self):
+        movie = models.MovieInSearch(
+            url="https://fzmovies.live/movie-Up--hmp4.htm",
+            title="Up",
+            year=2009,
+            distribution="Hollywood",
+            about="",
+            cover_photo="https://fzmovies.live/imdb_images/Up.jpg",
+        )
+        results = models.SearchResults(movies=[movie, movie])
+        self.assertEqual(image_urls(results, [movie]), [str(movie.cover_photo)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+
+from helpers import Page, movie
+
+from fzmovies_api import models
+from fzmovies_api.main import Search
+from fzmovies_api.utils import read_ahead
+
+
+class TestReadAhead(unittest.TestCase):
+    def test_order_and_bound(self):
+        produced = []
+
+        def items():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        consumed = []
+        for item in read_ahead(items(), 2):
+            time.sleep(0.02)
+            # The item in hand and up to 2 produced ahead
+            self.assertLessEqual(len(produced) - len(consumed), 3)
+            consumed.append(item)
+        self.assertEqual(consumed, list(range(10)))
+
+    def test_overlaps_production_and_consumption(self):
+        def items():
+            for i in range(5):
+                time.sleep(0.05)
+                yield i
+
+        started = time.perf_counter()
+        for _ in read_ahead(items(), 1):
+            time.sleep(0.05)
+        self.assertLess(time.perf_counter() - started, 0.45)
+
+    def test_exception_and_close(self):
+        def failing():
+            yield 1
+            raise ValueError("page failed")
+
+        pages = read_ahead(failing(), 3)
+        self.assertEqual(next(pages), 1)
+        with self.assertRaises(ValueError):
+            next(pages)
+
+        def endless():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        pages = read_ahead(endless(), 2)
+        next(pages)
+        pages.close()
+        time.sleep(0.3)
+        self.assertFalse(
+            any(thread.name == "fzmovies-read-ahead" for thread in threading.enumerate())
+        )
+
+    def test_get_all_results_prefetch(self):
+        movies = [movie(f"Movie {i}") for i in range(6)]
+        pages = Page(
+            [
+                models.SearchResults(
+                    movies=movies[i : i + 2],
+                    next_page=f"https://fzmovies.live/csearch.php?pg={i}",
+                )
+                for i in range(0, 4, 2)
+            ]
+            + [models.SearchResults(movies=movies[4:])]
+        )
+        results = Search.get_all_results(pages, stream=True, prefetch=2)
+        self.assertEqual([result for page in results for result in page.movies], movies)
+        limited = Search.get_all_results(pages, stream=True, limit=4, prefetch=1)
+        self.assertEqual(len(list(limited)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
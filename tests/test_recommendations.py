@@ -0,0 +1,97 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fzmovies_api import hunter, models
+from fzmovies_api.recommendations import GraphWriter, RecommendationCrawler
+from fzmovies_api.utils import get_absolute_url, movie_id
+
+
+def recommended(name: str) -> models.RecommendedMovie:
+    return models.RecommendedMovie(
+        title=name,
+        url=get_absolute_url(f"/movie-{name}--hmp4.htm"),
+        cover_photo=get_absolute_url(f"/imdb_images/{name}.jpg"),
+    )
+
+
+def key(name: str) -> str:
+    return movie_id(f"/movie-{name}--hmp4.htm")
+
+
+graph = {
+    "Heat": ["Ronin", "Collateral", "Ronin"],
+    "Ronin": ["Heat", "Drive", "Ronin"],
+    "Collateral": ["Drive", "Thief"],
+    "Drive": ["Thief", "Nightcrawler"],
+    "Thief": ["Heat"],
+}
+
+
+class TestRecommendationCrawler(unittest.TestCase):
+    def setUp(self):
+        patches = (
+            mock.patch.object(hunter.Index, "session_is_initialized", True),
+            mock.patch.object(RecommendationCrawler, "fetch", self.fetch),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fetch(self, url: str) -> list[models.RecommendedMovie]:
+        name = url.rsplit("/movie-", 1)[1].split("--")[0]
+        if name not in graph:
+            raise ConnectionError(url)
+        return [recommended(name) for name in graph[name]]
+
+    def test_breadth_first_depths(self):
+        edges = []
+        crawler = RecommendationCrawler(["/movie-Heat--hmp4.htm"], max_depth=2)
+        nodes = crawler.run(on_edge=lambda *edge: edges.append(edge))
+        self.assertEqual(
+            {node.title: node.depth for node in nodes.values() if node.title},
+            {"Ronin": 1, "Collateral": 1, "Drive": 2, "Thief": 2},
+        )
+        self.assertEqual(nodes[key("Heat")].depth, 0)
+        self.assertEqual(edges.count((key("Heat"), key("Ronin"))), 1)
+        self.assertIn((key("Ronin"), key("Heat")), edges)
+        self.assertNotIn((key("Ronin"), key("Ronin")), edges)
+        self.assertEqual(crawler.stats["pages"], 3)
+
+    def test_node_budget_and_failures(self):
+        crawler = RecommendationCrawler(
+            [recommended("Drive")], max_depth=5, max_nodes=4
+        )
+        nodes = crawler.run()
+        self.assertEqual(len(nodes), 4)
+        self.assertIn(key("Nightcrawler"), crawler.failures)
+
+    def test_graph_writer(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = Path(dir) / "graph.jsonl"
+            with GraphWriter(path) as writer:
+
+                def on_edge(source: str, target: str):
+                    writer.write_edge(source, target)
+                    written.append(path.read_text().splitlines()[-1])
+
+                written = []
+                RecommendationCrawler([recommended("Thief")], max_depth=1).run(
+                    writer.write_node, on_edge
+                )
+            self.assertEqual(
+                [json.loads(line)["edge"] for line in written], [[key("Thief"), key("Heat")]]
+            )
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual(
+            [line["node"]["title"] for line in lines if "node" in line], ["Thief", "Heat"]
+        )
+        self.assertEqual(
+            [line["edge"] for line in lines if "edge" in line], [[key("Thief"), key("Heat")]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
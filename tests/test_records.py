@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from helpers import Page, movie
+
+from fzmovies_api import models
+from fzmovies_api.main import Search
+from fzmovies_api.records import MovieRecords
+
+movies = [
+    movie("Heat", 1995, about="About Heat – déjà vu"),
+    movie("Up", 2009),
+    movie("Dangal", 2016, "Bollywood", about="Dangal – à la maison"),
+    movie("Empty", 2001),
+]
+
+
+class TestMovieRecords(unittest.TestCase):
+    def test_rows_round_trip(self):
+        records = MovieRecords(movies)
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records.distributions, ["Hollywood", "Bollywood"])
+        self.assertEqual(records[2].distribution, "Bollywood")
+        self.assertEqual(records[-1].title, "Empty")
+        self.assertEqual(records.models(), movies)
+        self.assertEqual(records[0].url, str(movies[0].url))
+        with self.assertRaises(IndexError):
+            records[4]
+
+    def test_smaller_than_models(self):
+        records = MovieRecords(movie(f"Movie {i}", 1950 + i % 70) for i in range(1000))
+        text = sum(
+            len(str(getattr(model, field)).encode())
+            for model in records.models()
+            for field in ("url", "title", "about", "cover_photo")
+        )
+        self.assertLess(records.nbytes, text + 40 * len(records))
+
+    def test_save_and_map(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = Path(dir) / "movies.records"
+            MovieRecords(movies).save(path)
+            with MovieRecords.load(path) as records:
+                self.assertTrue(records.readonly)
+                self.assertEqual([record.model() for record in records], movies)
+                self.assertEqual(records[1], MovieRecords(movies)[1])
+                with self.assertRaises(AssertionError):
+                    records.append(movies[0])
+            self.assertFalse(records.readonly)
+
+            MovieRecords().save(path)
+            with MovieRecords.load(path) as records:
+                self.assertEqual(len(records), 0)
+
+            path.write_bytes(b"not records at all")
+            with self.assertRaises(ValueError):
+                MovieRecords.load(path)
+
+
+class TestCompactResults(unittest.TestCase):
+    def test_get_all_results_compact(self):
+        pages = Page(
+            [
+                models.SearchResults(
+                    movies=movies[:2], next_page="https://fzmovies.live/csearch.php?pg=2"
+                ),
+                models.SearchResults(movies=movies[2:]),
+            ]
+        )
+        records = Search.get_all_results(pages, compact=True)
+        self.assertIsInstance(records, MovieRecords)
+        self.assertEqual(records.models(), movies)
+        with self.assertRaises(AssertionError):
+            Search.get_all_results(pages, stream=True, compact=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from fzmovies_api.hunter import Metadata
+from fzmovies_api.singleflight import SingleFlight
+
+
+def run_concurrently(function, times: int = 8) -> list:
+    start = threading.Barrier(times)
+
+    def call(_):
+        start.wait()
+        return function()
+
+    with ThreadPoolExecutor(max_workers=times) as executor:
+        return list(executor.map(call, range(times)))
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_coalesces_calls_in_flight(self):
+        group = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return object()
+
+        results = run_concurrently(lambda: group.do("page", fetch))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(group.stats, {"calls": 8, "shared": 7})
+        self.assertEqual(group.in_flight, 0)
+
+        # Completed calls are not remembered
+        group.do("page", fetch)
+        self.assertEqual(len(calls), 2)
+
+    def test_shares_exceptions(self):
+        group = SingleFlight()
+
+        def fail():
+            time.sleep(0.2)
+            raise ValueError("Failed")
+
+        def call():
+            try:
+                group.do("page", fail)
+            except ValueError as e:
+                return e
+
+        exceptions = run_concurrently(call, 4)
+        self.assertTrue(all(isinstance(e, ValueError) for e in exceptions))
+        self.assertEqual(group.stats["shared"], 3)
+
+    def test_distinct_keys(self):
+        group = SingleFlight()
+        self.assertEqual(group.do("a", lambda: 1), 1)
+        self.assertEqual(group.do("b", lambda: 2), 2)
+        self.assertEqual(group.stats["shared"], 0)
+
+    def test_get_resource_coalesced_by_canonical_url(self):
+        calls = []
+
+        def get_resource(url, timeout):
+            calls.append(url)
+            time.sleep(0.2)
+            return url
+
+        with mock.patch.object(Metadata, "_get_resource", get_resource):
+            urls = iter(
+                ["/movie-Alpha--hmp4.htm", "https://fzmovies.host/movie-Alpha--hmp4.htm"]
+                * 4
+            )
+            lock = threading.Lock()
+
+            def call():
+                with lock:
+                    url = next(urls)
+                return Metadata.get_resource(url)
+
+            run_concurrently(call)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from helpers import Page, movie
+
+from fzmovies_api import models
+from fzmovies_api.main import Search
+from fzmovies_api.spill import SpillingAccumulator
+
+movies = [movie(f"Movie {i}", 1990 + i) for i in range(25)]
+
+
+class TestSpillingAccumulator(unittest.TestCase):
+    def test_spills_and_reads_back_in_order(self):
+        with tempfile.TemporaryDirectory() as dir:
+            with SpillingAccumulator(1000, dir=dir) as accumulator:
+                accumulator.extend(movies[:20])
+                accumulator.append(movies[20])
+                self.assertGreater(len(accumulator.segments), 1)
+                self.assertLess(accumulator._buffer.nbytes, 1000)
+                accumulator.extend(movies[21:])
+                self.assertEqual(len(accumulator), 25)
+                self.assertEqual(list(accumulator), movies)
+                self.assertEqual(list(accumulator), movies)
+                segments_dir = accumulator.segments[0].parent
+            self.assertFalse(segments_dir.exists())
+            self.assertEqual(list(Path(dir).iterdir()), [])
+
+    def test_within_budget_stays_in_memory(self):
+        accumulator = SpillingAccumulator("1MB")
+        self.assertEqual(accumulator.memory_budget, 1_000_000)
+        accumulator.extend(movies)
+        self.assertEqual(accumulator.segments, [])
+        self.assertEqual(list(accumulator), movies)
+
+    def test_get_all_results_memory_budget(self):
+        pages = Page(
+            [
+                models.SearchResults(
+                    movies=movies[:20], next_page="https://fzmovies.live/csearch.php?pg=2"
+                ),
+                models.SearchResults(movies=movies[20:]),
+            ]
+        )
+        with Search.get_all_results(pages, memory_budget=2000) as accumulator:
+            self.assertIsInstance(accumulator, SpillingAccumulator)
+            self.assertTrue(accumulator.segments)
+            self.assertEqual(list(accumulator), movies)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import unittest
+
+heavy_modules = (
+    "requests",
+    "urllib3",
+    "charset_normalizer",
+    "bs4",
+    "soupsieve",
+    "pydantic",
+    "pydantic_core",
+    "tqdm",
+    "rich",
+    # Modules of the package importing the above
+    "fzmovies_api.main",
+    "fzmovies_api.hunter",
+    "fzmovies_api.handlers",
+)
+
+
+def imported_heavy_modules(module: str) -> list[str]:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module};"
+            f"print(' '.join(m for m in {heavy_modules!r} if m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return output.split()
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_package_import_is_lazy(self):
+        self.assertEqual(imported_heavy_modules("fzmovies_api"), [])
+
+    def test_console_import_is_lazy(self):
+        self.assertEqual(imported_heavy_modules("fzmovies_api.console"), [])
+
+    def test_lazy_attributes(self):
+        import fzmovies_api
+        from fzmovies_api import main
+
+        self.assertIs(fzmovies_api.Search, main.Search)
+        self.assertIsInstance(fzmovies_api.__version__, str)
+        with self.assertRaises(AttributeError):
+            fzmovies_api.Unknown  # noqa: B018
+
+
+if __name__ == "__main__":
+    unittest.main()